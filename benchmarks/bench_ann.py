@@ -0,0 +1,104 @@
+# benchmarks/bench_ann.py
+"""
+Compare approximate FAISS index types against the exact flat index.
+
+For every bank size, builds flat, IVF-PQ and HNSW indexes (vector_index.new_index)
+over clustered synthetic embeddings and reports build time, recall@k against
+the flat results and p50/p99 single-query latency for each nprobe / efSearch.
+
+Usage:
+    python -m benchmarks.bench_ann --sizes 1000 10000 100000 --nprobe 4 16 64 --ef-search 16 64 256
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+
+from src.vector_index import new_index, set_search_params
+
+def make_bank(size, dim, rng):
+    """Unit-length vectors around size/100 cluster centres, like sentence embeddings of a question bank."""
+    centres = rng.normal(size=(max(1, size // 100), dim))
+    vectors = centres[rng.integers(len(centres), size=size)] + 0.5 * rng.normal(size=(size, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+def make_queries(bank, count, rng):
+    """Perturbed bank entries, i.e. paraphrases of indexed questions."""
+    queries = bank[rng.integers(len(bank), size=count)] + 0.1 * rng.normal(size=(count, bank.shape[1]))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries.astype(np.float32)
+
+def search_all(index, queries, k):
+    """Search one query at a time, as the RAG retriever does."""
+    found, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - started)
+        found.append(ids[0])
+    latencies_ms = np.array(latencies) * 1000
+    return np.array(found), float(np.percentile(latencies_ms, 50)), float(np.percentile(latencies_ms, 99))
+
+def recall_at_k(found, truth):
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+def run(sizes, dim, k, query_count, nprobes, ef_searches, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for size in sizes:
+        bank = make_bank(size, dim, rng)
+        queries = make_queries(bank, query_count, rng)
+        ids = np.arange(size, dtype=np.int64)
+
+        configs = [("flat", None, [None])]
+        configs.append(("ivfpq", "nprobe", nprobes))
+        configs.append(("hnsw", "ef_search", ef_searches))
+        truth = None
+        for index_type, param, values in configs:
+            started = time.perf_counter()
+            index = new_index(bank, ids, index_type)
+            build_seconds = time.perf_counter() - started
+            for value in values:
+                if param:
+                    set_search_params(index, **{param: value})
+                found, p50, p99 = search_all(index, queries, k)
+                if truth is None:
+                    truth = found
+                rows.append({
+                    "size": size,
+                    "index_type": index_type,
+                    "param": f"{param}={value}" if param else "",
+                    "build_seconds": round(build_seconds, 3),
+                    f"recall_at_{k}": recall_at_k(found, truth),
+                    "p50_ms": p50,
+                    "p99_ms": p99
+                })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 embedding size")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.dim, args.k, args.queries, args.nprobe, args.ef_search)
+    recall_key = f"recall_at_{args.k}"
+    print(f"{'size':>8} {'index':>6} {'param':>14} {'build_s':>8} {recall_key:>12} {'p50_ms':>8} {'p99_ms':>8}")
+    for row in rows:
+        print(
+            f"{row['size']:>8} {row['index_type']:>6} {row['param']:>14} {row['build_seconds']:>8.2f} "
+            f"{row[recall_key]:>12.3f} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
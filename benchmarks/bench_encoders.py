@@ -0,0 +1,106 @@
+# benchmarks/bench_encoders.py
+"""
+Compare encoder backends on the question bank.
+
+Reports per-batch latency, throughput and how far each backend's 0-5 scores
+drift from the fp32 SentenceTransformer reference.
+
+Usage:
+    python -m benchmarks.bench_encoders --backends sentence-transformers torch-int8 onnx
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+
+from src.data_loader import load_questions
+from src.encoders import ENCODER_BACKENDS, load_encoder
+from src.evaluation import MODEL_NAME
+
+REFERENCE_BACKEND = "sentence-transformers"
+
+def build_pairs(questions):
+    """
+    Build (candidate, model_answer) pairs with a spread of expected scores:
+    a truncated answer, the question itself and a neighbouring answer.
+    """
+    answers = [q["model_answer"] for q in questions if q["model_answer"]]
+    pairs = []
+    for i, q in enumerate(questions):
+        reference = q["model_answer"]
+        if not reference:
+            continue
+        words = reference.split()
+        pairs.append((" ".join(words[: max(1, len(words) // 2)]), reference))
+        pairs.append((q["text"], reference))
+        pairs.append((answers[(i + 1) % len(answers)], reference))
+    return pairs
+
+def score_pairs(encoder, pairs, batch_size):
+    texts = list(dict.fromkeys(t for pair in pairs for t in pair))
+    position = {t: k for k, t in enumerate(texts)}
+    embeddings = encoder.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    a = embeddings[[position[p[0]] for p in pairs]]
+    b = embeddings[[position[p[1]] for p in pairs]]
+    return np.einsum("ij,ij->i", a, b) * 5
+
+def time_encoder(encoder, texts, batch_size, repeats):
+    latencies = []
+    for _ in range(repeats):
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            t0 = time.perf_counter()
+            encoder.encode(batch, batch_size=batch_size, normalize_embeddings=True)
+            latencies.append(time.perf_counter() - t0)
+    total = sum(latencies)
+    return {
+        "batch_latency_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "batch_latency_p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "throughput_texts_per_s": len(texts) * repeats / total if total else 0.0
+    }
+
+def run(backends, batch_size=32, repeats=3):
+    questions = load_questions()
+    pairs = build_pairs(questions)
+    texts = list(dict.fromkeys(t for pair in pairs for t in pair))
+
+    results = {}
+    reference_scores = None
+    for name in [REFERENCE_BACKEND] + [b for b in backends if b != REFERENCE_BACKEND]:
+        t0 = time.perf_counter()
+        encoder = load_encoder(name, MODEL_NAME)
+        load_seconds = time.perf_counter() - t0
+        # Warm-up pass so one-off graph/kernel setup is not timed
+        encoder.encode(texts[:batch_size], batch_size=batch_size)
+        result = {"load_seconds": load_seconds}
+        result.update(time_encoder(encoder, texts, batch_size, repeats))
+        scores = score_pairs(encoder, pairs, batch_size)
+        if reference_scores is None:
+            reference_scores = scores
+        deviation = np.abs(scores - reference_scores)
+        result["score_deviation_mean"] = float(deviation.mean())
+        result["score_deviation_max"] = float(deviation.max())
+        results[name] = result
+    return {"model": MODEL_NAME, "texts": len(texts), "pairs": len(pairs),
+            "batch_size": batch_size, "backends": results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", nargs="+", default=list(ENCODER_BACKENDS), choices=list(ENCODER_BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    report = run(args.backends, batch_size=args.batch_size, repeats=args.repeats)
+    for name, r in report["backends"].items():
+        print(f"{name:>22}: p50 {r['batch_latency_p50_ms']:.1f} ms/batch, "
+              f"{r['throughput_texts_per_s']:.1f} texts/s, "
+              f"score dev mean {r['score_deviation_mean']:.3f} max {r['score_deviation_max']:.3f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# benchmarks/bench_retrieval.py
+"""
+Measure RAG retrieval quality and cost for chunking, index and model settings.
+
+Labelled queries are generated from the question bank: for every entry a
+keyword query (its question's content words, shuffled) and a paraphrase
+(its question reworded from a template), each labelled with the entry it was
+made from. The bank is padded with synthetic distractor entries up to every
+requested size, indexed with build_vector_store_from_json for each
+combination of chunk size, overlap, index type and embedding model, and
+searched with vector-only and hybrid (BM25 + vector) retrieval.
+
+A query is answered correctly when a chunk of its source entry is retrieved.
+Each row reports recall@k, MRR@k (overall and per query type), index build
+time (including loading the embedding model), index size on disk and
+p50/p95/p99 query latency. Rows are written as sorted JSON so that a
+regression shows up as a diff of the results file.
+
+Usage:
+    python -m benchmarks.bench_retrieval --sizes 100 1000 5000 --chunk-sizes 200 500 \\
+        --index-types flat hnsw --output benchmarks/results/retrieval.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import numpy as np
+from langchain.text_splitter import CharacterTextSplitter
+
+from src.bm25 import BM25Index
+from src.data_loader import extract_question_items, get_model_answer
+from src.rag_pipeline import HybridRetriever, build_vector_store_from_json, question_category, question_document
+
+STOPWORDS = {
+    "a", "an", "and", "are", "can", "describe", "do", "does", "explain", "for", "how", "in", "is",
+    "it", "of", "on", "or", "the", "to", "what", "when", "which", "why", "with", "you", "your"
+}
+# Leading phrasings stripped before a question is reworded
+QUESTION_OPENERS = re.compile(
+    r"^(what is|what are|what's|explain|describe|how do you|how does|how do|can you explain|define)\s+",
+    re.IGNORECASE
+)
+PARAPHRASE_TEMPLATES = [
+    "Could you tell me about {}?",
+    "I'd like to understand {}.",
+    "Give me an overview of {}.",
+]
+QUERY_TYPES = ("keywords", "paraphrase")
+RETRIEVERS = ("vector", "hybrid")
+
+def load_entries(json_paths):
+    """(category, item) for every question of the bank, in file order."""
+    entries = []
+    for path in json_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        category = question_category(path)
+        entries.extend((category, item) for item in extract_question_items(data) if item.get("question"))
+    return entries
+
+def make_queries(entries, rng):
+    """
+    Labelled queries: {'query', 'type', 'entry'} with `entry` the index of the source entry.
+    """
+    queries = []
+    for i, (_, item) in enumerate(entries):
+        question = item["question"].strip().rstrip("?.")
+        words = [w for w in re.findall(r"[\w+#-]+", question.lower()) if w not in STOPWORDS]
+        if words:
+            queries.append({"query": " ".join(rng.permutation(words)), "type": "keywords", "entry": i})
+        topic = QUESTION_OPENERS.sub("", question)
+        template = PARAPHRASE_TEMPLATES[int(rng.integers(len(PARAPHRASE_TEMPLATES)))]
+        queries.append({"query": template.format(topic[:1].lower() + topic[1:]), "type": "paraphrase", "entry": i})
+    return queries
+
+def make_distractors(entries, count, rng):
+    """
+    Synthetic entries built from the bank's own vocabulary, so they compete
+    for the same terms without answering any labelled query.
+    """
+    vocabulary = sorted({
+        w for _, item in entries
+        for w in re.findall(r"[a-z]{3,}", (item["question"] + " " + get_model_answer(item)).lower())
+    })
+    distractors = []
+    for i in range(count):
+        question = " ".join(rng.choice(vocabulary, size=int(rng.integers(4, 10))))
+        answer = " ".join(rng.choice(vocabulary, size=int(rng.integers(20, 60))))
+        distractors.append({"question": f"Synthetic {i}: {question}?", "model_answer": f"{answer}."})
+    return distractors
+
+def entry_chunks(entries, chunk_size, chunk_overlap):
+    """Map every chunk text to the index of the entry it comes from, as build_vector_store_from_json chunks it."""
+    splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    owners = {}
+    for i, (category, item) in enumerate(entries):
+        for chunk in splitter.split_text(question_document(item, category)):
+            owners.setdefault(chunk, i)
+    return owners
+
+def directory_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(dirpath, name))
+        for dirpath, _, names in os.walk(path) for name in names
+    )
+
+def evaluate(search, queries, owners, k):
+    """Recall@k, MRR@k (overall and per query type) and latency percentiles of `search`."""
+    hits, reciprocal_ranks, latencies = [], [], []
+    for query in queries:
+        started = time.perf_counter()
+        docs = search(query["query"])
+        latencies.append(time.perf_counter() - started)
+        rank = next(
+            (r for r, doc in enumerate(docs[:k], start=1) if owners.get(doc.page_content) == query["entry"]),
+            None
+        )
+        hits.append(rank is not None)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+    hits, reciprocal_ranks = np.array(hits), np.array(reciprocal_ranks)
+    latencies_ms = np.array(latencies) * 1000
+    types = np.array([query["type"] for query in queries])
+    row = {
+        f"recall_at_{k}": round(float(hits.mean()), 4),
+        f"mrr_at_{k}": round(float(reciprocal_ranks.mean()), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3)
+    }
+    for query_type in QUERY_TYPES:
+        mask = types == query_type
+        if mask.any():
+            row[f"recall_at_{k}_{query_type}"] = round(float(hits[mask].mean()), 4)
+            row[f"mrr_at_{k}_{query_type}"] = round(float(reciprocal_ranks[mask].mean()), 4)
+    return row
+
+def run(json_paths, sizes, chunk_sizes, chunk_overlaps, index_types, models, k, max_queries, seed=0):
+    rng = np.random.default_rng(seed)
+    entries = load_entries(json_paths)
+    queries = make_queries(entries, rng)
+    if max_queries and len(queries) > max_queries:
+        queries = [queries[i] for i in sorted(rng.choice(len(queries), size=max_queries, replace=False))]
+    # One distractor pool, so larger banks extend the smaller ones
+    distractors = make_distractors(entries, max(0, max(sizes) - len(entries)), rng)
+
+    rows = []
+    work_dir = tempfile.mkdtemp(prefix="bench_retrieval_")
+    try:
+        # One file per original category: the category is part of the indexed text
+        bank_paths = []
+        for category in dict.fromkeys(c for c, _ in entries):
+            path = os.path.join(work_dir, f"{category}_questions.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump([item for c, item in entries if c == category], f)
+            bank_paths.append(path)
+
+        for size in sizes:
+            distractor_path = os.path.join(work_dir, "synthetic_questions.json")
+            with open(distractor_path, "w", encoding="utf-8") as f:
+                json.dump(distractors[:max(0, size - len(entries))], f)
+            for model, chunk_size, chunk_overlap, index_type in itertools.product(
+                models, chunk_sizes, chunk_overlaps, index_types
+            ):
+                if chunk_overlap >= chunk_size:
+                    continue
+                index_dir = os.path.join(work_dir, "index")
+                shutil.rmtree(index_dir, ignore_errors=True)
+                bm25_index = BM25Index(index_dir=index_dir)
+                started = time.perf_counter()
+                vector_store = build_vector_store_from_json(
+                    bank_paths + [distractor_path],
+                    embedding_model_name=model,
+                    chunk_size=chunk_size,
+                    chunk_overlap=chunk_overlap,
+                    persist_dir=index_dir,
+                    index_type=index_type,
+                    bm25_index=bm25_index,
+                    dedup=False
+                )
+                build_seconds = time.perf_counter() - started
+                owners = entry_chunks(entries, chunk_size, chunk_overlap)
+                searches = {
+                    "vector": lambda query: vector_store.similarity_search(query, k=k),
+                    "hybrid": HybridRetriever(vector_store, bm25_index, k=k).get_relevant_documents
+                }
+                for retriever in RETRIEVERS:
+                    row = {
+                        "size": max(size, len(entries)),
+                        "model": model,
+                        "chunk_size": chunk_size,
+                        "chunk_overlap": chunk_overlap,
+                        "index_type": index_type,
+                        "retriever": retriever,
+                        "chunks": len(vector_store.index_to_docstore_id),
+                        "queries": len(queries),
+                        "build_seconds": round(build_seconds, 3),
+                        "index_bytes": sum(
+                            os.path.getsize(os.path.join(index_dir, name))
+                            for name in os.listdir(index_dir) if name.endswith(".faiss")
+                        ),
+                        "store_bytes": directory_bytes(index_dir)
+                    }
+                    row.update(evaluate(searches[retriever], queries, owners, k))
+                    rows.append(row)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("json_paths", nargs="*", default=[
+        "data/technical_questions.json",
+        "data/behavioral_questions.json",
+        "data/hr_questions.json"
+    ])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="Bank sizes, padded with synthetic distractors")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500])
+    parser.add_argument("--chunk-overlaps", type=int, nargs="+", default=[50])
+    parser.add_argument("--index-types", nargs="+", default=["flat"])
+    parser.add_argument("--models", nargs="+", default=["sentence-transformers/all-MiniLM-L6-v2"])
+    parser.add_argument("--k", type=int, default=4, help="Documents retrieved per query, as in the RAG chain")
+    parser.add_argument("--max-queries", type=int, default=500, help="Sample at most this many labelled queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = run(
+        args.json_paths, args.sizes, args.chunk_sizes, args.chunk_overlaps,
+        args.index_types, args.models, args.k, args.max_queries, args.seed
+    )
+    recall_key, mrr_key = f"recall_at_{args.k}", f"mrr_at_{args.k}"
+    print(
+        f"{'size':>6} {'chunk':>5} {'ovl':>4} {'index':>6} {'retriever':>9} {recall_key:>11} {mrr_key:>8} "
+        f"{'build_s':>8} {'index_kb':>9} {'p50_ms':>7} {'p95_ms':>7} {'p99_ms':>7}"
+    )
+    for row in rows:
+        print(
+            f"{row['size']:>6} {row['chunk_size']:>5} {row['chunk_overlap']:>4} {row['index_type']:>6} "
+            f"{row['retriever']:>9} {row[recall_key]:>11.3f} {row[mrr_key]:>8.3f} {row['build_seconds']:>8.2f} "
+            f"{row['index_bytes'] / 1024:>9.0f} {row['p50_ms']:>7.2f} {row['p95_ms']:>7.2f} {row['p99_ms']:>7.2f}"
+        )
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_sentiment.py
+"""
+Compare sentiment throughput: per-call analyzer vs cached analyzer vs batch API.
+
+The per-call path rebuilds SentimentIntensityAnalyzer (and reparses the
+VADER lexicon) for every text, as get_sia() used to; it is timed on a
+sample and reported per text.
+
+Usage:
+    python -m benchmarks.bench_sentiment --texts 20000 --workers 4
+"""
+
+import argparse
+import json
+import time
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from src.data_loader import load_questions
+from src.sentiment_analysis import _to_result, analyze_sentiment, analyze_sentiment_batch, get_sia
+
+def per_call_sentiment(text):
+    """The old path: a fresh analyzer for every text."""
+    return _to_result(SentimentIntensityAnalyzer().polarity_scores(text))
+
+def build_texts(count):
+    questions = load_questions()
+    corpus = [q["model_answer"] for q in questions if q["model_answer"]]
+    corpus += [q["text"] for q in questions if q["text"]]
+    return [f"{corpus[i % len(corpus)]} ({i})" for i in range(count)]
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+def run(count, workers, sample):
+    texts = build_texts(count)
+    get_sia()
+
+    per_call, per_call_seconds = timed(lambda: [per_call_sentiment(t) for t in texts[:sample]])
+    cached, cached_seconds = timed(lambda: [analyze_sentiment(t) for t in texts])
+    batch, batch_seconds = timed(
+        lambda: analyze_sentiment_batch(texts, workers=workers, parallel_threshold=1)
+    )
+    per_call_rate = sample / per_call_seconds
+    return {
+        "texts": count,
+        "workers": workers,
+        "per_call_texts_per_s": per_call_rate,
+        "cached_texts_per_s": count / cached_seconds,
+        "batch_texts_per_s": count / batch_seconds,
+        "speedup_cached_vs_per_call": count / cached_seconds / per_call_rate,
+        "speedup_batch_vs_per_call": count / batch_seconds / per_call_rate,
+        "results_match": per_call == cached[:sample] and cached == batch
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-call-sample", type=int, default=200,
+                        help="Texts timed on the slow per-call path")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    report = run(args.texts, args.workers, min(args.per_call_sample, args.texts))
+    for key, value in report.items():
+        print(f"{key:>28}: {value:.1f}" if isinstance(value, float) else f"{key:>28}: {value}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,9 @@ import sys
 from datetime import datetime
 from src.sentiment_analysis import analyze_sentiment
 from src.human_handoff import handle_human_handoff
-from src.evaluation import evaluate_answer
+from src.evaluation import evaluate_answer, index_model_answers
 from src.data_loader import load_questions
+from src.warmup import warm_up_models
 
 # Add components directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'components')))
@@ -37,12 +38,28 @@ if 'interview_state' not in st.session_state:
         'conversation_history': []
     }
 
+@st.cache_resource(show_spinner="Loading models...")
+def warm_up():
+    """Load and exercise every model once per server process."""
+    return warm_up_models()
+
+@st.cache_data(show_spinner="Loading questions...")
+def get_questions():
+    """Load (and deduplicate) the question bank once, not on every rerun."""
+    return load_questions()
+
+@st.cache_resource(show_spinner="Indexing model answers...")
+def index_questions(questions):
+    """Build the model-answer indexes once per question bank, not on every rerun."""
+    return index_model_answers(questions)
+
 def main():
     st.set_page_config(
         page_title="AI Interview Bot",
         page_icon="🤖",
         layout="centered"
     )
+    warm_up()
 
     # Navigation
     page = st.sidebar.selectbox("Navigation", ["Candidate Interview", "Recruiter Dashboard"])
@@ -52,7 +69,8 @@ def main():
         return
 
     show_header()
-    questions = load_questions()
+    questions = get_questions()
+    index_questions(questions)
 
     # Stage 1: Candidate Form
     if st.session_state['interview_state']['current_stage'] == 'form':
@@ -82,7 +100,9 @@ def handle_interview_flow(questions):
             question_text=question['text'],
             question_number=current_index + 1,
             total_questions=len(questions),
-            question_category=question['category']
+            question_category=question['category'],
+            model_answer=question['model_answer'],
+            show_coverage_meter=True
         )
 
         if submitted:
@@ -100,7 +120,8 @@ def handle_interview_flow(questions):
             handoff_triggered = handle_human_handoff(
                 candidate_response=answer,
                 sentiment=sentiment,
-                context=st.session_state['interview_state']['candidate_data']
+                context=st.session_state['interview_state']['candidate_data'],
+                sentiment_result=sentiment_result
             )
             if handoff_triggered:
                 st.stop()
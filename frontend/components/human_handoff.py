@@ -5,15 +5,45 @@ import pandas as pd
 from datetime import datetime
 import os
 
+from src.config import settings
+from src.sentiment_analysis import SentimentTracker
+
 HANDOFF_LOG_PATH = "data/handoff_requests.csv"
+SENTIMENT_TRACKER_KEY = "sentiment_tracker"
+
+def update_sentiment_tracker(session_state, sentiment_result) -> SentimentTracker:
+    """
+    Add the latest answer's sentiment to the interview's rolling tracker.
+
+    Args:
+        session_state: Streamlit session state (or any dict) holding the tracker state
+        sentiment_result: Output of analyze_sentiment for the latest answer
 
-def detect_handoff_need(candidate_response: str, sentiment: str = None) -> bool:
+    Returns:
+        SentimentTracker: The updated tracker
+    """
+    state = session_state.get(SENTIMENT_TRACKER_KEY)
+    if state is None:
+        tracker = SentimentTracker(
+            alpha=settings.HANDOFF_SENTIMENT_ALPHA,
+            window=settings.HANDOFF_SENTIMENT_WINDOW
+        )
+    else:
+        tracker = SentimentTracker.from_dict(state)
+    tracker.update(sentiment_result)
+    session_state[SENTIMENT_TRACKER_KEY] = tracker.to_dict()
+    return tracker
+
+def detect_handoff_need(candidate_response: str, sentiment: str = None, tracker: SentimentTracker = None) -> bool:
     """
     Determine if conversation should be transferred to a human.
 
     Args:
         candidate_response: Candidate's latest message
         sentiment: Optional sentiment analysis result
+        tracker: Optional rolling sentiment of the interview; when given,
+            only sustained negativity (per the HANDOFF_* settings) triggers
+            a handoff instead of a single negative label
 
     Returns:
         bool: True if handoff should be initiated
@@ -21,6 +51,12 @@ def detect_handoff_need(candidate_response: str, sentiment: str = None) -> bool:
     manual_triggers = ["human", "representative", "talk to someone", "recruiter", "real person", "manager"]
     if candidate_response and any(keyword in candidate_response.lower() for keyword in manual_triggers):
         return True
+    if tracker is not None:
+        return tracker.is_sustained_negative(
+            ewma_threshold=settings.HANDOFF_EWMA_THRESHOLD,
+            min_negative=settings.HANDOFF_NEGATIVE_IN_WINDOW,
+            min_turns=settings.HANDOFF_MIN_TURNS
+        )
     if sentiment and sentiment.lower() in ["negative", "frustrated"]:
         return True
     return False
@@ -87,7 +123,7 @@ def handoff_interface(context: dict):
             log_handoff_request(context['handoff_reason'], context)
             st.success("Comments submitted successfully!")
 
-def handle_human_handoff(candidate_response: str, sentiment: str, context: dict):
+def handle_human_handoff(candidate_response: str, sentiment: str, context: dict, sentiment_result: dict = None):
     """
     Main handoff handler to be called from chatbot flow.
 
@@ -95,6 +131,9 @@ def handle_human_handoff(candidate_response: str, sentiment: str, context: dict)
         candidate_response: Candidate's latest message
         sentiment: Sentiment analysis result
         context: Conversation context
+        sentiment_result: Optional full analyze_sentiment output; when given it
+            updates the interview's rolling tracker, which then decides the
+            sentiment-based trigger
 
     Returns:
         bool: True if handoff was triggered and UI was shown.
@@ -104,11 +143,16 @@ def handle_human_handoff(candidate_response: str, sentiment: str, context: dict)
         handoff_interface(context)
         return True
 
-    handoff_needed = detect_handoff_need(candidate_response, sentiment)
+    tracker = None
+    if sentiment_result is not None:
+        tracker = update_sentiment_tracker(st.session_state, sentiment_result)
+
+    handoff_needed = detect_handoff_need(candidate_response, sentiment, tracker)
     if handoff_needed:
         reason = ("Candidate request"
                   if candidate_response and any(keyword in candidate_response.lower()
                                                for keyword in ["human", "representative", "recruiter", "real person"])
+                  else f"Automated trigger: sustained negative sentiment ({tracker.describe()})" if tracker is not None
                   else f"Automated trigger: {sentiment} sentiment")
 
         context = context.copy() if context else {}
@@ -1,6 +1,27 @@
 # frontend/components/question_display.py
 
 import streamlit as st
+from src.incremental_scoring import IncrementalScorer
+
+def show_coverage(answer, model_answer, key):
+    """
+    Show a key-point coverage meter for the answer written so far.
+
+    st.text_area only reruns the script when the answer is applied (Ctrl+Enter
+    or leaving the box) and on submit, so that is when the meter updates. The
+    scorer lives in session state so unchanged sentences are never re-encoded.
+    """
+    state_key = f"coverage_{key}"
+    scorer = st.session_state.get(state_key)
+    if scorer is None:
+        scorer = IncrementalScorer(model_answer)
+        st.session_state[state_key] = scorer
+    coverage = scorer.update(answer)
+    total = len(coverage['covered']) + len(coverage['missed'])
+    if total:
+        st.progress(
+            coverage['ratio'], text=f"Coverage: {len(coverage['covered'])} of {total} key points"
+        )
 
 def display_question(
     question_text,
@@ -9,7 +30,9 @@ def display_question(
     question_category=None,
     previous_answer=None,
     disable_input=False,
-    submit_label="Submit Answer"
+    submit_label="Submit Answer",
+    model_answer=None,
+    show_coverage_meter=False
 ):
     """
     Display the current interview question and collect the candidate's answer.
@@ -22,6 +45,9 @@ def display_question(
         previous_answer (str, optional): Pre-fill answer if available.
         disable_input (bool): If True, disables the answer input.
         submit_label (str): Label for the submit button.
+        model_answer (str, optional): Reference answer, needed for the coverage meter.
+        show_coverage_meter (bool): If True, show a key-point coverage meter
+            that updates each time the answer is applied or submitted.
 
     Returns:
         (answer, submitted): Tuple of the candidate's answer and submit status.
@@ -43,6 +69,10 @@ def display_question(
         key=f"answer_{question_number or question_text[:10]}"
     )
     
+    # Coverage meter
+    if show_coverage_meter and model_answer:
+        show_coverage(answer, model_answer, key=question_number or question_text[:10])
+    
     # Submit button
     submitted = st.button(submit_label, disabled=disable_input, key=f"submit_{question_number or question_text[:10]}")
     
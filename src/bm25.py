@@ -0,0 +1,135 @@
+# src/bm25.py
+
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from src.config import settings
+from src.embedding_index import temp_path
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+def tokenize(text):
+    """
+    Lowercase word tokens; keeps terms like 'c++' and 'c#' intact.
+    """
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+class BM25Index:
+    """
+    In-process Okapi BM25 inverted index over document chunks.
+
+    Stored as `<name>.bm25.json` next to the vector index: the term
+    frequencies of every document, from which the postings are rebuilt on
+    load. Syncing only tokenizes documents that were added and drops the
+    postings of removed ones, so it can follow PersistentVectorIndex.sync.
+    With `index_dir=None` nothing is written to disk.
+    """
+
+    def __init__(self, index_dir="data/vector_store", name="questions", k1=None, b=None):
+        self.index_dir = index_dir
+        self.path = os.path.join(index_dir, f"{name}.bm25.json") if index_dir else None
+        self.k1 = settings.BM25_K1 if k1 is None else k1
+        self.b = settings.BM25_B if b is None else b
+        self._docs = {}
+        self._lengths = {}
+        self._postings = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def load(self):
+        """
+        Read the stored index.
+
+        Returns:
+            bool: True if an index was loaded.
+        """
+        if not (self.path and os.path.exists(self.path)):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            docs = json.load(f).get("docs", {})
+        self._docs, self._lengths, self._postings, self._total_length = {}, {}, {}, 0
+        for doc_id, terms in docs.items():
+            self._add(doc_id, terms)
+        return True
+
+    def _add(self, doc_id, terms):
+        self._docs[doc_id] = terms
+        self._lengths[doc_id] = sum(terms.values())
+        self._total_length += self._lengths[doc_id]
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def _remove(self, doc_id):
+        terms = self._docs.pop(doc_id)
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def sync(self, docs):
+        """
+        Bring the index in line with `docs`, tokenizing only new documents.
+
+        Args:
+            docs (dict): {doc_id: text}; ids must change when the text does
+                (e.g. content-hash based ids).
+
+        Returns:
+            dict: Number of documents 'added' and 'removed'.
+        """
+        if not self._docs:
+            self.load()
+        removed = [doc_id for doc_id in self._docs if doc_id not in docs]
+        added = [doc_id for doc_id in docs if doc_id not in self._docs]
+        for doc_id in removed:
+            self._remove(doc_id)
+        for doc_id in added:
+            self._add(doc_id, dict(Counter(tokenize(docs[doc_id]))))
+        if (added or removed) and self.path:
+            self._write()
+        return {"added": len(added), "removed": len(removed)}
+
+    def _write(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        # Unique temporary name: several processes may sync the index at once
+        tmp_path = temp_path(self.path)
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"docs": self._docs}, f)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def search(self, query, k=20):
+        """
+        Rank documents for a query.
+
+        Args:
+            query (str): Free-text query.
+            k (int): Number of results.
+
+        Returns:
+            list: (doc_id, score) pairs, best first; documents sharing no term are omitted.
+        """
+        n = len(self._docs)
+        if not n:
+            return []
+        avg_length = self._total_length / n
+        scores = Counter()
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores.most_common(k)
@@ -59,7 +59,8 @@ def run_chatbot(
                 "answer": answer,
                 "score": score,
                 "sentiment": sentiment
-            }
+            },
+            sentiment_result=sentiment_result
         )
         if handoff_triggered:
             st.stop()
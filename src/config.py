@@ -47,12 +47,86 @@ class Settings(BaseSettings):
     # Analytics
     ANALYTICS_RETENTION_DAYS: int = 90
     
+    # Human handoff (sustained negative sentiment)
+    HANDOFF_SENTIMENT_ALPHA: float = 0.4  # EWMA weight of the latest answer
+    HANDOFF_SENTIMENT_WINDOW: int = 3  # answers in the negative-count window
+    HANDOFF_NEGATIVE_IN_WINDOW: int = 2  # negative answers in the window that trigger handoff
+    HANDOFF_EWMA_THRESHOLD: float = -0.35  # EWMA compound score that triggers handoff
+    HANDOFF_MIN_TURNS: int = 2  # answers before sentiment alone can trigger handoff
+    
     # WebSocket
     WS_MESSAGE_QUEUE: str = "ws_messages"
     
     # Cache
     CACHE_TTL: int = 3600  # 1 hour
     
+    # Answer scoring
+    ENCODER_BACKEND: str = "sentence-transformers"  # or "torch-int8", "onnx"
+    ENCODER_MAX_TOKENS: int = 256  # hard cap; longer texts keep their first tokens
+    ENCODER_BUCKET_WIDTH: int = 32  # token span of each length bucket
+    EMBEDDING_INDEX_DIR: str = "data/embeddings"
+    EMBEDDING_CACHE_PATH: str = "data/embeddings/cache.sqlite3"
+    EMBEDDING_CACHE_SIZE: int = 10000  # in-memory LRU entries
+    EMBEDDING_CACHE_DISK_ITEMS: int = 200000  # SQLite rows kept (least recently used go first); 0 = unbounded
+    EMBEDDING_CACHE_TTL_SECONDS: int = 30 * 24 * 3600  # SQLite rows unused this long are deleted; 0 = never
+    SCORING_CHUNK_MIN_WORDS: int = 150  # longer answers are scored in sentence windows
+    SCORING_WINDOW_SENTENCES: int = 3
+    SCORING_WINDOW_STRIDE: int = 2
+    SCORING_MAX_WINDOWS: int = 16
+    SCORING_AGGREGATION: str = "max"  # or "topk_mean"
+    SCORING_TOP_K: int = 3
+    COVERAGE_THRESHOLD: float = 0.6  # similarity at which a key point counts as covered
+    SCORING_CASCADE: bool = True
+    CASCADE_MIN_WORDS: int = 2  # shorter answers skip the encoder
+    CASCADE_MIN_CONTENT_WORDS: int = 1  # answers with fewer non-stop words skip the encoder
+    CASCADE_LEXICAL_FLOOR: float = -1.0  # answers at or below this TF-IDF similarity skip the encoder; negative disables
+    CASCADE_REJECT_SCORE: float = 0.5  # score given to short-circuited answers
+    CASCADE_CROSS_ENCODER: str = "cross-encoder/stsb-TinyBERT-L-4"  # empty disables the rerank tier
+    CASCADE_BORDER_MARGIN: float = 0.25  # rerank scores this close to 3.0 / 3.5
+    SCORING_MAX_BATCH_SIZE: int = 32
+    SCORING_MAX_WAIT_MS: float = 10.0
+    INFERENCE_WORKERS: int = 0  # 0 = one per core, minus one for the event loop
+    INFERENCE_MAX_RETRIES: int = 2  # re-runs of a request that crashed its worker while running alone
+    WARMUP_MODELS: List[str] = ["sentence_encoder", "cross_encoder", "vader"]
+    
+    # Retrieval (RAG)
+    VECTOR_STORE_DIR: str = "data/vector_store"  # persisted FAISS index + chunk manifest
+    VECTOR_INDEX_TYPE: str = "flat"  # exact; or "ivfpq", "hnsw" for approximate search
+    IVF_NLIST: int = 1024  # upper bound; capped at one list per 39 training vectors
+    IVF_PQ_M: int = 16  # sub-quantizers (bytes per vector at 8 bits)
+    IVF_PQ_NBITS: int = 8
+    IVF_PQ_REFINE: int = 4  # re-rank k * this PQ candidates with exact distances; 0 disables
+    IVF_NPROBE: int = 16  # lists visited per query
+    HNSW_M: int = 32  # graph neighbours per node
+    HNSW_EF_CONSTRUCTION: int = 200
+    HNSW_EF_SEARCH: int = 64  # candidate list size per query
+    HYBRID_RETRIEVAL: bool = True  # fuse BM25 with vector search
+    HYBRID_VECTOR_WEIGHT: float = 1.0  # reciprocal-rank fusion weight of vector results
+    HYBRID_BM25_WEIGHT: float = 1.0  # reciprocal-rank fusion weight of BM25 results
+    HYBRID_RRF_K: int = 60  # rank offset; larger values flatten the fusion
+    HYBRID_FETCH_K: int = 20  # candidates taken from each retriever before fusion
+    BM25_K1: float = 1.5
+    BM25_B: float = 0.75
+    RAG_PARTITION_FIELDS: List[str] = ["category"]  # add "difficulty" or "question_type" for finer sub-indexes
+    QUERY_CACHE_SIZE: int = 1000  # cached RAG answers (LRU); entries expire after CACHE_TTL
+    QUERY_CACHE_SIMILARITY: float = 0.92  # cosine similarity for a semantic cache hit
+    LLM_BACKEND: str = "openai"  # or "deterministic" (offline, extractive; for tests and benchmarks)
+    LLM_CACHE_SIZE: int = 1000  # cached LLM responses (LRU); entries expire after CACHE_TTL
+    RAG_QUESTION_FILES: List[str] = [
+        "data/technical_questions.json",
+        "data/behavioral_questions.json",
+        "data/hr_questions.json"
+    ]  # question banks indexed for the streaming RAG endpoint
+    DEDUP_QUESTIONS: bool = True  # merge near-duplicate question/answer pairs on ingestion
+    DEDUP_THRESHOLD: float = 0.7  # estimated Jaccard similarity of character shingles
+    DEDUP_NUM_PERM: int = 128  # MinHash permutations
+    DEDUP_SHINGLE_SIZE: int = 5  # characters per shingle
+    DEDUP_REPORT_PATH: str = "data/dedup_report.json"  # what was merged, written by the index builder and CLIs; "" disables
+    SHARED_INDEX: bool = False  # workers attach read-only to the published snapshot instead of building their own
+    SHARED_INDEX_DIR: str = "data/index_snapshots"  # versions/<version>/ + CURRENT pointer
+    SHARED_INDEX_KEEP: int = 2  # published versions kept on disk
+    SHARED_INDEX_CHECK_SECONDS: float = 5.0  # how often workers look for a newer version
+    
     class Config:
         case_sensitive = True
 
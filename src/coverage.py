@@ -0,0 +1,72 @@
+# src/coverage.py
+
+import re
+import numpy as np
+
+from src.utils import split_sentences
+
+def split_key_points(model_answer, min_words=3):
+    """
+    Split a model answer into key-point sentences.
+
+    Sentences are further split on semicolons; fragments shorter than
+    `min_words` words are merged into the previous point.
+
+    Args:
+        model_answer (str): Reference/model answer.
+        min_words (int): Minimum words for a fragment to stand as its own point.
+
+    Returns:
+        list: Key-point strings (the whole answer if it cannot be split).
+    """
+    points = []
+    for sentence in split_sentences(model_answer):
+        separator = " "
+        for fragment in re.split(r';\s*', sentence):
+            fragment = fragment.strip()
+            if not fragment:
+                continue
+            if points and len(fragment.split()) < min_words:
+                points[-1] = f"{points[-1]}{separator}{fragment}"
+            else:
+                points.append(fragment)
+            separator = "; "
+    if not points and model_answer and model_answer.strip():
+        points = [model_answer.strip()]
+    return points
+
+def coverage_from_vectors(key_points, sentence_vecs, point_vecs, threshold=0.6):
+    """
+    Decide which key points a candidate answer covers.
+
+    One (candidate sentence x key point) similarity matrix is computed from
+    L2-normalized embeddings; a key point counts as covered when its best
+    matching sentence reaches `threshold`.
+
+    Args:
+        key_points (list): Key-point strings, aligned with `point_vecs`.
+        sentence_vecs (np.ndarray): Embeddings of the candidate's sentences.
+        point_vecs (np.ndarray): Embeddings of the key points.
+        threshold (float): Cosine similarity needed to count a point as covered.
+
+    Returns:
+        dict: {
+            'covered': list,        # key points the answer addresses
+            'missed': list,         # key points it does not
+            'ratio': float,         # share of key points covered
+            'similarities': list    # best similarity per key point
+        }
+    """
+    if not key_points:
+        return {'covered': [], 'missed': [], 'ratio': 1.0, 'similarities': []}
+    if len(sentence_vecs) == 0:
+        best = np.zeros(len(key_points), dtype=np.float32)
+    else:
+        best = (np.asarray(sentence_vecs) @ np.asarray(point_vecs).T).max(axis=0)
+    hit = best >= threshold
+    return {
+        'covered': [p for p, h in zip(key_points, hit) if h],
+        'missed': [p for p, h in zip(key_points, hit) if not h],
+        'ratio': float(hit.mean()),
+        'similarities': [round(float(b), 4) for b in best]
+    }
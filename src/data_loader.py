@@ -3,14 +3,136 @@
 import json
 import os
 
+from src.config import settings
+from src.dedup import deduplicate
+
+def extract_question_items(data):
+    """
+    Return the list of question entries from a loaded question-bank JSON file.
+
+    Accepts a bare list or an object wrapping the list under any key
+    (e.g. {"questions": [...]} or {"behavioral_questions": [...]}).
+    """
+    if isinstance(data, dict):
+        for value in data.values():
+            if isinstance(value, list):
+                return value
+        return []
+    return data if isinstance(data, list) else []
+
+def get_model_answer(item):
+    """
+    Return the reference answer of a question entry ('model_answer' or 'answer').
+    """
+    return item.get("model_answer") or item.get("answer", "")
+
+READ_BLOCK_SIZE = 1 << 16
+
+class _JsonStream:
+    """
+    Minimal incremental reader over a JSON text file, one value at a time.
+    """
+
+    def __init__(self, f, block_size=READ_BLOCK_SIZE):
+        self.f = f
+        self.block_size = block_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.block_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self):
+        ch = self.peek()
+        self.pos += 1
+        return ch
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A value ending at the buffer edge (e.g. a number) may continue in the next block
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def array_items(self):
+        """Yield the items of the array starting at the current position."""
+        self.take()
+        if self.peek() == "]":
+            self.take()
+            return
+        while True:
+            yield self.value()
+            if self.take() != ",":
+                return
+
+def iter_question_items(path, block_size=READ_BLOCK_SIZE):
+    """
+    Yield the question entries of a JSON file without loading the whole file.
+
+    Accepts the same shapes as extract_question_items: a bare
+    list, or an object whose first list value holds the questions.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f, block_size)
+        first = stream.peek()
+        if first == "[":
+            yield from stream.array_items()
+            return
+        if first != "{":
+            return
+        stream.take()
+        while stream.peek() not in ("}", ""):
+            stream.value()  # key
+            stream.take()  # ':'
+            if stream.peek() == "[":
+                yield from stream.array_items()
+                return
+            stream.value()
+            if stream.peek() == ",":
+                stream.take()
+
 def load_questions(
     technical_path="data/technical_questions.json",
     behavioral_path="data/behavioral_questions.json",
-    hr_path="data/hr_questions.json"
+    hr_path="data/hr_questions.json",
+    dedup=None,
+    dedup_report=None
 ):
     """
     Load and combine technical, behavioral, and HR questions from JSON files.
 
+    Near-duplicate question/answer pairs (e.g. the same question reworded in
+    two sources) are merged into their first occurrence when `dedup`
+    (default settings.DEDUP_QUESTIONS) is set. What was merged is written to
+    `dedup_report` only when a path is given (e.g. settings.DEDUP_REPORT_PATH
+    from a CLI), so loading the bank has no side effects. See dedup.deduplicate.
+
     Returns:
         questions (list): List of dicts with keys: 'category', 'text', 'model_answer'
     """
@@ -23,20 +145,27 @@ def load_questions(
             return []
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
-        # Assume each entry has 'question' and 'model_answer' keys
+        # Each entry has a 'question' and a 'model_answer' (or 'answer') key
         return [
             {
                 "category": category_name,
                 "text": q.get("question", ""),
-                "model_answer": q.get("model_answer", "")
+                "model_answer": get_model_answer(q)
             }
-            for q in data
+            for q in extract_question_items(data)
         ]
 
     questions += load_category(technical_path, "Technical")
     questions += load_category(behavioral_path, "Behavioral")
     questions += load_category(hr_path, "HR")
 
+    if settings.DEDUP_QUESTIONS if dedup is None else dedup:
+        questions, _ = deduplicate(
+            questions,
+            text_fn=lambda q: f"{q['text']}\n{q['model_answer']}",
+            label_fn=lambda q: {"category": q["category"], "question": q["text"]},
+            report_path=dedup_report
+        )
     return questions
 
 def save_questions(questions, out_path="data/all_questions.json"):
@@ -48,7 +177,7 @@ def save_questions(questions, out_path="data/all_questions.json"):
 
 # Example usage (for testing/demo)
 if __name__ == "__main__":
-    questions = load_questions()
+    questions = load_questions(dedup_report=settings.DEDUP_REPORT_PATH)
     print(f"Loaded {len(questions)} questions.")
     print("Sample:", questions[0] if questions else "No questions found.")
     save_questions(questions)
@@ -0,0 +1,170 @@
+# src/dedup.py
+
+import json
+import os
+import re
+import numpy as np
+
+from src.config import settings
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+def normalize_for_dedup(text):
+    """
+    Lowercase words only, separated by single spaces; punctuation and layout are ignored.
+    """
+    return " ".join(_WORD.findall((text or "").lower()))
+
+def shingles(text, size):
+    """
+    Distinct character `size`-grams (size <= 8) of the normalized text, each
+    packed losslessly into a uint64.
+    """
+    data = np.frombuffer(normalize_for_dedup(text).encode("ascii"), dtype=np.uint8).astype(np.uint64)
+    if not len(data):
+        return data
+    if len(data) < size:
+        size = len(data)
+    count = len(data) - size + 1
+    packed = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        packed |= data[offset:offset + count] << np.uint64(8 * offset)
+    return np.unique(packed)
+
+def lsh_bands(threshold, num_perm):
+    """
+    Pick (bands, rows) with bands * rows == num_perm so that entries whose
+    Jaccard similarity is about `threshold` or more share at least one band:
+    the largest LSH threshold (1 / bands) ** (1 / rows) not above `threshold`.
+    """
+    candidates = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    below = [(b, r) for b, r in candidates if (1 / b) ** (1 / r) <= threshold]
+    return max(below, key=lambda band: (1 / band[0]) ** (1 / band[1])) if below else candidates[-1]
+
+class NearDuplicateIndex:
+    """
+    Streaming near-duplicate detection with MinHash signatures and LSH banding.
+
+    Entries are added one at a time. An entry whose estimated Jaccard
+    similarity (over character shingles) to an entry kept earlier reaches
+    `threshold` is merged into that entry's cluster; otherwise it is kept.
+    Only entries sharing an LSH band are compared, so a pass over n entries
+    costs roughly O(n). The first entry of every cluster is its canonical
+    entry, so results follow the input order.
+    """
+
+    def __init__(self, threshold=None, num_perm=None, shingle_size=None, seed=0):
+        """
+        Args:
+            threshold (float): Estimated Jaccard similarity for a duplicate (default settings.DEDUP_THRESHOLD).
+            num_perm (int): MinHash permutations (default settings.DEDUP_NUM_PERM).
+            shingle_size (int): Characters per shingle (default settings.DEDUP_SHINGLE_SIZE).
+        """
+        self.threshold = settings.DEDUP_THRESHOLD if threshold is None else threshold
+        self.num_perm = num_perm or settings.DEDUP_NUM_PERM
+        self.shingle_size = shingle_size or settings.DEDUP_SHINGLE_SIZE
+        if not 1 <= self.shingle_size <= 8:
+            raise ValueError("shingle_size must be between 1 and 8 characters")
+        self.bands, self.rows = lsh_bands(self.threshold, self.num_perm)
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash functions (odd multipliers; products wrap mod 2^64)
+        self._a = rng.integers(0, 1 << 63, size=(self.num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=(self.num_perm, 1), dtype=np.uint64)
+        self._band_weights = rng.integers(0, 1 << 63, size=self.rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._buckets = {}
+        self._signatures = np.empty((0, self.num_perm), dtype=np.uint64)
+        self._clusters = []
+        self.entries = 0
+
+    def signature(self, text):
+        """
+        MinHash signature of a text, or None if it has no shingles.
+        """
+        packed = shingles(text, self.shingle_size)
+        if not len(packed):
+            return None
+        return ((self._a * packed + self._b) >> np.uint64(32)).min(axis=1)
+
+    def add(self, text, label=None):
+        """
+        Add one entry.
+
+        Args:
+            text (str): Text compared between entries.
+            label: JSON-serializable description of the entry for the report.
+
+        Returns:
+            bool: True if the entry is kept, False if it duplicates a kept entry.
+        """
+        self.entries += 1
+        signature = self.signature(text)
+        if signature is None:
+            return True
+        # One 64-bit key per band; a collision only costs an extra comparison
+        keys = list(enumerate((signature.reshape(self.bands, self.rows) * self._band_weights).sum(axis=1).tolist()))
+
+        candidates = list({c for key in keys for c in self._buckets.get(key, ())})
+        if candidates:
+            similarities = np.mean(self._signatures[candidates] == signature, axis=1)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                self._clusters[candidates[best]]["merged"].append(
+                    {"entry": label, "similarity": round(float(similarities[best]), 3)}
+                )
+                return False
+
+        kept = len(self._clusters)
+        if kept == len(self._signatures):
+            # Grow geometrically so adding n entries copies O(n) rows
+            grown = np.empty((max(64, 2 * kept), self.num_perm), dtype=np.uint64)
+            grown[:kept] = self._signatures
+            self._signatures = grown
+        self._signatures[kept] = signature
+        self._clusters.append({"kept": label, "merged": []})
+        for key in keys:
+            self._buckets.setdefault(key, []).append(kept)
+        return True
+
+    def report(self):
+        """
+        Return the settings, counts and every cluster that had entries merged into it.
+        """
+        clusters = [cluster for cluster in self._clusters if cluster["merged"]]
+        return {
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows": self.rows,
+            "shingle_size": self.shingle_size,
+            "entries": self.entries,
+            "merged": sum(len(cluster["merged"]) for cluster in clusters),
+            "clusters": clusters
+        }
+
+    def write_report(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+def deduplicate(items, text_fn, label_fn=None, threshold=None, report_path=None):
+    """
+    Keep one canonical entry (the first) per cluster of near-duplicate items.
+
+    Args:
+        items (iterable): Entries to deduplicate.
+        text_fn (callable): Maps an entry to the text compared, e.g. question and answer.
+        label_fn (callable, optional): Maps an entry to its description in the report.
+        threshold (float): See NearDuplicateIndex.
+        report_path (str, optional): Write the merge report here when anything was merged.
+
+    Returns:
+        tuple: (kept entries in input order, report dict)
+    """
+    index = NearDuplicateIndex(threshold)
+    kept = [item for item in items if index.add(text_fn(item), label_fn(item) if label_fn else None)]
+    report = index.report()
+    if report_path and report["merged"]:
+        index.write_report(report_path)
+    return kept, report
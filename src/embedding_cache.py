@@ -0,0 +1,226 @@
+# src/embedding_cache.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+def normalize_text(text):
+    """
+    Normalize text for cache lookups: Unicode NFKC, collapsed whitespace, trimmed.
+    Case is kept because not every encoder is uncased.
+    """
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def cache_key(text, model_id):
+    """
+    Build the cache key for a text encoded by a given model.
+    """
+    payload = f"{model_id}\0{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: a bounded in-process LRU in front of a SQLite store.
+
+    Entries are keyed by the hash of the normalized text and the model id, so
+    the same store can be shared by several encoders. The SQLite tier is
+    bounded too: every row records when it was last used, and every
+    `prune_every` inserted rows the store drops rows unused for `ttl_seconds`
+    and then the least recently used rows beyond `max_disk_items`. Safe to
+    use from multiple threads.
+    """
+
+    def __init__(self, model_id, db_path="data/embeddings/cache.sqlite3", max_items=10000,
+                 max_disk_items=200000, ttl_seconds=30 * 24 * 3600, prune_every=1000):
+        """
+        Args:
+            model_id (str): Encoder identity, part of every key.
+            db_path (str): SQLite file of the disk tier.
+            max_items (int): In-memory LRU entries.
+            max_disk_items (int): Rows kept in SQLite; 0 disables the cap.
+            ttl_seconds (float): Rows unused this long are deleted; 0 disables expiry.
+            prune_every (int): Inserted rows between two prunes of the SQLite tier.
+        """
+        self.model_id = model_id
+        self.db_path = db_path
+        self.max_items = max_items
+        self.max_disk_items = max_disk_items
+        self.ttl_seconds = ttl_seconds
+        self.prune_every = prune_every
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        # key -> last use, written to SQLite with the next insert or prune
+        self._touched = {}
+        self._inserted = 0
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    def _db(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, dtype TEXT NOT NULL, vector BLOB NOT NULL, "
+                "last_used REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+            if "last_used" not in columns:
+                # Stores created before the disk tier was bounded: their rows count as used now
+                self._conn.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+                self._conn.execute("UPDATE embeddings SET last_used = ?", (time.time(),))
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, text):
+        """
+        Return the cached embedding for `text`, or None on a miss.
+        """
+        key = cache_key(text, self.model_id)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._touch(key)
+                self.hits_memory += 1
+                return vector
+            row = self._db().execute(
+                "SELECT dtype, vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            vector = np.frombuffer(row[1], dtype=row[0])
+            self._remember(key, vector)
+            self._touch(key)
+            self.hits_disk += 1
+            return vector
+
+    def put_many(self, texts, vectors):
+        """
+        Store embeddings for `texts` in both tiers.
+        """
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vector = np.array(vector)
+                vector.setflags(write=False)
+                key = cache_key(text, self.model_id)
+                self._remember(key, vector)
+                self._touched.pop(key, None)
+                rows.append((key, vector.dtype.str, vector.tobytes(), now))
+            conn = self._db()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dtype, vector, last_used) VALUES (?, ?, ?, ?)", rows
+            )
+            self._flush_touched(conn)
+            conn.commit()
+            self._inserted += len(rows)
+            if self.prune_every and self._inserted >= self.prune_every:
+                self._prune(conn, now)
+
+    def _touch(self, key):
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.max_items:
+            # Read-only workloads never insert, so flush here as well
+            conn = self._db()
+            self._flush_touched(conn)
+            conn.commit()
+
+    def _flush_touched(self, conn):
+        if self._touched:
+            conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _prune(self, conn, now):
+        self._inserted = 0
+        self._flush_touched(conn)
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM embeddings WHERE last_used < ?", (now - self.ttl_seconds,))
+        if self.max_disk_items:
+            conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                "SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_items,)
+            )
+        conn.commit()
+
+    def prune(self):
+        """
+        Apply the SQLite tier's TTL and row cap now.
+
+        Returns:
+            int: Rows left in the SQLite tier.
+        """
+        with self._lock:
+            conn = self._db()
+            self._prune(conn, time.time())
+            return conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def encode(self, texts, encode_fn):
+        """
+        Return embeddings for `texts`, calling `encode_fn` once for all misses.
+
+        Args:
+            texts (list): Texts to embed.
+            encode_fn (callable): Maps a list of texts to a 2D array of embeddings.
+
+        Returns:
+            np.ndarray: One row per input text, in input order.
+        """
+        texts = list(texts)
+        found = [self.get(text) for text in texts]
+        missing = list(dict.fromkeys(t for t, v in zip(texts, found) if v is None))
+        if missing:
+            encoded = np.asarray(encode_fn(missing))
+            self.put_many(missing, encoded)
+            fresh = dict(zip(missing, encoded))
+            found = [fresh[t] if v is None else v for t, v in zip(texts, found)]
+        if not found:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(found)
+
+    def stats(self):
+        """
+        Return hit/miss counters and the current in-memory size.
+        """
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+            "memory_items": len(self._memory)
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touched(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,123 @@
+# src/embedding_index.py
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+def content_hash(text):
+    """
+    Return a stable SHA-256 hex digest for a piece of text.
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+class ModelAnswerIndex:
+    """
+    Precomputed embeddings for the model answers of the question bank.
+
+    Vectors live in `<name>.npy` (opened memory-mapped, read-only) next to a
+    `<name>.json` manifest holding the encoder version and the content hash of
+    every row. Rebuilding only encodes texts whose hash is not already stored.
+    """
+
+    def __init__(self, encoder_version, index_dir="data/embeddings", name="model_answers"):
+        self.encoder_version = encoder_version
+        self.index_dir = index_dir
+        self.vectors_path = os.path.join(index_dir, f"{name}.npy")
+        self.manifest_path = os.path.join(index_dir, f"{name}.json")
+        self._vectors = None
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def load(self):
+        """
+        Memory-map the stored vectors if they were built by the same encoder.
+
+        Returns:
+            bool: True if an index was loaded.
+        """
+        if not (os.path.exists(self.vectors_path) and os.path.exists(self.manifest_path)):
+            return False
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("encoder_version") != self.encoder_version:
+            return False
+        self._vectors = np.load(self.vectors_path, mmap_mode="r")
+        self._rows = {h: row for row, h in enumerate(manifest.get("hashes", []))}
+        return True
+
+    def get(self, text):
+        """
+        Return the stored embedding for `text`, or None if it is not indexed.
+        """
+        row = self._rows.get(content_hash(text))
+        if row is None:
+            return None
+        return np.asarray(self._vectors[row])
+
+    def build(self, texts, encode_fn):
+        """
+        Bring the index in line with `texts`, encoding only new or changed entries.
+
+        Args:
+            texts (list): Model answers of the current question bank.
+            encode_fn (callable): Maps a list of texts to a 2D array of embeddings.
+
+        Returns:
+            int: Number of texts that had to be encoded.
+        """
+        unique = {}
+        for text in texts:
+            if text and text.strip():
+                unique.setdefault(content_hash(text), text)
+        hashes = list(unique)
+        if not hashes:
+            return 0
+        if self._vectors is not None and set(hashes) == set(self._rows):
+            return 0
+
+        missing = [h for h in hashes if h not in self._rows]
+        fresh = {}
+        if missing:
+            encoded = np.asarray(encode_fn([unique[h] for h in missing]), dtype=np.float32)
+            fresh = dict(zip(missing, encoded))
+
+        matrix = np.stack([
+            fresh[h] if h in fresh else np.asarray(self._vectors[self._rows[h]], dtype=np.float32)
+            for h in hashes
+        ])
+        self._write(matrix, hashes)
+        return len(missing)
+
+    def _write(self, matrix, hashes):
+        os.makedirs(self.index_dir, exist_ok=True)
+        # Release the current mapping before the file underneath it is replaced
+        self._vectors = None
+        # Unique temporary names, so concurrent builders never write the same file
+        tmp_vectors = temp_path(self.vectors_path)
+        tmp_manifest = temp_path(self.manifest_path)
+        try:
+            with open(tmp_vectors, "wb") as f:
+                np.save(f, matrix)
+            with open(tmp_manifest, "w", encoding="utf-8") as f:
+                json.dump({"encoder_version": self.encoder_version, "hashes": hashes}, f)
+            os.replace(tmp_vectors, self.vectors_path)
+            os.replace(tmp_manifest, self.manifest_path)
+        finally:
+            for path in (tmp_vectors, tmp_manifest):
+                if os.path.exists(path):
+                    os.remove(path)
+        self._vectors = np.load(self.vectors_path, mmap_mode="r")
+        self._rows = {h: row for row, h in enumerate(hashes)}
+
+def temp_path(path):
+    """
+    Create an empty, uniquely named file next to `path` and return its name.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory or ".")
+    os.close(fd)
+    return tmp_path
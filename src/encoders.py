@@ -0,0 +1,241 @@
+# src/encoders.py
+
+import os
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+class SentenceTransformerBackend:
+    """
+    Reference fp32 encoder: a plain SentenceTransformer.
+    """
+    name = "sentence-transformers"
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    @property
+    def max_seq_length(self):
+        return self.model.max_seq_length
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=convert_to_numpy,
+            normalize_embeddings=normalize_embeddings,
+            **kwargs
+        )
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    """
+    SentenceTransformer with its Linear layers dynamically quantized to int8.
+
+    Weights are stored as int8 and activations are quantized on the fly, which
+    roughly halves the forward-pass cost on CPU for MiniLM-sized models.
+    """
+    name = "torch-int8"
+
+    def __init__(self, model_name):
+        super().__init__(model_name)
+        self.model.eval()
+        self.model = torch.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+class OnnxBackend:
+    """
+    ONNX Runtime encoder with mean pooling, matching SentenceTransformer output.
+
+    The transformer is exported to `<onnx_dir>/<model>.onnx` on first use and
+    optionally quantized to int8 with onnxruntime's dynamic quantizer.
+    """
+    name = "onnx"
+
+    def __init__(self, model_name, onnx_dir="data/onnx", quantize=True):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The 'onnx' encoder backend requires onnxruntime (pip install onnxruntime onnx).") from e
+
+        reference = SentenceTransformer(model_name, device="cpu")
+        self.model_name = model_name
+        self.tokenizer = reference.tokenizer
+        self.max_seq_length = reference.max_seq_length
+
+        base_name = model_name.replace("/", "__")
+        onnx_path = os.path.join(onnx_dir, f"{base_name}.onnx")
+        if not os.path.exists(onnx_path):
+            self._export(reference, onnx_path)
+        if quantize:
+            quantized_path = os.path.join(onnx_dir, f"{base_name}.int8.onnx")
+            if not os.path.exists(quantized_path):
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+            onnx_path = quantized_path
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def _export(self, reference, onnx_path):
+        os.makedirs(os.path.dirname(onnx_path), exist_ok=True)
+        transformer = reference[0].auto_model.eval()
+        dummy = self.tokenizer(["warm up"], return_tensors="pt")
+        names = ["input_ids", "attention_mask", "token_type_ids"]
+        names = [n for n in names if n in dummy]
+        dynamic_axes = {n: {0: "batch", 1: "sequence"} for n in names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        torch.onnx.export(
+            transformer,
+            tuple(dummy[n] for n in names),
+            onnx_path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17
+        )
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer(
+                list(texts[start:start + batch_size]),
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            feeds = {k: v.astype(np.int64) for k, v in batch.items() if k in self._input_names}
+            hidden = self.session.run(None, feeds)[0]
+            # Mean pooling over real (non-padding) tokens
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            outputs.append(pooled.astype(np.float32))
+        embeddings = np.concatenate(outputs) if outputs else np.empty((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+ENCODER_BACKENDS = {
+    SentenceTransformerBackend.name: SentenceTransformerBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+def load_encoder(backend, model_name):
+    """
+    Instantiate an encoder backend by name.
+
+    Args:
+        backend (str): One of ENCODER_BACKENDS ('sentence-transformers', 'torch-int8', 'onnx').
+        model_name (str): SentenceTransformer model id.
+
+    Returns:
+        An object with an `encode(texts, batch_size, normalize_embeddings)` method.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Choose from: {', '.join(ENCODER_BACKENDS)}")
+    return ENCODER_BACKENDS[backend](model_name)
+
+# --- Length-bucketed encoding ---
+
+# Characters kept per allowed token before tokenizing, so a pathological
+# multi-megabyte answer is cut down before the tokenizer ever sees it.
+MAX_CHARS_PER_TOKEN = 16
+
+def cap_token_lengths(tokenizer, texts, max_tokens):
+    """
+    Apply the hard token cap and return the (possibly truncated) texts with their lengths.
+
+    Truncation policy: a text longer than `max_tokens` word pieces (including
+    the [CLS]/[SEP] special tokens) keeps its first `max_tokens` pieces and the
+    rest is dropped (head truncation), mirroring what the encoder would do
+    with its own max_seq_length but applied before batching.
+
+    Args:
+        tokenizer: Hugging Face fast tokenizer, or None to count whitespace tokens.
+        texts (list): Texts to measure.
+        max_tokens (int): Hard cap, special tokens included.
+
+    Returns:
+        (texts, lengths): Capped texts and their token counts.
+    """
+    limit = max(1, max_tokens - 2)
+    texts = [(t or "")[: max_tokens * MAX_CHARS_PER_TOKEN] for t in texts]
+    if tokenizer is None or not getattr(tokenizer, "is_fast", False):
+        capped, lengths = [], []
+        for text in texts:
+            words = text.split()
+            if len(words) > limit:
+                text = " ".join(words[:limit])
+            capped.append(text)
+            lengths.append(min(len(words), limit) + 2)
+        return capped, lengths
+
+    encoded = tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True,
+                        truncation=False, verbose=False)
+    capped, lengths = [], []
+    for text, offsets in zip(texts, encoded["offset_mapping"]):
+        if len(offsets) > limit:
+            text = text[: offsets[limit - 1][1]]
+        capped.append(text)
+        lengths.append(min(len(offsets), limit) + 2)
+    return capped, lengths
+
+def encode_bucketed(encoder, texts, batch_size=32, max_tokens=256, bucket_width=32, normalize_embeddings=True):
+    """
+    Encode texts grouped into token-length buckets to cut padding waste.
+
+    Texts are capped (see cap_token_lengths), grouped into buckets of
+    `bucket_width` tokens, and each bucket is encoded in its own batches so
+    short answers are never padded to the length of a long one. Results are
+    returned in the original order.
+
+    Args:
+        encoder: Object with `encode(texts, batch_size, normalize_embeddings)`
+            and, ideally, `tokenizer` and `max_seq_length` attributes.
+        texts (list): Texts to encode.
+        batch_size (int): Maximum texts per encoder call.
+        max_tokens (int): Hard per-text token cap.
+        bucket_width (int): Token span of each length bucket.
+        normalize_embeddings (bool): L2-normalize the output rows.
+
+    Returns:
+        np.ndarray: One embedding per input text.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    max_tokens = min(max_tokens, getattr(encoder, "max_seq_length", None) or max_tokens)
+    capped, lengths = cap_token_lengths(getattr(encoder, "tokenizer", None), texts, max_tokens)
+
+    buckets = {}
+    for i, length in enumerate(lengths):
+        buckets.setdefault(length // bucket_width, []).append(i)
+
+    embeddings = None
+    for key in sorted(buckets):
+        members = buckets[key]
+        for start in range(0, len(members), batch_size):
+            rows = members[start:start + batch_size]
+            vectors = np.asarray(encoder.encode(
+                [capped[i] for i in rows],
+                batch_size=len(rows),
+                convert_to_numpy=True,
+                normalize_embeddings=normalize_embeddings
+            ))
+            if embeddings is None:
+                embeddings = np.empty((len(texts), vectors.shape[1]), dtype=vectors.dtype)
+            embeddings[rows] = vectors
+    return embeddings
@@ -1,64 +1,553 @@
 # src/evaluation.py
 
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import time
 import numpy as np
+from sentence_transformers import CrossEncoder
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+from src.config import settings
+from src.coverage import coverage_from_vectors, split_key_points
+from src.embedding_cache import EmbeddingCache
+from src.embedding_index import ModelAnswerIndex
+from src.encoders import encode_bucketed, load_encoder
+from src.shared_index import IndexSnapshots, SharedSnapshot
+from src.utils import split_sentences
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+DEFAULT_BATCH_SIZE = 64
 
 # Efficient model loading (singleton pattern)
 _model = None
 def get_model():
+    """
+    Return the sentence encoder for the backend selected by settings.ENCODER_BACKEND.
+    """
     global _model
     if _model is None:
-        _model = SentenceTransformer('all-MiniLM-L6-v2')
+        _model = load_encoder(settings.ENCODER_BACKEND, MODEL_NAME)
     return _model
 
-def evaluate_answer(answer, model_answer):
+def get_encoder_version():
+    """
+    Identify the encoder so persisted embeddings are invalidated when it changes.
+    """
+    return f"{MODEL_NAME}:{settings.ENCODER_BACKEND}:normalized"
+
+def encode_texts(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Encode texts into L2-normalized embeddings (one row per text).
+
+    Texts are length-bucketed and capped at settings.ENCODER_MAX_TOKENS
+    (see encoders.encode_bucketed for the truncation policy).
+    """
+    return encode_bucketed(
+        get_model(),
+        texts,
+        batch_size=batch_size,
+        max_tokens=settings.ENCODER_MAX_TOKENS,
+        bucket_width=settings.ENCODER_BUCKET_WIDTH
+    )
+
+_embedding_cache = None
+def get_embedding_cache():
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            get_encoder_version(),
+            db_path=settings.EMBEDDING_CACHE_PATH,
+            max_items=settings.EMBEDDING_CACHE_SIZE,
+            max_disk_items=settings.EMBEDDING_CACHE_DISK_ITEMS,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS
+        )
+    return _embedding_cache
+
+def _load_answer_indexes(index_dir, load=True):
+    indexes = (
+        ModelAnswerIndex(get_encoder_version(), index_dir=index_dir),
+        ModelAnswerIndex(get_encoder_version(), index_dir=index_dir, name="key_points")
+    )
+    if load:
+        for index in indexes:
+            index.load()
+    return indexes
+
+# settings.SHARED_INDEX: (model answers, key points) memory-mapped from the live snapshot
+_shared_answer_indexes = SharedSnapshot(_load_answer_indexes)
+
+def _shared_indexes():
+    try:
+        return _shared_answer_indexes.get()
+    except FileNotFoundError:
+        # Nothing published yet: empty indexes until index_model_answers publishes
+        return _load_answer_indexes(settings.SHARED_INDEX_DIR, load=False)
+
+_model_answer_index = None
+def get_model_answer_index():
+    global _model_answer_index
+    if settings.SHARED_INDEX:
+        return _shared_indexes()[0]
+    if _model_answer_index is None:
+        _model_answer_index = ModelAnswerIndex(
+            get_encoder_version(),
+            index_dir=settings.EMBEDDING_INDEX_DIR
+        )
+        _model_answer_index.load()
+    return _model_answer_index
+
+_key_point_index = None
+def get_key_point_index():
+    global _key_point_index
+    if settings.SHARED_INDEX:
+        return _shared_indexes()[1]
+    if _key_point_index is None:
+        _key_point_index = ModelAnswerIndex(
+            get_encoder_version(),
+            index_dir=settings.EMBEDDING_INDEX_DIR,
+            name="key_points"
+        )
+        _key_point_index.load()
+    return _key_point_index
+
+def index_model_answers(questions, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Precompute embeddings for every model answer of a loaded question bank,
+    and for the key points each model answer is split into.
+
+    Only texts that changed since the last build are encoded. The lexical
+    pre-scorer's IDF weights are fitted on the same bank. With
+    settings.SHARED_INDEX the indexes are built into a new snapshot version,
+    published only if anything had to be encoded.
+
+    Args:
+        questions (list): Dicts as returned by data_loader.load_questions.
+        batch_size (int): Number of texts per encoder forward pass.
+
+    Returns:
+        int: Number of texts that were (re)encoded.
+    """
+    model_answers = [q.get("model_answer", "") for q in questions]
+    key_points = [p for answer in model_answers for p in split_key_points(answer)]
+    encode = lambda texts: encode_texts(texts, batch_size=batch_size)
+    if settings.SHARED_INDEX:
+        counts = []
+        def build(index_dir):
+            answer_index, key_point_index = _load_answer_indexes(index_dir)
+            counts.append(answer_index.build(model_answers, encode) + key_point_index.build(key_points, encode))
+        IndexSnapshots().publish(build)
+        encoded = counts[0]
+    else:
+        encoded = get_model_answer_index().build(model_answers, encode)
+        encoded += get_key_point_index().build(key_points, encode)
+    get_lexical_prescorer().fit(
+        [q.get("text", "") for q in questions] + model_answers
+    )
+    return encoded
+
+def embed_texts(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Return {text: embedding} for `texts` with a single batched encode.
+
+    Model answers and key points come from their precomputed indexes; all
+    other texts go through the embedding cache, which encodes the misses.
+    """
+    indexes = (get_model_answer_index(), get_key_point_index())
+    vectors = {}
+    for text in dict.fromkeys(texts):
+        for index in indexes:
+            vector = index.get(text)
+            if vector is not None:
+                vectors[text] = vector
+                break
+    missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+    if missing:
+        embeddings = get_embedding_cache().encode(
+            missing,
+            lambda batch: encode_texts(batch, batch_size=batch_size)
+        )
+        vectors.update(zip(missing, embeddings))
+    return vectors
+
+def evaluate_answer(answer, model_answer, chunked=None):
     """
     Evaluate a candidate's answer against the model answer using semantic similarity.
 
     Args:
         answer (str): Candidate's answer.
         model_answer (str): Reference/model answer.
+        chunked (bool, optional): Score sentence windows instead of the whole
+            answer. None chooses automatically from the answer length.
 
     Returns:
         score (float): Score between 0 and 5.
         feedback (str): Textual feedback.
     """
-    if not answer or not answer.strip():
-        return 0.0, "No answer provided."
+    return evaluate_answers([(answer, model_answer)], chunked=chunked)[0]
+
+def evaluate_answers(pairs, batch_size=DEFAULT_BATCH_SIZE, chunked=None, return_coverage=False, cascade=None):
+    """
+    Evaluate many (answer, model_answer) pairs in one pass.
+
+    Scoring runs as a cascade (unless `cascade` or settings.SCORING_CASCADE
+    is off):
+      1. A lexical pre-check short-circuits empty or near-empty answers (too
+         few words, or no content words at all). Answers that share no words
+         with the model answer still go to the bi-encoder, since correct
+         paraphrases often do.
+      2. The bi-encoder scores everything else. All texts involved (answers,
+         their sentences, model answers and key points) are embedded with one
+         batched encode (see embed_texts), and the similarities come from a
+         single row-wise dot product of the normalized embeddings.
+      3. A cross-encoder re-scores only answers close to the 3.0 / 3.5
+         decision thresholds.
+    Per-tier hit counts and latencies are available from get_cascade_stats.
+
+    Long answers (more than settings.SCORING_CHUNK_MIN_WORDS words when
+    `chunked` is None) are scored as overlapping sentence windows whose
+    similarities are combined with aggregate_similarities.
+
+    Feedback names the key points of the model answer that the candidate
+    missed (see score_coverage).
+
+    Args:
+        pairs (iterable): (answer, model_answer) tuples.
+        batch_size (int): Number of texts per encoder forward pass.
+        chunked (bool, optional): Force chunked scoring on or off.
+        return_coverage (bool): Append the coverage dict to each result.
+        cascade (bool, optional): Force the lexical and cross-encoder tiers on or off.
+
+    Returns:
+        list: (score, feedback) tuples, or (score, feedback, coverage) when
+        `return_coverage` is set, in the same order as `pairs`.
+    """
+    pairs = [(answer, model_answer or "") for answer, model_answer in pairs]
+    key_points = [split_key_points(model_answer) for _, model_answer in pairs]
+    results = [
+        (0.0, "No answer provided.", coverage_from_vectors(points, [], []))
+        for points in key_points
+    ]
+    cascade = settings.SCORING_CASCADE if cascade is None else cascade
+
+    scored = [i for i, (answer, _) in enumerate(pairs) if answer and answer.strip()]
+    if scored and cascade:
+        started = time.perf_counter()
+        rejected = get_lexical_prescorer().reject(
+            [pairs[i] for i in scored],
+            min_words=settings.CASCADE_MIN_WORDS,
+            min_content_words=settings.CASCADE_MIN_CONTENT_WORDS,
+            floor=settings.CASCADE_LEXICAL_FLOOR
+        )
+        for i, reject in zip(scored, rejected):
+            if reject:
+                answer, model_answer = pairs[i]
+                score = settings.CASCADE_REJECT_SCORE
+                coverage = coverage_from_vectors(key_points[i], [], [])
+                results[i] = (score, generate_feedback(answer, score, model_answer, coverage), coverage)
+        scored = [i for i, reject in zip(scored, rejected) if not reject]
+        _record_tier("lexical", len(rejected) - len(scored), started)
+
+    if scored:
+        started = time.perf_counter()
+        similarities, coverages = _bi_encoder_scores(
+            [pairs[i] for i in scored], [key_points[i] for i in scored], batch_size, chunked
+        )
+        _record_tier("bi_encoder", len(scored), started)
+
+        if cascade and settings.CASCADE_CROSS_ENCODER:
+            borderline = [
+                k for k, similarity in enumerate(similarities)
+                if is_borderline(round(float(similarity) * 5, 2))
+            ]
+            if borderline:
+                started = time.perf_counter()
+                reranked = get_cross_encoder().predict(
+                    [pairs[scored[k]] for k in borderline], batch_size=batch_size
+                )
+                for k, similarity in zip(borderline, reranked):
+                    similarities[k] = float(similarity)
+                _record_tier("cross_encoder", len(borderline), started)
+
+        for i, similarity, coverage in zip(scored, similarities, coverages):
+            answer, model_answer = pairs[i]
+            # Map similarity (0 to 1) to score (0 to 5)
+            score = round(float(similarity) * 5, 2)
+            results[i] = (score, generate_feedback(answer, score, model_answer, coverage), coverage)
+
+    if return_coverage:
+        return results
+    return [(score, feedback) for score, feedback, _ in results]
+
+def _bi_encoder_scores(pairs, key_points, batch_size, chunked):
+    """
+    Score non-empty (answer, model_answer) pairs with the bi-encoder.
+
+    Returns:
+        (similarities, coverages): Answer similarity and key-point coverage per pair.
+    """
+    # Text segments scored for each answer (the whole answer or its
+    # windows) and the units checked against the key points
+    segments, units = [], []
+    for answer, _ in pairs:
+        use_windows = chunked if chunked is not None else (
+            len(answer.split()) > settings.SCORING_CHUNK_MIN_WORDS
+        )
+        if use_windows:
+            windows = sentence_windows(answer)
+            segments.append(windows)
+            units.append(windows)
+        else:
+            segments.append([answer])
+            units.append(split_sentences(answer) or [answer])
+
+    vectors = embed_texts(
+        [t for k, (_, model_answer) in enumerate(pairs)
+         for t in segments[k] + units[k] + [model_answer] + key_points[k]],
+        batch_size=batch_size
+    )
 
-    model = get_model()
-    embeddings = model.encode([answer, model_answer])
-    similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+    segment_vecs = np.stack([vectors[text] for texts in segments for text in texts])
+    model_vecs = np.stack([
+        vectors[model_answer] for (_, model_answer), texts in zip(pairs, segments) for _ in texts
+    ])
+    segment_similarities = np.einsum("ij,ij->i", segment_vecs, model_vecs)
 
-    # Map similarity (0 to 1) to score (0 to 5)
-    score = round(similarity * 5, 2)
+    similarities, coverages = [], []
+    offset = 0
+    for k, points in enumerate(key_points):
+        count = len(segments[k])
+        similarities.append(aggregate_similarities(segment_similarities[offset:offset + count]))
+        offset += count
+        coverages.append(coverage_from_vectors(
+            points,
+            np.stack([vectors[u] for u in units[k]]),
+            np.stack([vectors[p] for p in points]) if points else [],
+            threshold=settings.COVERAGE_THRESHOLD
+        ))
+    return similarities, coverages
 
-    feedback = generate_feedback(answer, score, model_answer)
-    return score, feedback
+def score_coverage(answer, model_answer):
+    """
+    Report which key points of the model answer a candidate's answer covers.
+
+    Returns:
+        dict: See coverage.coverage_from_vectors.
+    """
+    return evaluate_answers([(answer, model_answer)], return_coverage=True)[0][2]
+
+# --- Scoring cascade: lexical pre-score and cross-encoder rerank ---
+
+# Score thresholds the frontend acts on (feedback band and shortlisting)
+DECISION_THRESHOLDS = (3.0, 3.5)
+
+class LexicalPreScorer:
+    """
+    Cheap lexical checks used to short-circuit empty or near-empty answers,
+    with an optional vectorized TF-IDF similarity floor.
+
+    Terms are hashed, so words missing from the question bank still count
+    (with the highest IDF) instead of being dropped.
+    """
+
+    def __init__(self):
+        self.vectorizer = HashingVectorizer(
+            stop_words="english", alternate_sign=False, norm=None, n_features=2 ** 18
+        )
+        self.tfidf = TfidfTransformer(sublinear_tf=True)
+        self._analyzer = self.vectorizer.build_analyzer()
+        self.fitted = False
+
+    def fit(self, texts):
+        texts = [t for t in texts if t and t.strip()]
+        if texts:
+            self.tfidf.fit(self.vectorizer.transform(texts))
+            self.fitted = True
+        return self
+
+    def similarities(self, pairs):
+        """
+        Return the TF-IDF cosine similarity of each (answer, model_answer) pair.
+        """
+        if not self.fitted:
+            self.fit([model_answer for _, model_answer in pairs])
+        answers = self.tfidf.transform(self.vectorizer.transform([a for a, _ in pairs]))
+        references = self.tfidf.transform(self.vectorizer.transform([m for _, m in pairs]))
+        return np.asarray(answers.multiply(references).sum(axis=1)).ravel()
+
+    def content_words(self, text):
+        """
+        Return the words of `text` that are not English stop words.
+        """
+        return self._analyzer(text)
+
+    def reject(self, pairs, min_words=2, min_content_words=1, floor=None):
+        """
+        Flag empty or near-empty answers: fewer than `min_words` words or
+        fewer than `min_content_words` non-stop words.
+
+        A `floor` also flags answers whose TF-IDF similarity to the model
+        answer is at or below it. Off by default: a correct paraphrase can
+        share no words with the model answer.
+
+        Returns:
+            list: True for each pair that can skip the encoder.
+        """
+        rejected = [
+            len(answer.split()) < min_words or len(self.content_words(answer)) < min_content_words
+            for answer, _ in pairs
+        ]
+        if floor is not None and floor >= 0:
+            similarities = self.similarities(pairs)
+            rejected = [r or similarity <= floor for r, similarity in zip(rejected, similarities)]
+        return rejected
+
+_lexical_prescorer = None
+def get_lexical_prescorer():
+    global _lexical_prescorer
+    if _lexical_prescorer is None:
+        _lexical_prescorer = LexicalPreScorer()
+    return _lexical_prescorer
+
+_cross_encoder = None
+def get_cross_encoder():
+    global _cross_encoder
+    if _cross_encoder is None:
+        _cross_encoder = CrossEncoder(settings.CASCADE_CROSS_ENCODER, device="cpu")
+    return _cross_encoder
+
+def is_borderline(score):
+    """
+    True if a 0-5 score lies within settings.CASCADE_BORDER_MARGIN of a decision threshold.
+    """
+    return any(abs(score - t) <= settings.CASCADE_BORDER_MARGIN for t in DECISION_THRESHOLDS)
+
+_tier_stats = {
+    tier: {"hits": 0, "seconds": 0.0}
+    for tier in ("lexical", "bi_encoder", "cross_encoder")
+}
+
+def _record_tier(tier, hits, started):
+    _tier_stats[tier]["hits"] += hits
+    _tier_stats[tier]["seconds"] += time.perf_counter() - started
+
+def get_cascade_stats():
+    """
+    Return per-tier hit counts, hit rates and latencies of the scoring cascade.
+
+    `lexical` counts answers short-circuited by the pre-scorer, `bi_encoder`
+    answers scored by the bi-encoder, and `cross_encoder` the subset re-scored
+    near a decision threshold.
+    """
+    answered = _tier_stats["lexical"]["hits"] + _tier_stats["bi_encoder"]["hits"]
+    stats = {}
+    for tier, tier_stats in _tier_stats.items():
+        hits = tier_stats["hits"]
+        stats[tier] = {
+            "hits": hits,
+            "hit_rate": hits / answered if answered else 0.0,
+            "total_seconds": round(tier_stats["seconds"], 4),
+            "avg_ms_per_answer": round(tier_stats["seconds"] * 1000 / hits, 3) if hits else 0.0
+        }
+    return stats
+
+def pop_tier_counts():
+    """
+    Return and reset this process's raw tier counters, so a worker process
+    can hand them to the process that serves get_cascade_stats.
+    """
+    counts = {tier: dict(tier_stats) for tier, tier_stats in _tier_stats.items()}
+    for tier_stats in _tier_stats.values():
+        tier_stats["hits"] = 0
+        tier_stats["seconds"] = 0.0
+    return counts
+
+def merge_tier_counts(counts):
+    """Add raw tier counters returned by pop_tier_counts in another process."""
+    for tier, tier_counts in counts.items():
+        _tier_stats[tier]["hits"] += tier_counts["hits"]
+        _tier_stats[tier]["seconds"] += tier_counts["seconds"]
+
+# --- Chunked scoring of long answers ---
+
+def sentence_windows(text, window_size=None, stride=None, max_windows=None):
+    """
+    Split text into overlapping windows of consecutive sentences.
+
+    At most `max_windows` windows are returned (evenly spaced over the
+    answer, always including the first and last), so the encoder cost per
+    answer stays bounded however long the answer is.
+
+    Args:
+        text (str): Answer to split.
+        window_size (int): Sentences per window (default settings.SCORING_WINDOW_SENTENCES).
+        stride (int): Sentences between window starts (default settings.SCORING_WINDOW_STRIDE).
+        max_windows (int): Cap on windows per answer (default settings.SCORING_MAX_WINDOWS).
+
+    Returns:
+        list: Window texts.
+    """
+    window_size = window_size or settings.SCORING_WINDOW_SENTENCES
+    stride = stride or settings.SCORING_WINDOW_STRIDE
+    max_windows = max_windows or settings.SCORING_MAX_WINDOWS
+
+    sentences = split_sentences(text)
+    if len(sentences) <= window_size:
+        return [" ".join(sentences) or text]
+
+    starts = list(range(0, len(sentences) - window_size + 1, stride))
+    if starts[-1] + window_size < len(sentences):
+        starts.append(len(sentences) - window_size)
+    if len(starts) > max_windows:
+        picks = np.linspace(0, len(starts) - 1, max_windows).round().astype(int)
+        starts = [starts[k] for k in dict.fromkeys(picks.tolist())]
+    return [" ".join(sentences[s:s + window_size]) for s in starts]
+
+def aggregate_similarities(similarities, method=None, top_k=None):
+    """
+    Combine per-window similarities into one answer similarity.
+
+    Args:
+        similarities (array-like): Similarity of each window to the model answer.
+        method (str): 'max' or 'topk_mean' (default settings.SCORING_AGGREGATION).
+        top_k (int): Windows averaged by 'topk_mean' (default settings.SCORING_TOP_K).
+
+    Returns:
+        float: Aggregated similarity.
+    """
+    similarities = np.asarray(similarities, dtype=np.float32)
+    if len(similarities) == 1:
+        return float(similarities[0])
+    method = method or settings.SCORING_AGGREGATION
+    if method == "max":
+        return float(similarities.max())
+    if method == "topk_mean":
+        k = min(top_k or settings.SCORING_TOP_K, len(similarities))
+        return float(np.sort(similarities)[-k:].mean())
+    raise ValueError(f"Unknown aggregation method '{method}'. Use 'max' or 'topk_mean'.")
 
-def generate_feedback(candidate_answer, score, model_answer):
+def generate_feedback(candidate_answer, score, model_answer, coverage=None):
     """
     Generate feedback based on the score and model answer.
-    Optionally, can be extended to include more advanced feedback logic.
+    When key-point coverage is available, only the missed points are suggested.
 
     Args:
         candidate_answer (str): Candidate's answer.
         score (float): Score between 0 and 5.
         model_answer (str): Reference/model answer.
+        coverage (dict, optional): Result of score_coverage for this answer.
 
     Returns:
         feedback (str)
     """
-    # Optionally, you could add keyword/phrase checking or LLM-based feedback here
+    details = model_answer
+    if coverage and coverage.get('missed'):
+        details = "; ".join(point.rstrip(".") for point in coverage['missed'])
     if score >= 4.0:
         return "Excellent answer! You covered all key points."
     elif score >= 3.0:
-        return f"Good answer. To improve, consider including more details such as: {model_answer}"
+        return f"Good answer. To improve, consider including more details such as: {details}"
     elif score >= 2.0:
-        return f"Fair attempt, but your answer could be more comprehensive. Key points: {model_answer}"
+        return f"Fair attempt, but your answer could be more comprehensive. Key points: {details}"
     elif score > 0:
-        return f"Your answer lacks important details. Review the topic and try to include: {model_answer}"
+        return f"Your answer lacks important details. Review the topic and try to include: {details}"
     else:
         return "No answer provided or answer is not relevant."
 
@@ -0,0 +1,71 @@
+# src/incremental_scoring.py
+
+import numpy as np
+
+from src.config import settings
+from src.coverage import coverage_from_vectors, split_key_points
+from src.evaluation import embed_texts, encode_texts
+from src.utils import split_sentences
+
+class IncrementalScorer:
+    """
+    Key-point coverage for an answer that is still being written.
+
+    Sentence embeddings are kept between updates, so each update only
+    encodes sentences that are new or were edited since the previous one
+    and the cost stays roughly constant as the answer grows.
+    """
+
+    def __init__(self, model_answer, encode_fn=encode_texts):
+        """
+        Args:
+            model_answer (str): Reference answer the key points come from.
+            encode_fn (callable): Maps a list of texts to normalized embeddings.
+                Partial sentences bypass the persistent embedding cache.
+        """
+        self.key_points = split_key_points(model_answer)
+        self.encode_fn = encode_fn
+        self._point_vecs = None
+        self._sentence_vecs = {}
+        self._last_text = None
+        self.sentences_encoded = 0
+        self.last_result = coverage_from_vectors(self.key_points, [], [])
+
+    def _key_point_vectors(self):
+        if self._point_vecs is None and self.key_points:
+            vectors = embed_texts(self.key_points)
+            self._point_vecs = np.stack([vectors[p] for p in self.key_points])
+        return self._point_vecs
+
+    def update(self, text):
+        """
+        Re-score the current answer text.
+
+        Args:
+            text (str): Full answer as written so far.
+
+        Returns:
+            dict: Coverage result (see coverage.coverage_from_vectors).
+        """
+        if text == self._last_text:
+            return self.last_result
+        self._last_text = text
+
+        sentences = list(dict.fromkeys(split_sentences(text)))
+        new = [s for s in sentences if s not in self._sentence_vecs]
+        if new:
+            self._sentence_vecs.update(zip(new, self.encode_fn(new)))
+            self.sentences_encoded += len(new)
+        # Forget sentences that were edited away so memory tracks the answer
+        self._sentence_vecs = {s: self._sentence_vecs[s] for s in sentences}
+
+        if not sentences or not self.key_points:
+            self.last_result = coverage_from_vectors(self.key_points, [], [])
+        else:
+            self.last_result = coverage_from_vectors(
+                self.key_points,
+                np.stack([self._sentence_vecs[s] for s in sentences]),
+                self._key_point_vectors(),
+                threshold=settings.COVERAGE_THRESHOLD
+            )
+        return self.last_result
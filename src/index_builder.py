@@ -0,0 +1,249 @@
+# src/index_builder.py
+"""
+Parallel, sharded build of the persisted RAG vector store.
+
+Question files are streamed item by item, grouped into shards, and each
+shard is chunked, embedded and indexed in a worker process. The shard
+indexes are merged into one FAISS index, written with its BM25 index to
+the same location build_vector_store_from_json(persist_dir=...) loads from.
+
+Usage:
+    python -m src.index_builder data/technical_questions.json --workers 4 --shard-size 1000
+
+With --publish the index is built into a new version of the shared snapshot
+(settings.SHARED_INDEX_DIR) that API workers attach to, and made live atomically.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import faiss
+import numpy as np
+import torch
+from langchain.text_splitter import CharacterTextSplitter
+from sentence_transformers import SentenceTransformer
+
+from src.bm25 import BM25Index
+from src.config import settings
+from src.data_loader import iter_question_items
+from src.dedup import NearDuplicateIndex
+from src.embedding_index import content_hash
+from src.encoders import encode_bucketed
+from src.rag_pipeline import (
+    question_answer_text, question_category, question_document, question_metadata, rag_encoder_version
+)
+from src.shared_index import IndexSnapshots
+from src.vector_index import INDEX_TYPES, PersistentVectorIndex, chunk_id, effective_index_type, new_index
+
+def iter_shards(json_paths, shard_size, dedup_index=None):
+    """
+    Group the entries of every file into lists of (category, item) of at most `shard_size`.
+    Entries a NearDuplicateIndex `dedup_index` reports as near-duplicates are skipped.
+    """
+    shard = []
+    for path in json_paths:
+        category = question_category(path)
+        for item in iter_question_items(path):
+            label = {"file": path, "question": item.get("question", "")}
+            if dedup_index is not None and not dedup_index.add(question_answer_text(item), label):
+                continue
+            shard.append((category, item))
+            if len(shard) >= shard_size:
+                yield shard
+                shard = []
+    if shard:
+        yield shard
+
+_encoder = None
+
+def _init_worker():
+    # One intra-op thread per worker: parallelism comes from the processes
+    torch.set_num_threads(1)
+
+def _build_shard(shard, model_name, chunk_size, chunk_overlap, max_tokens, batch_size):
+    global _encoder
+    if _encoder is None:
+        _encoder = SentenceTransformer(model_name)
+    splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = {}
+    for category, item in shard:
+        for text in splitter.split_text(question_document(item, category)):
+            chunks.setdefault(content_hash(text), {"text": text, "metadata": question_metadata(item, category)})
+    hashes = list(chunks)
+    vectors = encode_bucketed(
+        _encoder,
+        [chunks[h]["text"] for h in hashes],
+        batch_size=batch_size,
+        max_tokens=max_tokens,
+        bucket_width=settings.ENCODER_BUCKET_WIDTH,
+        normalize_embeddings=False
+    )
+    index = faiss.IndexIDMap2(faiss.IndexFlatL2(vectors.shape[1]))
+    index.add_with_ids(
+        np.asarray(vectors, dtype=np.float32),
+        np.array([chunk_id(h) for h in hashes], dtype=np.int64)
+    )
+    return {"items": len(shard), "chunks": chunks, "index": faiss.serialize_index(index)}
+
+def build_index(
+    json_paths,
+    index_dir=None,
+    embedding_model_name="sentence-transformers/all-MiniLM-L6-v2",
+    workers=None,
+    shard_size=1000,
+    chunk_size=500,
+    chunk_overlap=50,
+    max_tokens=256,
+    batch_size=64,
+    index_type=None,
+    dedup=None,
+    dedup_report=None,
+    progress=True
+):
+    """
+    Build the persisted RAG index from scratch with a pool of worker processes.
+
+    Args:
+        json_paths (list): Question-bank JSON files.
+        index_dir (str): Output directory (default settings.VECTOR_STORE_DIR).
+        workers (int): Worker processes (default: one per core).
+        shard_size (int): Question entries per shard.
+        index_type (str): "flat", "ivfpq" or "hnsw" (default settings.VECTOR_INDEX_TYPE);
+            approximate indexes are trained on the merged vectors.
+        dedup (bool): Skip near-duplicate entries while streaming (default
+            settings.DEDUP_QUESTIONS); merges are written to `dedup_report`
+            (default settings.DEDUP_REPORT_PATH).
+        progress (bool): Print progress and throughput after every shard.
+
+    Returns:
+        dict: Items, chunks, shards, wall time and throughput of the build.
+    """
+    index_dir = index_dir or settings.VECTOR_STORE_DIR
+    index_type = index_type or settings.VECTOR_INDEX_TYPE
+    workers = workers or os.cpu_count() or 1
+    dedup_index = NearDuplicateIndex() if (settings.DEDUP_QUESTIONS if dedup is None else dedup) else None
+    dedup_report = settings.DEDUP_REPORT_PATH if dedup_report is None else dedup_report
+    started = time.perf_counter()
+    merged, chunks = None, {}
+    items = shards = 0
+    args = (embedding_model_name, chunk_size, chunk_overlap, max_tokens, batch_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        shard_iter = iter_shards(json_paths, shard_size, dedup_index)
+        exhausted = False
+        while pending or not exhausted:
+            # Keep a bounded number of shards in flight so large banks are never fully in memory
+            while not exhausted and len(pending) < workers * 2:
+                shard = next(shard_iter, None)
+                if shard is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(_build_shard, shard, *args))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                shard_index = faiss.deserialize_index(result["index"])
+                # The same chunk can occur in several shards; keep the first copy
+                duplicates = [h for h in result["chunks"] if h in chunks]
+                if duplicates:
+                    shard_index.remove_ids(np.array([chunk_id(h) for h in duplicates], dtype=np.int64))
+                if merged is None:
+                    merged = shard_index
+                else:
+                    merged.merge_from(shard_index)
+                chunks.update((h, c) for h, c in result["chunks"].items() if h not in chunks)
+                items += result["items"]
+                shards += 1
+                if progress:
+                    elapsed = time.perf_counter() - started
+                    print(
+                        f"shard {shards}: {items} items, {len(chunks)} chunks, "
+                        f"{items / elapsed:.0f} items/s, {len(chunks) / elapsed:.0f} chunks/s",
+                        flush=True
+                    )
+
+    if merged is not None:
+        if index_type != "flat":
+            merged = new_index(
+                merged.index.reconstruct_n(0, merged.ntotal),
+                faiss.vector_to_array(merged.id_map),
+                index_type
+            )
+        PersistentVectorIndex(
+            rag_encoder_version(embedding_model_name, max_tokens),
+            index_dir=index_dir,
+            index_type=index_type
+        ).replace(merged, chunks)
+        BM25Index(index_dir=index_dir).sync({str(chunk_id(h)): c["text"] for h, c in chunks.items()})
+    merged_items = dedup_index.report()["merged"] if dedup_index is not None else 0
+    if merged_items and dedup_report:
+        dedup_index.write_report(dedup_report)
+    seconds = time.perf_counter() - started
+    return {
+        "items": items,
+        "duplicates": merged_items,
+        "chunks": len(chunks),
+        "shards": shards,
+        "workers": workers,
+        "index_type": index_type,
+        "effective_index_type": effective_index_type(merged) if merged is not None else None,
+        "seconds": round(seconds, 3),
+        "items_per_s": items / seconds if seconds else 0.0,
+        "chunks_per_s": len(chunks) / seconds if seconds else 0.0,
+        "index_dir": index_dir
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("json_paths", nargs="*", default=[
+        "data/technical_questions.json",
+        "data/behavioral_questions.json",
+        "data/hr_questions.json"
+    ])
+    parser.add_argument("--index-dir", default=settings.VECTOR_STORE_DIR)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=settings.VECTOR_INDEX_TYPE)
+    parser.add_argument("--no-dedup", action="store_true", help="Keep near-duplicate question/answer pairs")
+    parser.add_argument("--publish", action="store_true", help="Build into a new shared snapshot version and make it live")
+    parser.add_argument("--output", help="Write the build report as JSON to this path")
+    args = parser.parse_args()
+
+    build = lambda index_dir: build_index(
+        args.json_paths,
+        index_dir=index_dir,
+        embedding_model_name=args.model,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        max_tokens=args.max_tokens,
+        batch_size=args.batch_size,
+        index_type=args.index_type,
+        dedup=False if args.no_dedup else None
+    )
+    if args.publish:
+        reports = []
+        version = IndexSnapshots().publish(lambda index_dir: reports.append(build(index_dir)))
+        report = dict(reports[0], version=version)
+    else:
+        report = build(args.index_dir)
+    for key, value in report.items():
+        print(f"{key:>20}: {value:.1f}" if isinstance(value, float) else f"{key:>20}: {value}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
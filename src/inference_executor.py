@@ -0,0 +1,244 @@
+# src/inference_executor.py
+
+import asyncio
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import torch
+
+from src.config import settings
+from src.evaluation import (
+    evaluate_answers, get_cross_encoder, get_model, merge_tier_counts, pop_tier_counts
+)
+from src.sentiment_analysis import analyze_sentiment, get_sia
+from src.warmup import warm_up_models
+
+def _load_models():
+    loaders = [("sentence_encoder", get_model), ("vader", get_sia)]
+    if settings.CASCADE_CROSS_ENCODER:
+        # Reranks borderline answers; loaded here so it is shared like the rest
+        loaders.append(("cross_encoder", get_cross_encoder))
+    timings = {}
+    for name, loader in loaders:
+        started = time.perf_counter()
+        loader()
+        timings[name] = round(time.perf_counter() - started, 3)
+    return timings
+
+_worker_warmup = {}
+_worker_barrier = None
+
+def _init_worker(load_models, warmup_models, barrier):
+    global _worker_warmup, _worker_barrier
+    _worker_barrier = barrier
+    # One intra-op thread per worker: parallelism comes from the processes
+    torch.set_num_threads(1)
+    if load_models:
+        _load_models()
+    # Every worker, including ones restarted after a crash, warms up before
+    # taking its first request
+    _worker_warmup = warm_up_models(warmup_models)
+
+def _score_batch(pairs):
+    # The cascade counters live in the worker; hand them back with the results
+    return evaluate_answers(pairs), pop_tier_counts()
+
+def _sentiment_batch(texts):
+    return [analyze_sentiment(text) for text in texts]
+
+def _warm_up_report():
+    # Held until every worker of the pool has taken one, so a worker that
+    # finished its initializer early cannot answer for the others
+    _worker_barrier.wait()
+    return _worker_warmup
+
+class InferenceExecutor:
+    """
+    Process pool for CPU-bound scoring and sentiment work.
+
+    With the 'fork' start method the models are loaded once in the parent
+    before the workers are forked, so their weights are shared copy-on-write;
+    elsewhere each worker loads them in its initializer. The parent only
+    loads weights and never runs a forward pass, because the OpenMP runtime
+    used by torch is not fork-safe once it has started threads.
+
+    Each worker runs a dummy batch through `warmup_models` (see
+    warmup.warm_up_models) before it takes its first request.
+
+    A crashed worker breaks the whole pool, failing every request that was
+    queued or running on it, and it is not known which one caused the crash.
+    The pool is recreated, and each of those requests is re-run alone in a
+    separate single-worker pool, one at a time. A pool-wide crash is not
+    counted against a request; a crash while it runs alone is, and after
+    `max_retries` of those the request fails. A request that kills its worker
+    thus fails on its own instead of taking its neighbours' retries with it.
+    """
+
+    def __init__(self, workers=2, max_retries=2, preload=True, warmup_models=None):
+        self.workers = workers
+        self.warmup_models = warmup_models
+        self.max_retries = max_retries
+        self.preload = preload
+        self._fork = "fork" in mp.get_all_start_methods()
+        self._pool = None
+        self._isolation_pool = None
+        self._isolation_lock = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._restarts = 0
+        self._isolated = 0
+        self.preload_seconds = {}
+
+    def start(self):
+        """Create the worker pool (idempotent)."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._new_pool()
+
+    def _new_pool(self, workers=None):
+        if self._fork and self.preload:
+            # Loaded before fork: workers inherit the weights copy-on-write
+            self.preload_seconds.update(_load_models())
+        workers = workers or self.workers
+        context = mp.get_context("fork" if self._fork else "spawn")
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.preload and not self._fork, self.warmup_models, context.Barrier(workers))
+        )
+
+    def _restart(self, broken_pool):
+        with self._lock:
+            # Several requests see the same crash; only the first one restarts
+            if self._pool is broken_pool:
+                broken_pool.shutdown(wait=False)
+                self._pool = self._new_pool()
+                self._restarts += 1
+
+    async def _submit(self, fn, *args):
+        if self._pool is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        try:
+            pool = self._pool
+            try:
+                result = await loop.run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                self._restart(pool)
+                result = await self._run_isolated(fn, *args)
+            self._completed += 1
+            return result
+        finally:
+            self._in_flight -= 1
+
+    async def _run_isolated(self, fn, *args):
+        """
+        Re-run a request caught in a pool-wide crash alone in the isolation pool.
+        """
+        loop = asyncio.get_running_loop()
+        if self._isolation_lock is None:
+            self._isolation_lock = asyncio.Lock()
+        attempt = 0
+        async with self._isolation_lock:
+            self._isolated += 1
+            while True:
+                if self._isolation_pool is None:
+                    self._isolation_pool = self._new_pool(workers=1)
+                try:
+                    return await loop.run_in_executor(self._isolation_pool, fn, *args)
+                except BrokenProcessPool:
+                    # Alone in its pool: this request caused the crash
+                    self._isolation_pool.shutdown(wait=False)
+                    self._isolation_pool = None
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise
+
+    async def score(self, answer, model_answer):
+        """
+        Score one answer in a worker process.
+
+        Returns:
+            (score, feedback): Same result as evaluation.evaluate_answer.
+        """
+        return (await self.score_batch([(answer, model_answer)]))[0]
+
+    async def score_batch(self, pairs):
+        """
+        Score a list of (answer, model_answer) pairs in one worker call.
+
+        The worker's cascade tier counters are merged into this process, so
+        evaluation.get_cascade_stats covers the scoring done in the pool.
+        """
+        results, tier_counts = await self._submit(_score_batch, list(pairs))
+        merge_tier_counts(tier_counts)
+        return results
+
+    async def sentiment(self, text):
+        """
+        Analyze the sentiment of one text in a worker process.
+
+        Returns:
+            dict: Same result as sentiment_analysis.analyze_sentiment.
+        """
+        return (await self._submit(_sentiment_batch, [text]))[0]
+
+    async def warm_up(self):
+        """
+        Start every worker and wait until each has finished its warm-up.
+
+        Returns:
+            dict: Per-model timings from the slowest worker; `load_seconds`
+            includes the parent's pre-fork load where that applies.
+        """
+        # Concurrent submissions make the pool spawn all of its workers, and
+        # each report waits on the pool's barrier, so every worker answers one
+        reports = await asyncio.gather(
+            *(self._submit(_warm_up_report) for _ in range(self.workers))
+        )
+        models = {}
+        for report in reports:
+            for name, timing in report.items():
+                total = timing["load_seconds"] + timing["warm_seconds"]
+                if name not in models or total > models[name]["load_seconds"] + models[name]["warm_seconds"]:
+                    models[name] = dict(timing)
+        for name, seconds in self.preload_seconds.items():
+            if name in models:
+                models[name]["load_seconds"] = max(models[name]["load_seconds"], seconds)
+        return models
+
+    def utilization(self):
+        """
+        Return worker count, busy/queued requests and restart statistics.
+        """
+        busy = min(self._in_flight, self.workers)
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "busy_workers": busy,
+            "queued": self._in_flight - busy,
+            "utilization": busy / self.workers if self.workers else 0.0,
+            "completed": self._completed,
+            "restarts": self._restarts,
+            "isolated_retries": self._isolated,
+            "start_method": "fork" if self._fork else "spawn"
+        }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            for pool in (self._pool, self._isolation_pool):
+                if pool is not None:
+                    pool.shutdown(wait=wait)
+            self._pool = None
+            self._isolation_pool = None
+
+def default_worker_count():
+    """Leave one core for the event loop."""
+    return max(1, (os.cpu_count() or 2) - 1)
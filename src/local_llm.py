@@ -0,0 +1,80 @@
+# src/local_llm.py
+
+import asyncio
+import math
+import re
+import time
+from langchain.llms.base import LLM
+from langchain.llms.utils import enforce_stop_tokens
+
+from src.bm25 import tokenize
+from src.utils import split_sentences
+
+QUESTION_LINE = re.compile(r"^(Category|Question):.*$", re.MULTILINE)
+ANSWER_PREFIX = re.compile(r"^Answer:\s*", re.MULTILINE)
+UNKNOWN_ANSWER = "I don't know."
+
+class DeterministicLLM(LLM):
+    """
+    Offline stand-in for the OpenAI LLM in the RAG chain.
+
+    Answers extractively: returns the answer sentences of the context that
+    share the most (rare) terms with the question, in their original order.
+    The same prompt always gives the same answer and no network is used, so
+    retrieval and generation throughput can be benchmarked locally;
+    `latency_ms` simulates the time a hosted model would take. Async calls
+    stream the answer word by word, spreading `latency_ms` over the words.
+    """
+
+    max_sentences: int = 2
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self):
+        return "deterministic"
+
+    @property
+    def _identifying_params(self):
+        return {"max_sentences": self.max_sentences, "latency_ms": self.latency_ms}
+
+    def _answer(self, prompt, stop=None):
+        # RetrievalQA's stuff prompt: "...\n\n{context}\n\nQuestion: {question}\nHelpful Answer:"
+        head, _, question = prompt.rpartition("Question:")
+        question = question.split("\n")[0]
+        context = head.split("\n\n", 1)[-1]
+        question_terms = set(tokenize(question))
+
+        # Answer from the model answers, not from the indexed question lines
+        sentences = split_sentences(ANSWER_PREFIX.sub("", QUESTION_LINE.sub("", context)))
+        terms = [set(tokenize(sentence)) for sentence in sentences]
+        # Weight shared terms by rarity so words like "what" or "the" barely count
+        document_frequency = {t: sum(t in ts for ts in terms) for t in question_terms}
+        scores = [
+            sum(math.log(1 + len(sentences) / document_frequency[t]) for t in question_terms & ts)
+            for ts in terms
+        ]
+        ranked = sorted(
+            (i for i, score in enumerate(scores) if score),
+            key=lambda i: -scores[i]
+        )[:self.max_sentences]
+        answer = " ".join(sentences[i] for i in sorted(ranked)) or UNKNOWN_ANSWER
+        if stop:
+            answer = enforce_stop_tokens(answer, stop)
+        return answer
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        answer = self._answer(prompt, stop)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return answer
+
+    async def _acall(self, prompt, stop=None, run_manager=None, **kwargs):
+        answer = self._answer(prompt, stop)
+        # Words with their leading whitespace, so the tokens join back to the answer
+        tokens = re.findall(r"\s*\S+", answer)
+        for token in tokens:
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000 / len(tokens))
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+        return answer
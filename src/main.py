@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException, Depends
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.websockets import WebSocket, WebSocketDisconnect
@@ -6,13 +7,20 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import jwt
 from typing import List, Optional
+import asyncio
 import json
+import os
 
 from .database import SessionLocal, engine
 from . import models, schemas
 from .config import settings
 from .auth import get_current_user, create_access_token
 from .websocket_manager import ConnectionManager
+from .scoring_service import ScoringService
+from .evaluation import get_cascade_stats
+from .inference_executor import InferenceExecutor, default_worker_count
+from .warmup import mark_ready, readiness
+from .shared_index import IndexSnapshots, SharedSnapshot
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
@@ -35,6 +43,127 @@ app.add_middleware(
 # WebSocket connection manager
 manager = ConnectionManager()
 
+# CPU-bound inference runs in worker processes, off the event loop
+inference_executor = InferenceExecutor(
+    workers=settings.INFERENCE_WORKERS or default_worker_count(),
+    max_retries=settings.INFERENCE_MAX_RETRIES,
+    warmup_models=settings.WARMUP_MODELS
+)
+
+# Micro-batching answer scorer
+scoring_service = ScoringService(
+    max_batch_size=settings.SCORING_MAX_BATCH_SIZE,
+    max_wait_ms=settings.SCORING_MAX_WAIT_MS,
+    score_fn=inference_executor.score_batch
+)
+
+async def warm_up_models():
+    """Load and exercise every model in the workers, then report ready."""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, inference_executor.start)
+        timings = await inference_executor.warm_up()
+        mark_ready(timings)
+    except Exception as e:
+        mark_ready(error=f"{type(e).__name__}: {e}")
+
+# RAG chain for streamed answers, built on the first "rag_query"
+_rag_chain = None
+_rag_chain_lock = asyncio.Lock()
+
+def build_rag_chain(index_dir=None):
+    """
+    Streaming RAG chain over the question index attached read-only from `index_dir`
+    (a published snapshot); without one, the index in settings.VECTOR_STORE_DIR
+    is loaded, or built and persisted.
+    """
+    # Imported lazily: the RAG stack loads langchain and the embedding model
+    from .bm25 import BM25Index
+    from .query_cache import ResponseCache
+    from .rag_pipeline import build_vector_store_from_json, get_rag_chain, load_vector_store
+    if index_dir:
+        bm25_index = BM25Index(index_dir=index_dir)
+        vector_store = load_vector_store(index_dir, bm25_index=bm25_index)
+    else:
+        bm25_index = BM25Index(index_dir=settings.VECTOR_STORE_DIR)
+        vector_store = build_vector_store_from_json(
+            settings.RAG_QUESTION_FILES, persist_dir=settings.VECTOR_STORE_DIR, bm25_index=bm25_index
+        )
+    return get_rag_chain(
+        vector_store,
+        openai_api_key=os.environ.get("OPENAI_API_KEY"),
+        bm25_index=bm25_index,
+        response_cache=ResponseCache(),
+        streaming=True
+    )
+
+def publish_rag_index(path):
+    """Build the question index into a snapshot staging directory."""
+    from .bm25 import BM25Index
+    from .rag_pipeline import build_vector_store_from_json
+    build_vector_store_from_json(settings.RAG_QUESTION_FILES, persist_dir=path, bm25_index=BM25Index(index_dir=path))
+
+# settings.SHARED_INDEX: every worker attaches to the live snapshot instead
+_shared_rag_chain = SharedSnapshot(build_rag_chain)
+
+def get_shared_rag_chain():
+    """Chain over the live snapshot; a worker finding no index there builds and publishes it."""
+    try:
+        return _shared_rag_chain.get()
+    except FileNotFoundError:
+        IndexSnapshots().publish(publish_rag_index)
+        return _shared_rag_chain.get()
+
+async def get_streaming_rag_chain():
+    global _rag_chain
+    if settings.SHARED_INDEX:
+        # Also picks up newly published versions; loading one runs off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, get_shared_rag_chain)
+    async with _rag_chain_lock:
+        if _rag_chain is None:
+            _rag_chain = await asyncio.get_running_loop().run_in_executor(None, build_rag_chain)
+    return _rag_chain
+
+async def rag_answer_frames(query: str, request_id=None):
+    """Websocket frames of a streamed RAG answer: rag_token per token, then rag_done."""
+    from .rag_pipeline import astream_answer
+    rag_chain = await get_streaming_rag_chain()
+    async for event in astream_answer(rag_chain, query):
+        if event["type"] == "token":
+            yield {"type": "rag_token", "request_id": request_id, "text": event["text"]}
+        else:
+            yield {
+                "type": "rag_done",
+                "request_id": request_id,
+                "answer": event["answer"],
+                "sources": [
+                    {"content": doc.page_content, "metadata": doc.metadata} for doc in event["sources"]
+                ],
+                "ttft_ms": round(event["ttft_ms"], 1),
+                "total_ms": round(event["total_ms"], 1)
+            }
+
+async def stream_rag_answer(client_id: int, query: str, request_id=None):
+    try:
+        await manager.stream_to_client(client_id, rag_answer_frames(query, request_id))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await manager.send_personal_message(client_id, json.dumps({
+            "type": "rag_error",
+            "request_id": request_id,
+            "detail": f"{type(e).__name__}: {e}"
+        }))
+
+@app.on_event("startup")
+async def start_scoring_service():
+    await scoring_service.start()
+    app.state.warmup_task = asyncio.create_task(warm_up_models())
+
+@app.on_event("shutdown")
+async def stop_scoring_service():
+    await scoring_service.stop()
+    inference_executor.shutdown()
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
@@ -98,6 +227,36 @@ async def get_interview(
         raise HTTPException(status_code=404, detail="Interview not found")
     return interview
 
+# Scoring endpoints
+@app.post("/evaluate", response_model=schemas.AnswerEvaluationResponse)
+async def evaluate(
+    request: schemas.AnswerEvaluationRequest,
+    current_user: models.User = Depends(get_current_user)
+):
+    score, feedback = await scoring_service.score(request.answer, request.model_answer)
+    return {"score": score, "feedback": feedback}
+
+@app.post("/sentiment")
+async def sentiment(
+    request: schemas.SentimentRequest,
+    current_user: models.User = Depends(get_current_user)
+):
+    return await inference_executor.sentiment(request.text)
+
+@app.get("/metrics/scoring")
+async def scoring_metrics():
+    return {**scoring_service.metrics(), "cascade": get_cascade_stats()}
+
+@app.get("/metrics/inference")
+async def inference_metrics():
+    return inference_executor.utilization()
+
+@app.get("/metrics/rag")
+async def rag_metrics():
+    """Time-to-first-token and total latency of streamed RAG answers."""
+    from .rag_pipeline import get_streaming_stats
+    return get_streaming_stats()
+
 # Analytics endpoints
 @app.get("/analytics/overview", response_model=schemas.AnalyticsOverview)
 async def get_analytics_overview(
@@ -118,6 +277,7 @@ async def get_analytics_trends(
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: int):
     await manager.connect(websocket, client_id)
+    rag_stream = None
     try:
         while True:
             data = await websocket.receive_text()
@@ -130,11 +290,30 @@ async def websocket_endpoint(websocket: WebSocket, client_id: int):
                     "type": "interview_update",
                     "data": message["data"]
                 }))
+            elif message["type"] == "rag_query":
+                # Stream the answer in the background so the client can keep sending;
+                # a new query replaces an unfinished one
+                if rag_stream is not None:
+                    rag_stream.cancel()
+                rag_stream = asyncio.create_task(
+                    stream_rag_answer(client_id, message["query"], message.get("request_id"))
+                )
     except WebSocketDisconnect:
+        # Stop generating for a client that is gone
+        if rag_stream is not None:
+            rag_stream.cancel()
         manager.disconnect(websocket, client_id)
         await manager.broadcast(f"Client #{client_id} left the interview")
 
-# Health check endpoint
+# Health check endpoints
 @app.get("/health")
+@app.get("/health/live")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.utcnow()} 
\ No newline at end of file
+    """Liveness: the process is up and serving requests."""
+    return {"status": "healthy", "timestamp": datetime.utcnow()}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: 503 until every model has been loaded and warmed up."""
+    body, status_code = readiness()
+    return JSONResponse(body, status_code=status_code) 
\ No newline at end of file
@@ -0,0 +1,206 @@
+# src/query_cache.py
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+from src.config import settings
+from src.embedding_cache import normalize_text
+
+def normalize_query(query):
+    """
+    Normalize a query for exact cache lookups: normalized whitespace, lowercase,
+    no trailing punctuation.
+    """
+    return normalize_text(query).lower().rstrip("?!. ")
+
+class QueryCache:
+    """
+    Two-level cache of RAG answers.
+
+    A query is first looked up by its normalized text; on a miss its
+    embedding is compared with those of the cached queries and the closest
+    entry is used if its cosine similarity reaches `threshold`. Entries
+    expire after `ttl_seconds`, the least recently used entry is evicted
+    beyond `max_items`, and everything is dropped when the index version
+    changes. Safe to use from multiple threads.
+    """
+
+    def __init__(self, embed_fn, threshold=None, ttl_seconds=None, max_items=None):
+        """
+        Args:
+            embed_fn (callable): Maps a query to its embedding (e.g. embeddings.embed_query).
+            threshold (float): Minimum cosine similarity of a semantic hit
+                (default settings.QUERY_CACHE_SIMILARITY).
+            ttl_seconds (float): Entry lifetime (default settings.CACHE_TTL).
+            max_items (int): LRU capacity (default settings.QUERY_CACHE_SIZE).
+        """
+        self.embed_fn = embed_fn
+        self.threshold = settings.QUERY_CACHE_SIMILARITY if threshold is None else threshold
+        self.ttl_seconds = settings.CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self.max_items = max_items or settings.QUERY_CACHE_SIZE
+        self.index_version = None
+        self._entries = OrderedDict()
+        self._matrix = None
+        self._last_embedded = (None, None)
+        self._lock = threading.Lock()
+        self.hits_exact = 0
+        self.hits_semantic = 0
+        self.misses = 0
+
+    def set_index_version(self, version):
+        """
+        Record the version of the index answers come from; a new version clears the cache.
+        """
+        with self._lock:
+            if version != self.index_version:
+                self._entries.clear()
+                self._matrix = None
+                self.index_version = version
+
+    def _embed(self, query):
+        # A miss is normally followed by put() for the same query: embed it once
+        last_query, last_vector = self._last_embedded
+        if query == last_query:
+            return last_vector
+        vector = np.asarray(self.embed_fn(query), dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        self._last_embedded = (query, vector)
+        return vector
+
+    def _expire(self, now):
+        expired = [key for key, entry in self._entries.items() if entry["expires"] <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def get(self, query, now=None):
+        """
+        Return the cached result for `query`, or None on a miss.
+
+        Returns:
+            tuple: (answer, sources) as returned by rag_pipeline.answer_query.
+        """
+        now = time.time() if now is None else now
+        key = normalize_query(query)
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits_exact += 1
+                return entry["result"]
+            if not self._entries:
+                self.misses += 1
+                return None
+        vector = self._embed(query)
+        with self._lock:
+            if self._matrix is None:
+                keys = list(self._entries)
+                self._matrix = (keys, np.stack([self._entries[k]["vector"] for k in keys])) if keys else None
+            if self._matrix is not None:
+                keys, matrix = self._matrix
+                similarities = matrix @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold and keys[best] in self._entries:
+                    self._entries.move_to_end(keys[best])
+                    self.hits_semantic += 1
+                    return self._entries[keys[best]]["result"]
+            self.misses += 1
+            return None
+
+    def put(self, query, result, now=None):
+        """
+        Cache the result of answering `query`.
+        """
+        now = time.time() if now is None else now
+        vector = self._embed(query)
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = {"vector": vector, "result": result, "expires": now + self.ttl_seconds}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def stats(self):
+        """
+        Return hit/miss counters, the hit rate and the number of entries.
+        """
+        lookups = self.hits_exact + self.hits_semantic + self.misses
+        return {
+            "hits_exact": self.hits_exact,
+            "hits_semantic": self.hits_semantic,
+            "misses": self.misses,
+            "hit_rate": (self.hits_exact + self.hits_semantic) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "index_version": self.index_version
+        }
+
+class ResponseCache:
+    """
+    Cache of LLM answers keyed by the normalized query, the ids of the
+    retrieved chunks and the model settings, so an answer is only reused when
+    the LLM would see the same prompt. Entries expire after `ttl_seconds` and
+    the least recently used entry is evicted beyond `max_items`.
+    """
+
+    def __init__(self, ttl_seconds=None, max_items=None):
+        self.ttl_seconds = settings.CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self.max_items = max_items or settings.LLM_CACHE_SIZE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query, chunk_ids, model_settings):
+        """
+        Build the cache key for one LLM call.
+
+        Args:
+            query (str): The user query.
+            chunk_ids (list): Ids of the retrieved chunks, in prompt order.
+            model_settings (dict): LLM type, parameters and prompt template.
+        """
+        payload = json.dumps([normalize_query(query), list(chunk_ids), model_settings], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key, now=None):
+        """
+        Return the cached answer for `key`, or None on a miss.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, answer, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[key] = (answer, now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Return hit/miss counters, the hit rate and the number of entries.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries)
+        }
@@ -1,76 +1,649 @@
 # src/rag_pipeline.py
 
 from langchain.embeddings import HuggingFaceEmbeddings
+from langchain.embeddings.base import Embeddings
+from langchain.docstore.document import Document
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.schema import BaseRetriever
 from langchain.vectorstores import FAISS
 from langchain.text_splitter import CharacterTextSplitter
 from langchain.llms import OpenAI
 from langchain.chains import RetrievalQA
+from langchain.callbacks.base import AsyncCallbackHandler
+from langchain.callbacks.manager import AsyncCallbackManagerForChainRun, CallbackManagerForChainRun
+from collections import deque
+from typing import Any
+import asyncio
+import heapq
 import os
 import json
+import re
+import time
+
+from src.bm25 import BM25Index
+from src.config import settings
+from src.data_loader import extract_question_items, get_model_answer
+from src.dedup import deduplicate
+from src.embedding_index import content_hash
+from src.encoders import encode_bucketed
+from src.local_llm import DeterministicLLM
+from src.query_cache import QueryCache, ResponseCache
+from src.vector_index import PersistentVectorIndex, set_search_params
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain embeddings wrapper that serves repeated texts from an EmbeddingCache.
+    """
+
+    def __init__(self, embeddings, cache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts):
+        vectors = self.cache.encode(texts, self.embeddings.embed_documents)
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+class LengthBucketedEmbeddings(Embeddings):
+    """
+    LangChain embeddings wrapper that encodes through length buckets with a hard token cap.
+    """
+
+    def __init__(self, embeddings, batch_size=32, max_tokens=256, bucket_width=32):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.bucket_width = bucket_width
+
+    def embed_documents(self, texts):
+        vectors = encode_bucketed(
+            self.embeddings.client,
+            texts,
+            batch_size=self.batch_size,
+            max_tokens=self.max_tokens,
+            bucket_width=self.bucket_width,
+            normalize_embeddings=self.embeddings.encode_kwargs.get("normalize_embeddings", False)
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
 
 # 1. Indexing Phase: Ingest, Chunk, Embed, Store
 
+def question_category(path):
+    """
+    Category of a question file, e.g. 'technical' for data/technical_questions.json.
+    """
+    return os.path.splitext(os.path.basename(path))[0].replace("_questions", "")
+
+def question_document(item, category):
+    """
+    Text indexed for one question entry.
+    """
+    q = item.get("question", "")
+    a = get_model_answer(item)
+    return f"Category: {category}\nQuestion: {q}\nAnswer: {a}"
+
+def question_metadata(item, category):
+    """
+    Metadata of the chunks of one question entry: its category plus, where the
+    data file has them, its difficulty and question_type (lowercased).
+    """
+    metadata = {"category": category}
+    for field in ("difficulty", "question_type"):
+        if item.get(field):
+            metadata[field] = str(item[field]).strip().lower()
+    return metadata
+
+def question_answer_text(item):
+    """
+    Text near-duplicate entries are detected on: the question and its model answer.
+    """
+    return f"{item.get('question', '')}\n{get_model_answer(item)}"
+
+def load_question_chunks(json_paths, chunk_size=500, chunk_overlap=50, dedup=None, dedup_report=None):
+    """
+    Load questions and model answers from JSON files and split them into chunks.
+    With `dedup` (default settings.DEDUP_QUESTIONS), near-duplicate entries
+    across all files are merged into their first occurrence before chunking;
+    the merges are written to `dedup_report` if a path is given.
+    Returns (chunks, metadatas); see question_metadata.
+    """
+    entries = []
+    for path in json_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        category = question_category(path)
+        entries.extend((path, category, item) for item in extract_question_items(data))
+    if settings.DEDUP_QUESTIONS if dedup is None else dedup:
+        entries, _ = deduplicate(
+            entries,
+            text_fn=lambda entry: question_answer_text(entry[2]),
+            label_fn=lambda entry: {"file": entry[0], "question": entry[2].get("question", "")},
+            report_path=dedup_report
+        )
+
+    splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks, metadatas = [], []
+    for _, category, item in entries:
+        # Chunking (split long docs if needed)
+        for chunk in splitter.split_text(question_document(item, category)):
+            chunks.append(chunk)
+            metadatas.append(question_metadata(item, category))
+    return chunks, metadatas
+
+def rag_encoder_version(embedding_model_name, max_tokens):
+    """
+    Version tag of persisted RAG vectors; an index built with other settings is not reused.
+    """
+    return f"{embedding_model_name}:{max_tokens}"
+
+def build_embeddings(embedding_model_name, max_tokens=256, embedding_cache=None):
+    """
+    Length-bucketed HuggingFace embeddings, optionally behind an EmbeddingCache.
+    """
+    embeddings = LengthBucketedEmbeddings(
+        HuggingFaceEmbeddings(model_name=embedding_model_name),
+        max_tokens=max_tokens
+    )
+    if embedding_cache is not None:
+        embeddings = CachedEmbeddings(embeddings, embedding_cache)
+    return embeddings
+
+def vector_store_from_index(index, embeddings):
+    """
+    Wrap a PersistentVectorIndex in a LangChain FAISS vector store.
+    """
+    chunks = index.chunks()
+    docstore = InMemoryDocstore({
+        str(faiss_id): Document(page_content=chunk["text"], metadata=chunk["metadata"])
+        for faiss_id, chunk in chunks.items()
+    })
+    # IndexIDMap2 search returns chunk ids rather than row positions
+    index_to_docstore_id = {faiss_id: str(faiss_id) for faiss_id in chunks}
+    return FAISS(embeddings.embed_query, index.index, docstore, index_to_docstore_id)
+
 def build_vector_store_from_json(
     json_paths,
     embedding_model_name="sentence-transformers/all-MiniLM-L6-v2",
     chunk_size=500,
-    chunk_overlap=50
+    chunk_overlap=50,
+    embedding_cache=None,
+    max_tokens=256,
+    persist_dir=None,
+    index_type=None,
+    bm25_index=None,
+    dedup=None,
+    dedup_report=None
 ):
     """
     Load questions and model answers from JSON files, chunk, embed, and store in FAISS vector DB.
+    Near-duplicate entries are merged first unless `dedup` is False, and
+    reported to `dedup_report` if given; see load_question_chunks.
+    Pass an EmbeddingCache (built with the same model id) to reuse embeddings across builds.
+    Chunks are embedded in token-length buckets and capped at `max_tokens`.
+    With `persist_dir` (e.g. settings.VECTOR_STORE_DIR) the index is kept on disk
+    and memory-mapped on the next call; only added or changed chunks are embedded
+    and removed chunks are deleted from it.
+    `index_type` ("flat", "ivfpq" or "hnsw"; default settings.VECTOR_INDEX_TYPE)
+    selects exact or approximate search; see vector_index.new_index.
+    A BM25Index passed as `bm25_index` is synced with the same chunks (keyed
+    by docstore id) for use with HybridRetriever.
     Returns the FAISS vector store object.
     """
-    # Load all questions and answers
-    docs = []
-    for path in json_paths:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            for item in data:
-                q = item.get("question", "")
-                a = item.get("model_answer", "")
-                category = os.path.splitext(os.path.basename(path))[0].replace("_questions", "")
-                text = f"Category: {category}\nQuestion: {q}\nAnswer: {a}"
-                docs.append(text)
-    
-    # Chunking (split long docs if needed)
-    splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    chunks = []
-    for doc in docs:
-        chunks.extend(splitter.split_text(doc))
+    index_type = index_type or settings.VECTOR_INDEX_TYPE
+    chunks, metadatas = load_question_chunks(
+        json_paths, chunk_size, chunk_overlap, dedup=dedup, dedup_report=dedup_report
+    )
     
     # Embedding
-    embeddings = HuggingFaceEmbeddings(model_name=embedding_model_name)
+    embeddings = build_embeddings(embedding_model_name, max_tokens, embedding_cache)
     
     # Build FAISS vector store
-    vector_store = FAISS.from_texts(chunks, embedding=embeddings)
+    if persist_dir is None and index_type == "flat":
+        vector_store = FAISS.from_texts(chunks, embedding=embeddings, metadatas=metadatas)
+    else:
+        index = PersistentVectorIndex(
+            rag_encoder_version(embedding_model_name, max_tokens),
+            index_dir=persist_dir,
+            index_type=index_type
+        )
+        index.sync(chunks, embeddings.embed_documents, metadatas)
+        vector_store = vector_store_from_index(index, embeddings)
+    
+    if bm25_index is not None:
+        bm25_index.sync({
+            doc_id: vector_store.docstore.search(doc_id).page_content
+            for doc_id in vector_store.index_to_docstore_id.values()
+        })
     return vector_store
 
+def load_vector_store(
+    index_dir,
+    embedding_model_name="sentence-transformers/all-MiniLM-L6-v2",
+    max_tokens=256,
+    index_type=None,
+    embedding_cache=None,
+    bm25_index=None
+):
+    """
+    Attach read-only to an index persisted by build_vector_store_from_json or
+    index_builder, e.g. a published snapshot (see shared_index), without
+    syncing it. The FAISS index is memory-mapped, so processes attaching to
+    the same files share its pages. A `bm25_index` is loaded from the same directory.
+    Returns the FAISS vector store object.
+    """
+    index = PersistentVectorIndex(
+        rag_encoder_version(embedding_model_name, max_tokens),
+        index_dir=index_dir,
+        index_type=index_type
+    )
+    if not index.load():
+        raise FileNotFoundError(f"No index built with {embedding_model_name} in {index_dir}")
+    if bm25_index is not None:
+        bm25_index.load()
+    return vector_store_from_index(index, build_embeddings(embedding_model_name, max_tokens, embedding_cache))
+
+def partition_key(metadata, fields):
+    """
+    Partition of a chunk: its (lowercased) value for each partition field.
+    """
+    return tuple(str(metadata.get(field) or "none").lower() for field in fields)
+
+class PartitionRouter:
+    """
+    One vector store per partition of the question bank, e.g. per category.
+
+    A search only visits the partitions matching the filter on the partition
+    fields, then merges their top-k by distance. Filter keys that are not
+    partition fields are applied as a metadata filter inside each partition.
+    """
+
+    def __init__(self, stores, fields, embeddings):
+        """
+        Args:
+            stores (dict): {partition_key: FAISS vector store}.
+            fields (list): Metadata fields the partitions are keyed on.
+            embeddings: LangChain Embeddings used to embed queries (once per search).
+        """
+        self.stores = stores
+        self.fields = list(fields)
+        self.embeddings = embeddings
+
+    def partitions(self, filter=None):
+        """
+        Return the partition keys matching `filter`.
+        """
+        wanted = {
+            i: str(filter[field]).lower()
+            for i, field in enumerate(self.fields) if filter and field in filter
+        }
+        return [key for key in self.stores if all(key[i] == value for i, value in wanted.items())]
+
+    def similarity_search_with_score(self, query, k=4, filter=None):
+        """
+        Search the matching partitions and return the overall top-k (Document, distance) pairs.
+        """
+        rest = {key: value for key, value in (filter or {}).items() if key not in self.fields} or None
+        vector = self.embeddings.embed_query(query)
+        results = []
+        for key in self.partitions(filter):
+            results.extend(self.stores[key].similarity_search_with_score_by_vector(vector, k=k, filter=rest))
+        return heapq.nsmallest(k, results, key=lambda result: result[1])
+
+    def similarity_search(self, query, k=4, filter=None):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def as_retriever(self, filter=None, k=4):
+        return PartitionRetriever(self, filter=filter, k=k)
+
+class PartitionRetriever(BaseRetriever):
+    """
+    Retriever over a PartitionRouter restricted to a filter such as {"category": "technical"}.
+    """
+
+    def __init__(self, router, filter=None, k=4):
+        self.router = router
+        self.filter = filter
+        self.k = k
+
+    def get_relevant_documents(self, query):
+        return self.router.similarity_search(query, k=self.k, filter=self.filter)
+
+    async def aget_relevant_documents(self, query):
+        # Embedding and search are CPU-bound; keep them off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_relevant_documents, query)
+
+def build_partitioned_store_from_json(
+    json_paths,
+    partition_fields=None,
+    embedding_model_name="sentence-transformers/all-MiniLM-L6-v2",
+    chunk_size=500,
+    chunk_overlap=50,
+    embedding_cache=None,
+    max_tokens=256,
+    persist_dir=None,
+    index_type=None,
+    dedup=None,
+    dedup_report=None
+):
+    """
+    Like build_vector_store_from_json, but with one index per partition.
+    `partition_fields` defaults to settings.RAG_PARTITION_FIELDS (["category"];
+    add "difficulty" or "question_type" for finer partitions). Each partition
+    is persisted and synced incrementally as its own index in `persist_dir`.
+    Returns a PartitionRouter.
+    """
+    fields = partition_fields or settings.RAG_PARTITION_FIELDS
+    chunks, metadatas = load_question_chunks(
+        json_paths, chunk_size, chunk_overlap, dedup=dedup, dedup_report=dedup_report
+    )
+    embeddings = build_embeddings(embedding_model_name, max_tokens, embedding_cache)
+    
+    grouped = {}
+    for chunk, metadata in zip(chunks, metadatas):
+        texts, metas = grouped.setdefault(partition_key(metadata, fields), ([], []))
+        texts.append(chunk)
+        metas.append(metadata)
+    
+    stores = {}
+    for key, (texts, metas) in grouped.items():
+        name = "questions-" + "-".join(re.sub(r"[^a-z0-9]+", "_", value) for value in key)
+        index = PersistentVectorIndex(
+            rag_encoder_version(embedding_model_name, max_tokens),
+            index_dir=persist_dir,
+            name=name,
+            index_type=index_type
+        )
+        index.sync(texts, embeddings.embed_documents, metas)
+        stores[key] = vector_store_from_index(index, embeddings)
+    return PartitionRouter(stores, fields, embeddings)
+
 # 2. Retrieval and Generation Phase
 
-def get_rag_chain(vector_store, openai_api_key=None, llm_temperature=0.2):
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever fusing vector search and BM25 with weighted reciprocal-rank fusion.
+
+    Each document scores sum(weight / (rrf_k + rank)) over the result lists
+    it appears in, so exact technical terms found by BM25 can outrank
+    paraphrases the embeddings prefer, and vice versa.
+    """
+
+    def __init__(self, vector_store, bm25_index, k=4, fetch_k=None,
+                 vector_weight=None, bm25_weight=None, rrf_k=None):
+        self.vector_store = vector_store
+        self.bm25_index = bm25_index
+        self.k = k
+        self.fetch_k = fetch_k or settings.HYBRID_FETCH_K
+        self.vector_weight = settings.HYBRID_VECTOR_WEIGHT if vector_weight is None else vector_weight
+        self.bm25_weight = settings.HYBRID_BM25_WEIGHT if bm25_weight is None else bm25_weight
+        self.rrf_k = rrf_k or settings.HYBRID_RRF_K
+
+    def get_relevant_documents(self, query):
+        dense = self.vector_store.similarity_search(query, k=self.fetch_k)
+        sparse = [
+            self.vector_store.docstore.search(doc_id)
+            for doc_id, _ in self.bm25_index.search(query, k=self.fetch_k)
+        ]
+        scores, docs = {}, {}
+        for weight, results in ((self.vector_weight, dense), (self.bm25_weight, sparse)):
+            for rank, doc in enumerate(results, start=1):
+                key = doc.page_content
+                docs.setdefault(key, doc)
+                scores[key] = scores.get(key, 0.0) + weight / (self.rrf_k + rank)
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return [docs[key] for key in ranked[:self.k]]
+
+    async def aget_relevant_documents(self, query):
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_relevant_documents, query)
+
+class CachedRetrievalQA(RetrievalQA):
+    """
+    RetrievalQA that reuses an LLM answer from a ResponseCache when the query,
+    the retrieved chunks and the model settings all repeat. Retrieval always
+    runs, so a changed index never serves a stale answer.
+    """
+
+    response_cache: Any = None
+
+    def _model_settings(self):
+        llm_chain = getattr(self.combine_documents_chain, "llm_chain", None)
+        if llm_chain is None:
+            return {"chain": self.combine_documents_chain.__class__.__name__}
+        return {
+            "llm": llm_chain.llm._llm_type,
+            "params": llm_chain.llm._identifying_params,
+            "prompt": getattr(llm_chain.prompt, "template", "")
+        }
+
+    def _cache_key(self, question, docs):
+        return ResponseCache.key(
+            question, [content_hash(doc.page_content) for doc in docs], self._model_settings()
+        )
+
+    def _output(self, answer, docs):
+        if self.return_source_documents:
+            return {self.output_key: answer, "source_documents": docs}
+        return {self.output_key: answer}
+
+    def _call(self, inputs, run_manager=None):
+        if self.response_cache is None:
+            return super()._call(inputs, run_manager)
+        _run_manager = run_manager or CallbackManagerForChainRun.get_noop_manager()
+        question = inputs[self.input_key]
+        docs = self._get_docs(question)
+        key = self._cache_key(question, docs)
+        answer = self.response_cache.get(key)
+        if answer is None:
+            answer = self.combine_documents_chain.run(
+                input_documents=docs, question=question, callbacks=_run_manager.get_child()
+            )
+            self.response_cache.put(key, answer)
+        return self._output(answer, docs)
+
+    async def _acall(self, inputs, run_manager=None):
+        if self.response_cache is None:
+            return await super()._acall(inputs, run_manager)
+        _run_manager = run_manager or AsyncCallbackManagerForChainRun.get_noop_manager()
+        question = inputs[self.input_key]
+        docs = await self._aget_docs(question)
+        key = self._cache_key(question, docs)
+        answer = self.response_cache.get(key)
+        if answer is None:
+            answer = await self.combine_documents_chain.arun(
+                input_documents=docs, question=question, callbacks=_run_manager.get_child()
+            )
+            self.response_cache.put(key, answer)
+        return self._output(answer, docs)
+
+def get_llm(openai_api_key=None, llm_temperature=0.2, backend=None, streaming=False):
+    """
+    Return the LLM for the RAG chain: OpenAI, or the offline DeterministicLLM
+    when `backend` (default settings.LLM_BACKEND) is "deterministic".
+    With `streaming`, OpenAI emits tokens as they are generated (see astream_answer).
+    """
+    backend = backend or settings.LLM_BACKEND
+    if backend == "deterministic":
+        return DeterministicLLM()
+    if backend != "openai":
+        raise ValueError(f"Unknown LLM backend '{backend}'. Available: openai, deterministic")
+    return OpenAI(openai_api_key=openai_api_key, temperature=llm_temperature, streaming=streaming)
+
+def get_rag_chain(vector_store, openai_api_key=None, llm_temperature=0.2, bm25_index=None, filter=None,
+                  llm=None, response_cache=None, streaming=False):
     """
     Create a RetrievalQA chain using the vector store and an LLM.
+    With a `bm25_index` (and settings.HYBRID_RETRIEVAL) retrieval is hybrid.
+    `vector_store` may also be a PartitionRouter; retrieval then only visits
+    the partitions matching `filter`, e.g. {"category": "technical"}.
+    `llm` defaults to get_llm(); with a ResponseCache, LLM answers are reused
+    for repeated queries over the same retrieved chunks. Pass `streaming=True`
+    for a chain used with astream_answer.
     """
-    # Use OpenAI LLM (or swap for HuggingFacePipeline if preferred)
-    llm = OpenAI(openai_api_key=openai_api_key, temperature=llm_temperature)
-    retriever = vector_store.as_retriever()
-    rag_chain = RetrievalQA.from_chain_type(
+    # OpenAI by default; settings.LLM_BACKEND="deterministic" runs offline
+    llm = llm or get_llm(openai_api_key, llm_temperature, streaming=streaming)
+    if isinstance(vector_store, PartitionRouter):
+        retriever = vector_store.as_retriever(filter=filter)
+    elif bm25_index is not None and settings.HYBRID_RETRIEVAL:
+        retriever = HybridRetriever(vector_store, bm25_index)
+    else:
+        retriever = vector_store.as_retriever()
+    rag_chain = CachedRetrievalQA.from_chain_type(
         llm=llm,
         retriever=retriever,
-        return_source_documents=True
+        return_source_documents=True,
+        response_cache=response_cache
     )
     return rag_chain
 
-def answer_query(rag_chain, query):
+def vector_store_version(vector_store):
+    """
+    Content hash over every indexed chunk; it changes whenever the index does.
+    """
+    if isinstance(vector_store, PartitionRouter):
+        return content_hash("\n".join(
+            vector_store_version(vector_store.stores[key]) for key in sorted(vector_store.stores)
+        ))
+    hashes = sorted(
+        content_hash(vector_store.docstore.search(doc_id).page_content)
+        for doc_id in vector_store.index_to_docstore_id.values()
+    )
+    return content_hash("\n".join(hashes))
+
+def answer_query(rag_chain, query, nprobe=None, ef_search=None, query_cache=None):
     """
     Use the RAG chain to answer a user query.
+    `nprobe` (IVF-PQ) and `ef_search` (HNSW) trade recall for latency on
+    approximate indexes; they stay in effect for later queries.
+    With a QueryCache, repeated or paraphrased queries skip retrieval and the
+    LLM call; call query_cache.set_index_version(vector_store_version(...))
+    after (re)building the index, and use one cache per chain (e.g. per
+    partition filter).
     Returns the answer and source documents.
     """
+    if query_cache is not None:
+        cached = query_cache.get(query)
+        if cached is not None:
+            return cached
+    _set_search_params(rag_chain, nprobe, ef_search)
     result = rag_chain(query)
     answer = result['result']
     sources = result.get('source_documents', [])
+    if query_cache is not None:
+        query_cache.put(query, (answer, sources))
     return answer, sources
 
+def _set_search_params(rag_chain, nprobe=None, ef_search=None):
+    if not (nprobe or ef_search):
+        return
+    retriever = rag_chain.retriever
+    if isinstance(retriever, PartitionRetriever):
+        vector_stores = list(retriever.router.stores.values())
+    elif isinstance(retriever, HybridRetriever):
+        vector_stores = [retriever.vector_store]
+    else:
+        vector_stores = [retriever.vectorstore]
+    for vector_store in vector_stores:
+        set_search_params(vector_store.index, nprobe=nprobe, ef_search=ef_search)
+
+class _TokenQueue(AsyncCallbackHandler):
+    """
+    Callback handler collecting the tokens an LLM streams in an asyncio.Queue.
+    """
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+    async def on_llm_new_token(self, token, **kwargs):
+        self.queue.put_nowait(token)
+
+# (time_to_first_token, total) in seconds of recent streamed answers
+_stream_latencies = deque(maxlen=1000)
+
+async def astream_answer(rag_chain, query, nprobe=None, ef_search=None, query_cache=None):
+    """
+    Async, streaming variant of answer_query.
+
+    Yields {"type": "token", "text": str} events as the LLM generates the
+    answer, then one {"type": "done", "answer": str, "sources": list,
+    "ttft_ms": float, "total_ms": float} event. Only LLMs that stream emit
+    tokens (get_rag_chain(streaming=True) or DeterministicLLM); otherwise, and
+    for cached answers, the whole answer arrives as a single token.
+    Closing the generator, or cancelling the task iterating it, cancels the
+    chain, e.g. when the client disconnects.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    if query_cache is not None:
+        cached = await loop.run_in_executor(None, query_cache.get, query)
+        if cached is not None:
+            answer, sources = cached
+            ttft = time.perf_counter() - started
+            yield {"type": "token", "text": answer}
+            yield _stream_done(answer, sources, ttft, ttft)
+            return
+    _set_search_params(rag_chain, nprobe, ef_search)
+
+    handler = _TokenQueue()
+    task = asyncio.ensure_future(rag_chain.acall(query, callbacks=[handler]))
+    get, ttft, streamed = None, None, False
+    try:
+        while True:
+            get = asyncio.ensure_future(handler.queue.get())
+            await asyncio.wait({get, task}, return_when=asyncio.FIRST_COMPLETED)
+            if get.done():
+                token = get.result()
+            else:
+                # The chain finished: flush what is left in the queue
+                get.cancel()
+                if handler.queue.empty():
+                    break
+                token = handler.queue.get_nowait()
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            streamed = True
+            yield {"type": "token", "text": token}
+
+        result = task.result()
+        answer = result['result']
+        sources = result.get('source_documents', [])
+        if not streamed:
+            ttft = time.perf_counter() - started
+            yield {"type": "token", "text": answer}
+        if query_cache is not None:
+            await loop.run_in_executor(None, query_cache.put, query, (answer, sources))
+        yield _stream_done(answer, sources, ttft, time.perf_counter() - started)
+    finally:
+        if get is not None:
+            get.cancel()
+        if not task.done():
+            task.cancel()
+
+def _stream_done(answer, sources, ttft, total):
+    _stream_latencies.append((ttft, total))
+    return {
+        "type": "done",
+        "answer": answer,
+        "sources": sources,
+        "ttft_ms": ttft * 1000,
+        "total_ms": total * 1000
+    }
+
+def get_streaming_stats():
+    """
+    Return time-to-first-token and total latency percentiles (ms) of recent streamed answers.
+    """
+    stats = {"answers": len(_stream_latencies)}
+    for i, name in enumerate(("ttft", "total")):
+        values = sorted(latencies[i] * 1000 for latencies in _stream_latencies)
+        for p in (50, 95):
+            stats[f"{name}_p{p}_ms"] = values[min(len(values) - 1, len(values) * p // 100)] if values else 0.0
+    return stats
+
 # Example usage (for testing/demo)
 if __name__ == "__main__":
     # Paths to your JSON files
@@ -79,15 +652,23 @@ if __name__ == "__main__":
         "data/behavioral_questions.json",
         "data/hr_questions.json"
     ]
-    # Build vector store
-    vector_store = build_vector_store_from_json(json_paths)
+    # Build vector store and the BM25 index next to it
+    bm25_index = BM25Index(index_dir=settings.VECTOR_STORE_DIR)
+    vector_store = build_vector_store_from_json(
+        json_paths, persist_dir=settings.VECTOR_STORE_DIR, bm25_index=bm25_index,
+        dedup_report=settings.DEDUP_REPORT_PATH
+    )
     
     # You need your OpenAI API key (set as env variable or pass directly)
     openai_api_key = os.environ.get("OPENAI_API_KEY")
-    rag_chain = get_rag_chain(vector_store, openai_api_key=openai_api_key)
+    rag_chain = get_rag_chain(
+        vector_store, openai_api_key=openai_api_key, bm25_index=bm25_index, response_cache=ResponseCache()
+    )
+    query_cache = QueryCache(vector_store.embedding_function)
+    query_cache.set_index_version(vector_store_version(vector_store))
     
     # Example query
     query = "What is object-oriented programming?"
-    answer, sources = answer_query(rag_chain, query)
+    answer, sources = answer_query(rag_chain, query, query_cache=query_cache)
     print("Answer:", answer)
     print("Sources:", sources)
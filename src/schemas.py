@@ -1 +1,14 @@
- 
\ No newline at end of file
+# src/schemas.py
+
+from pydantic import BaseModel
+
+class AnswerEvaluationRequest(BaseModel):
+    answer: str
+    model_answer: str
+
+class AnswerEvaluationResponse(BaseModel):
+    score: float
+    feedback: str
+
+class SentimentRequest(BaseModel):
+    text: str
@@ -0,0 +1,149 @@
+# src/scoring_service.py
+
+import asyncio
+import time
+from collections import Counter
+
+from src.evaluation import evaluate_answers
+
+class ScoringService:
+    """
+    Collects concurrent scoring requests into micro-batches.
+
+    A batch is dispatched as soon as it holds `max_batch_size` requests or the
+    oldest request has waited `max_wait_ms`. The batch is scored in a worker
+    thread or process so the encoder forward pass never blocks the event loop, and every
+    caller's future is resolved with its own (score, feedback) result.
+    """
+
+    def __init__(self, max_batch_size=32, max_wait_ms=10, score_fn=evaluate_answers, executor=None):
+        """
+        Args:
+            max_batch_size (int): Upper bound on requests per encoder call.
+            max_wait_ms (float): Longest time the first request of a batch waits for company.
+            score_fn (callable): Maps a list of (answer, model_answer) pairs to
+                results. A coroutine function is awaited directly (e.g.
+                InferenceExecutor.score_batch); a plain function runs in `executor`.
+            executor (concurrent.futures.Executor, optional): Where plain
+                `score_fn` batches run; defaults to the event loop's thread pool.
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.score_fn = score_fn
+        self.executor = executor
+        self._queue = None
+        self._worker = None
+        # Requests taken off the queue and not resolved yet
+        self._batch = []
+        self._batch_sizes = Counter()
+        self._requests = 0
+        self._last_batch_seconds = 0.0
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        """Start the background batching loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the batching loop and fail any requests still waiting, including
+        those of a batch that was being collected or scored.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        pending = self._batch
+        self._batch = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Scoring service stopped"))
+
+    async def score(self, answer, model_answer):
+        """
+        Queue one answer for scoring and wait for its batch to finish.
+
+        Returns:
+            (score, feedback): Same result as evaluation.evaluate_answer.
+        """
+        if not self.running:
+            raise RuntimeError("Scoring service is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((answer, model_answer), future))
+        return await future
+
+    async def _collect(self):
+        # Filled in place, so stop() sees requests taken off the queue so far
+        loop = asyncio.get_running_loop()
+        batch = self._batch = []
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. client disconnected) are not scored
+            batch = self._batch = [(pair, future) for pair, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            pairs = [pair for pair, _ in batch]
+            started = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(self.score_fn):
+                    results = await self.score_fn(pairs)
+                else:
+                    results = await loop.run_in_executor(self.executor, self.score_fn, pairs)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self._last_batch_seconds = time.perf_counter() - started
+                self._batch_sizes[len(batch)] += 1
+                self._requests += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self._batch = []
+
+    def metrics(self):
+        """
+        Return queue depth and batch-size statistics.
+        """
+        batches = sum(self._batch_sizes.values())
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "requests": self._requests,
+            "batches": batches,
+            "avg_batch_size": self._requests / batches if batches else 0.0,
+            "max_batch_size_seen": max(self._batch_sizes) if self._batch_sizes else 0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "last_batch_seconds": round(self._last_batch_seconds, 4),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
@@ -1,18 +1,59 @@
 # src/sentiment_analysis.py
 
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import nltk
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
+# Inputs at least this large are split across worker processes
+PARALLEL_THRESHOLD = 5000
+
+_sia = None
+_sia_lock = threading.Lock()
+
 def get_sia():
     """
     Singleton loader for VADER SentimentIntensityAnalyzer.
-    Downloads lexicon if needed.
+    Downloads lexicon if needed; the lexicon is parsed once per process.
     """
-    try:
-        nltk.data.find('sentiment/vader_lexicon.zip')
-    except LookupError:
-        nltk.download('vader_lexicon')
-    return SentimentIntensityAnalyzer()
+    global _sia
+    if _sia is None:
+        with _sia_lock:
+            if _sia is None:
+                try:
+                    nltk.data.find('sentiment/vader_lexicon.zip')
+                except LookupError:
+                    nltk.download('vader_lexicon')
+                _sia = SentimentIntensityAnalyzer()
+    return _sia
+
+NEUTRAL_RESULT = {
+    'compound': 0.0,
+    'label': 'Neutral',
+    'pos': 0.0,
+    'neu': 1.0,
+    'neg': 0.0
+}
+
+def _to_result(scores):
+    compound = scores['compound']
+    # Assign a label based on compound score
+    if compound >= 0.05:
+        label = 'Positive'
+    elif compound <= -0.05:
+        label = 'Negative'
+    else:
+        label = 'Neutral'
+    return {
+        'compound': compound,
+        'label': label,
+        'pos': scores['pos'],
+        'neu': scores['neu'],
+        'neg': scores['neg']
+    }
 
 def analyze_sentiment(text):
     """
@@ -31,30 +72,120 @@ def analyze_sentiment(text):
         }
     """
     if not isinstance(text, str) or not text.strip():
+        return dict(NEUTRAL_RESULT)
+    return _to_result(get_sia().polarity_scores(text))
+
+def _analyze_chunk(texts):
+    return [analyze_sentiment(text) for text in texts]
+
+def analyze_sentiment_batch(texts, workers=None, chunk_size=1000, parallel_threshold=PARALLEL_THRESHOLD):
+    """
+    Analyze the sentiment of many texts, e.g. for a backfill.
+
+    Small inputs run in-process with the cached analyzer. VADER is pure
+    Python, so inputs of `parallel_threshold` texts or more are split into
+    chunks and scored by a process pool (each worker loads the lexicon once).
+
+    Args:
+        texts (iterable): Texts to analyze.
+        workers (int, optional): Worker processes (default: CPU count).
+        chunk_size (int): Texts per worker task.
+        parallel_threshold (int): Minimum input size that uses the process pool.
+
+    Returns:
+        list: One analyze_sentiment result per text, in input order.
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if len(texts) < parallel_threshold or workers <= 1:
+        return _analyze_chunk(texts)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=get_sia) as pool:
+        results = []
+        for chunk_results in pool.map(_analyze_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+class SentimentTracker:
+    """
+    Rolling sentiment of one interview, updated in O(1) per answer.
+
+    Keeps an exponentially weighted moving average (EWMA) of the compound
+    score and the number of negative answers among the last `window` turns.
+    The state is a plain dict (see to_dict/from_dict) so it can live in
+    Streamlit session state.
+    """
+
+    def __init__(self, alpha=0.4, window=3):
+        self.alpha = alpha
+        self.window = window
+        self.ewma = None
+        self.turns = 0
+        self.recent = deque(maxlen=window)
+        self.negative_in_window = 0
+
+    def update(self, result):
+        """
+        Add one answer's sentiment.
+
+        Args:
+            result (dict): Output of analyze_sentiment.
+
+        Returns:
+            SentimentTracker: self, for chaining.
+        """
+        compound = result['compound']
+        negative = result['label'] == 'Negative'
+        self.ewma = compound if self.ewma is None else (
+            self.alpha * compound + (1 - self.alpha) * self.ewma
+        )
+        if len(self.recent) == self.window:
+            self.negative_in_window -= self.recent[0]
+        self.recent.append(negative)
+        self.negative_in_window += negative
+        self.turns += 1
+        return self
+
+    def is_sustained_negative(self, ewma_threshold=-0.35, min_negative=2, min_turns=2):
+        """
+        True when negativity has persisted rather than appeared in one answer.
+
+        Args:
+            ewma_threshold (float): Trigger when the EWMA falls to or below this.
+            min_negative (int): Trigger when this many of the last `window` answers were negative.
+            min_turns (int): Never trigger before this many answers.
+        """
+        if self.turns < min_turns or self.ewma is None:
+            return False
+        return self.ewma <= ewma_threshold or self.negative_in_window >= min_negative
+
+    def describe(self):
+        """
+        Summarize the rolling state, e.g. for a handoff reason.
+        """
+        ewma = "n/a" if self.ewma is None else f"{self.ewma:.2f}"
+        return (f"sentiment EWMA {ewma}, {self.negative_in_window} of the last "
+                f"{len(self.recent)} answers negative")
+
+    def to_dict(self):
         return {
-            'compound': 0.0,
-            'label': 'Neutral',
-            'pos': 0.0,
-            'neu': 1.0,
-            'neg': 0.0
+            'alpha': self.alpha,
+            'window': self.window,
+            'ewma': self.ewma,
+            'turns': self.turns,
+            'recent': list(self.recent),
+            'negative_in_window': self.negative_in_window
         }
-    sia = get_sia()
-    scores = sia.polarity_scores(text)
-    compound = scores['compound']
-    # Assign a label based on compound score
-    if compound >= 0.05:
-        label = 'Positive'
-    elif compound <= -0.05:
-        label = 'Negative'
-    else:
-        label = 'Neutral'
-    return {
-        'compound': compound,
-        'label': label,
-        'pos': scores['pos'],
-        'neu': scores['neu'],
-        'neg': scores['neg']
-    }
+
+    @classmethod
+    def from_dict(cls, state):
+        tracker = cls(alpha=state['alpha'], window=state['window'])
+        tracker.ewma = state['ewma']
+        tracker.turns = state['turns']
+        tracker.recent.extend(state['recent'])
+        tracker.negative_in_window = state['negative_in_window']
+        return tracker
 
 # Example usage (for testing/demo)
 if __name__ == "__main__":
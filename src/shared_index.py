@@ -0,0 +1,174 @@
+# src/shared_index.py
+
+import contextlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from src.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishers are not serialized
+    fcntl = None
+
+CURRENT_FILE = "CURRENT"
+
+class IndexSnapshots:
+    """
+    Versioned, read-only directories of index files shared by every worker.
+
+    Each published version lives in `<root>/versions/<version>/` and is never
+    modified afterwards, so workers can memory-map its files (FAISS indexes,
+    embedding matrices) and share one copy of their pages through the OS page
+    cache. `<root>/CURRENT` names the live version; publishing a new one
+    replaces it atomically with os.replace, so a reader sees either the old
+    or the new version, never a partial one.
+    """
+
+    def __init__(self, root=None, keep=None):
+        """
+        Args:
+            root (str): Snapshot directory (default settings.SHARED_INDEX_DIR).
+            keep (int): Published versions kept on disk (default settings.SHARED_INDEX_KEEP).
+        """
+        self.root = root or settings.SHARED_INDEX_DIR
+        self.keep = keep or settings.SHARED_INDEX_KEEP
+        self.versions_dir = os.path.join(self.root, "versions")
+
+    def current(self):
+        """
+        Return the live version, or None if nothing was published yet.
+        """
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def path(self, version=None):
+        """
+        Directory of `version` (default: the live version), or None.
+        """
+        version = version or self.current()
+        return os.path.join(self.versions_dir, version) if version else None
+
+    @contextlib.contextmanager
+    def _publisher_lock(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def publish(self, build_fn):
+        """
+        Build a new version and make it live.
+
+        `build_fn(path)` writes into a staging directory that starts out with
+        hard links to the files of the live version, so incremental builds only
+        rewrite what changed (index writers replace files rather than editing
+        them, so the links never alter a published version). If nothing was
+        rewritten, the live version is kept. Publishers are serialized with a
+        file lock.
+
+        Returns:
+            str: The live version after publishing.
+        """
+        with self._publisher_lock():
+            current = self.current()
+            # Sortable by publish time: prune() keeps the last names
+            version = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+            staging = os.path.join(self.versions_dir, f".{version}.staging")
+            os.makedirs(staging)
+            try:
+                if current:
+                    _link_files(self.path(current), staging)
+                build_fn(staging)
+                if current and _same_files(self.path(current), staging):
+                    shutil.rmtree(staging)
+                    return current
+                os.replace(staging, self.path(version))
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            tmp_current = os.path.join(self.root, CURRENT_FILE + ".tmp")
+            with open(tmp_current, "w", encoding="utf-8") as f:
+                f.write(version)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_current, os.path.join(self.root, CURRENT_FILE))
+            self.prune()
+            return version
+
+    def prune(self):
+        """
+        Delete all but the `keep` newest versions. Workers still mapping files of
+        a deleted version keep reading them until they switch.
+        """
+        live = self.current()
+        versions = sorted(v for v in os.listdir(self.versions_dir) if not v.startswith("."))
+        for version in versions[:-self.keep]:
+            if version != live:
+                shutil.rmtree(os.path.join(self.versions_dir, version), ignore_errors=True)
+
+def _files(directory):
+    return {
+        os.path.relpath(os.path.join(dirpath, name), directory)
+        for dirpath, _, names in os.walk(directory) for name in names
+    }
+
+def _link_files(source, target):
+    for name in _files(source):
+        os.makedirs(os.path.dirname(os.path.join(target, name)), exist_ok=True)
+        os.link(os.path.join(source, name), os.path.join(target, name))
+
+def _same_files(a, b):
+    names = _files(a)
+    if names != _files(b):
+        return False
+    return all(os.path.samefile(os.path.join(a, name), os.path.join(b, name)) for name in names)
+
+class SharedSnapshot:
+    """
+    A worker's read-only view of the live snapshot.
+
+    get() returns `loader(path)` for the live version, loading it once per
+    version. CURRENT is checked at most every `check_seconds`; when a new
+    version was published the next call loads it and drops the old object,
+    whose memory mappings are released once in-flight requests finish with it.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, loader, snapshots=None, check_seconds=None):
+        self.loader = loader
+        self.snapshots = snapshots or IndexSnapshots()
+        self.check_seconds = settings.SHARED_INDEX_CHECK_SECONDS if check_seconds is None else check_seconds
+        self.version = None
+        self._value = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the loaded live snapshot, or raise FileNotFoundError if nothing was published.
+        """
+        now = time.monotonic()
+        if self._value is not None and now - self._checked < self.check_seconds:
+            return self._value
+        with self._lock:
+            self._checked = now
+            version = self.snapshots.current()
+            if version is None:
+                raise FileNotFoundError(f"No index snapshot published in {self.snapshots.root}")
+            if version != self.version:
+                self._value = self.loader(self.snapshots.path(version))
+                self.version = version
+            return self._value
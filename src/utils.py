@@ -19,6 +19,15 @@ def clean_text(text):
     text = text.translate(str.maketrans('', '', string.punctuation))
     return text
 
+def split_sentences(text):
+    """
+    Split text into sentences on terminal punctuation and line breaks.
+    """
+    if not isinstance(text, str):
+        return []
+    parts = re.split(r'(?<=[.!?])\s+|\n+', text)
+    return [p.strip() for p in parts if p.strip()]
+
 def anonymize_text(text):
     """
     Anonymize sensitive info (basic): emails, phone numbers.
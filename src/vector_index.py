@@ -0,0 +1,265 @@
+# src/vector_index.py
+
+import json
+import logging
+import os
+import faiss
+import numpy as np
+
+from src.config import settings
+from src.embedding_index import content_hash, temp_path
+
+INDEX_TYPES = ("flat", "ivfpq", "hnsw")
+# Map the stored vectors straight from the page cache (shared between processes);
+# plain IO_FLAG_MMAP copies flat codes into private memory. Needs faiss >= 1.9,
+# and has no fallback so an older faiss fails here rather than silently copying.
+MMAP_FLAGS = faiss.IO_FLAG_MMAP_IFC
+
+logger = logging.getLogger(__name__)
+
+def chunk_id(chunk_hash):
+    """
+    Derive a stable, positive 64-bit FAISS id from a chunk's content hash.
+    """
+    return int(chunk_hash[:15], 16)
+
+def _pq_subquantizers(dim, m):
+    # PQ needs the dimension to split evenly; use the largest divisor not above m
+    return max(d for d in range(1, min(m, dim) + 1) if dim % d == 0)
+
+def new_index(vectors, ids, index_type="flat"):
+    """
+    Create an IndexIDMap2 of the given type, train it where needed and add `vectors`.
+
+    IVF-PQ uses min(settings.IVF_NLIST, n // 39) lists and, unless
+    settings.IVF_PQ_REFINE is 0, re-ranks its candidates with exact distances.
+    A bank with fewer vectors than PQ centroids cannot train one and gets a
+    flat index instead (logged; see effective_index_type).
+
+    Args:
+        vectors (np.ndarray): float32 matrix of embeddings.
+        ids (np.ndarray): int64 id of every row.
+        index_type (str): One of INDEX_TYPES.
+
+    Returns:
+        faiss.IndexIDMap2: Populated index with default search parameters applied.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Available: {', '.join(INDEX_TYPES)}")
+    n, dim = vectors.shape
+    if index_type == "ivfpq" and n < 2 ** settings.IVF_PQ_NBITS:
+        logger.warning(
+            "IVF-PQ needs at least %d vectors to train, got %d; building a flat index instead",
+            2 ** settings.IVF_PQ_NBITS, n
+        )
+        index_type = "flat"
+    if index_type == "ivfpq":
+        nlist = max(1, min(settings.IVF_NLIST, n // 39))
+        inner = faiss.IndexIVFPQ(
+            faiss.IndexFlatL2(dim), dim, nlist,
+            _pq_subquantizers(dim, settings.IVF_PQ_M), settings.IVF_PQ_NBITS
+        )
+        if settings.IVF_PQ_REFINE:
+            inner = faiss.IndexRefineFlat(inner)
+            inner.k_factor = settings.IVF_PQ_REFINE
+    elif index_type == "hnsw":
+        inner = faiss.IndexHNSWFlat(dim, settings.HNSW_M)
+        inner.hnsw.efConstruction = settings.HNSW_EF_CONSTRUCTION
+    else:
+        inner = faiss.IndexFlatL2(dim)
+    index = faiss.IndexIDMap2(inner)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add_with_ids(vectors, ids)
+    set_search_params(index)
+    return index
+
+def effective_index_type(index):
+    """
+    Return the type an index was actually built as ("flat", "ivfpq" or "hnsw").
+    """
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap2) else index
+    if isinstance(inner, faiss.IndexRefine):
+        inner = faiss.downcast_index(inner.base_index)
+    if isinstance(inner, faiss.IndexIVF):
+        return "ivfpq"
+    if isinstance(inner, faiss.IndexHNSW):
+        return "hnsw"
+    return "flat"
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """
+    Tune an index at query time; parameters that do not apply to its type are ignored.
+
+    Args:
+        index (faiss.Index): Possibly wrapped (IndexIDMap2) FAISS index.
+        nprobe (int): IVF lists visited per query (default settings.IVF_NPROBE).
+        ef_search (int): HNSW candidate list size (default settings.HNSW_EF_SEARCH).
+    """
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap2) else index
+    if isinstance(inner, faiss.IndexRefine):
+        inner = faiss.downcast_index(inner.base_index)
+    if isinstance(inner, faiss.IndexIVF):
+        inner.nprobe = nprobe or settings.IVF_NPROBE
+    elif isinstance(inner, faiss.IndexHNSW):
+        inner.hnsw.efSearch = ef_search or settings.HNSW_EF_SEARCH
+
+def _remove(index, ids, index_type):
+    inner = faiss.downcast_index(index.index)
+    if not isinstance(inner, (faiss.IndexHNSW, faiss.IndexRefine)):
+        index.remove_ids(ids)
+        return index
+    # HNSW graphs and refined indexes do not support deletion: rebuild from
+    # the exact vectors they store
+    all_ids = faiss.vector_to_array(index.id_map)
+    keep = ~np.isin(all_ids, ids)
+    vectors = inner.reconstruct_n(0, index.ntotal)[keep]
+    return new_index(vectors, all_ids[keep], index_type)
+
+class PersistentVectorIndex:
+    """
+    FAISS index of document chunks that persists between runs.
+
+    The index is stored as `<name>.faiss` (an IndexIDMap2 whose ids are
+    derived from each chunk's content hash) next to a `<name>.json` manifest
+    holding the encoder version and the text and metadata of every chunk.
+    The index file is opened memory-mapped, read-only. Syncing with the current chunks
+    only embeds chunks that were added or changed, and chunks that disappeared
+    are removed by id instead of rebuilding the index.
+
+    `index_type` selects exact ("flat") or approximate ("ivfpq", "hnsw")
+    search; see new_index. An "ivfpq" index that had to start out flat
+    (too few vectors to train) is retrained as IVF-PQ by the first sync that
+    brings it to enough vectors; the manifest records the type actually built
+    as `effective_index_type`. With `index_dir=None` nothing is written to disk.
+    """
+
+    def __init__(self, encoder_version, index_dir="data/vector_store", name="questions", index_type=None):
+        self.encoder_version = encoder_version
+        self.index_type = index_type or settings.VECTOR_INDEX_TYPE
+        self.index_dir = index_dir
+        self.index_path = os.path.join(index_dir, f"{name}.faiss") if index_dir else None
+        self.manifest_path = os.path.join(index_dir, f"{name}.json") if index_dir else None
+        self.index = None
+        self._chunks = {}
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def load(self):
+        """
+        Memory-map the stored index if it was built by the same encoder and index type.
+
+        Returns:
+            bool: True if an index was loaded.
+        """
+        if not (self.index_dir and os.path.exists(self.index_path) and os.path.exists(self.manifest_path)):
+            return False
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("encoder_version") != self.encoder_version:
+            return False
+        if manifest.get("index_type", "flat") != self.index_type:
+            return False
+        self.index = faiss.read_index(self.index_path, MMAP_FLAGS)
+        set_search_params(self.index)
+        self._chunks = manifest.get("chunks", {})
+        return True
+
+    def sync(self, texts, embed_fn, metadatas=None):
+        """
+        Bring the index in line with `texts`, embedding only new or changed chunks.
+
+        Args:
+            texts (list): Every chunk of the current corpus.
+            embed_fn (callable): Maps a list of texts to a 2D array of embeddings.
+            metadatas (list, optional): One metadata dict per text.
+
+        Returns:
+            dict: Number of chunks 'added', 'removed' and 'unchanged'.
+        """
+        if self.index is None:
+            self.load()
+        metadatas = metadatas or [{}] * len(texts)
+        wanted = {}
+        for text, metadata in zip(texts, metadatas):
+            if text and text.strip():
+                wanted.setdefault(content_hash(text), {"text": text, "metadata": metadata})
+
+        added = [h for h in wanted if h not in self._chunks]
+        removed = [h for h in self._chunks if h not in wanted]
+        stats = {"added": len(added), "removed": len(removed), "unchanged": len(wanted) - len(added)}
+        metadata_changed = any(
+            self._chunks[h]["metadata"] != wanted[h]["metadata"] for h in wanted if h in self._chunks
+        )
+        if self.index is not None and not (added or removed or metadata_changed):
+            return stats
+
+        index = self.index
+        if index is not None and self.index_dir:
+            # Memory-mapped inverted lists are read-only; edit an in-memory copy
+            index = faiss.read_index(self.index_path)
+        if removed and index is not None:
+            index = _remove(index, np.array([chunk_id(h) for h in removed], dtype=np.int64), self.index_type)
+        if added:
+            vectors = np.asarray(embed_fn([wanted[h]["text"] for h in added]), dtype=np.float32)
+            ids = np.array([chunk_id(h) for h in added], dtype=np.int64)
+            if index is None:
+                index = new_index(vectors, ids, self.index_type)
+            else:
+                index.add_with_ids(vectors, ids)
+                if (self.index_type == "ivfpq" and effective_index_type(index) == "flat"
+                        and index.ntotal >= 2 ** settings.IVF_PQ_NBITS):
+                    # Started flat because the bank was too small to train IVF-PQ
+                    index = new_index(
+                        faiss.downcast_index(index.index).reconstruct_n(0, index.ntotal),
+                        faiss.vector_to_array(index.id_map),
+                        self.index_type
+                    )
+        if index is None:
+            return stats
+        self.replace(index, wanted)
+        return stats
+
+    def replace(self, index, chunks):
+        """
+        Atomically store `index` and its chunks, then memory-map the new file.
+
+        Args:
+            index (faiss.IndexIDMap2): Vectors keyed by chunk_id of each chunk hash.
+            chunks (dict): {content_hash: {'text': str, 'metadata': dict}}.
+        """
+        if not self.index_dir:
+            self.index = index
+            self._chunks = chunks
+            return
+        os.makedirs(self.index_dir, exist_ok=True)
+        # Unique temporary names: several workers may build the store at once
+        tmp_index = temp_path(self.index_path)
+        tmp_manifest = temp_path(self.manifest_path)
+        try:
+            faiss.write_index(index, tmp_index)
+            with open(tmp_manifest, "w", encoding="utf-8") as f:
+                json.dump({
+                    "encoder_version": self.encoder_version,
+                    "index_type": self.index_type,
+                    "effective_index_type": effective_index_type(index),
+                    "chunks": chunks
+                }, f)
+            # Release the current mapping before the file underneath it is replaced
+            self.index = None
+            os.replace(tmp_index, self.index_path)
+            os.replace(tmp_manifest, self.manifest_path)
+        finally:
+            for path in (tmp_index, tmp_manifest):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.index = faiss.read_index(self.index_path, MMAP_FLAGS)
+        set_search_params(self.index)
+        self._chunks = chunks
+
+    def chunks(self):
+        """
+        Return {faiss_id: {'text': str, 'metadata': dict}} for every indexed chunk.
+        """
+        return {chunk_id(h): chunk for h, chunk in self._chunks.items()}
@@ -0,0 +1,109 @@
+# src/warmup.py
+
+import os
+import time
+from datetime import datetime
+
+from src import evaluation
+from src.config import settings
+from src.sentiment_analysis import analyze_sentiment, get_sia
+
+WARMUP_ANSWER = "Object-oriented programming organizes code into objects and classes."
+WARMUP_MODEL_ANSWER = "OOP is a paradigm based on objects that bundle data and behaviour."
+
+def _load_flan_t5():
+    # Imported lazily: nlp_processor pulls in streamlit, which the API does not need
+    from src.nlp_processor import load_model
+    return load_model()
+
+def _exercise_flan_t5(pipe):
+    pipe("Answer this interview-related question concisely: What is OOP?", max_new_tokens=8)
+
+def _exercise_encoder(model):
+    evaluation.encode_texts([WARMUP_ANSWER, WARMUP_MODEL_ANSWER] * 4)
+
+def _exercise_cross_encoder(model):
+    model.predict([(WARMUP_ANSWER, WARMUP_MODEL_ANSWER)] * 4)
+
+def _exercise_vader(sia):
+    analyze_sentiment(WARMUP_ANSWER)
+
+# name -> (loader, exercise); every model the first request would otherwise load lazily
+WARMUP_MODELS = {
+    "sentence_encoder": (evaluation.get_model, _exercise_encoder),
+    "cross_encoder": (evaluation.get_cross_encoder, _exercise_cross_encoder),
+    "vader": (get_sia, _exercise_vader),
+    "flan_t5": (_load_flan_t5, _exercise_flan_t5),
+}
+
+_status = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "models": {},
+    "error": None
+}
+
+def warm_up_models(names=None):
+    """
+    Load every model and run a dummy batch through it, recording the timings.
+
+    Args:
+        names (list, optional): Keys of WARMUP_MODELS to warm (default: all).
+            The cross-encoder is skipped when settings.CASCADE_CROSS_ENCODER is empty.
+
+    Returns:
+        dict: {name: {'load_seconds': float, 'warm_seconds': float}}
+    """
+    names = list(WARMUP_MODELS) if names is None else names
+    if not settings.CASCADE_CROSS_ENCODER:
+        names = [n for n in names if n != "cross_encoder"]
+    _status["started_at"] = _status["started_at"] or datetime.utcnow().isoformat()
+    timings = {}
+    for name in names:
+        loader, exercise = WARMUP_MODELS[name]
+        started = time.perf_counter()
+        model = loader()
+        loaded = time.perf_counter()
+        exercise(model)
+        timings[name] = {
+            "load_seconds": round(loaded - started, 3),
+            "warm_seconds": round(time.perf_counter() - loaded, 3),
+            "pid": os.getpid()
+        }
+    _status["models"].update(timings)
+    return timings
+
+def mark_ready(models=None, error=None):
+    """
+    Record the outcome of the warm-up phase.
+
+    Args:
+        models (dict, optional): Extra per-model timings (e.g. reported by worker processes).
+        error (str, optional): Failure message; the service then stays not-ready.
+    """
+    if models:
+        _status["models"].update(models)
+    _status["error"] = error
+    _status["ready"] = error is None
+    _status["finished_at"] = datetime.utcnow().isoformat()
+
+def get_warmup_status():
+    """Return a copy of the warm-up status (readiness, timings, error)."""
+    return {**_status, "models": dict(_status["models"])}
+
+def readiness():
+    """
+    Build the readiness probe response.
+
+    Returns:
+        (body, status_code): 503 until mark_ready has been called without
+        an error, 200 from then on.
+    """
+    status = get_warmup_status()
+    body = {
+        "status": "ready" if status["ready"] else "not_ready",
+        "timestamp": datetime.utcnow().isoformat(),
+        "warmup": status
+    }
+    return body, 200 if status["ready"] else 503
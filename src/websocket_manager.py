@@ -70,6 +70,21 @@ class ConnectionManager:
             except Exception as e:
                 print(f"Error sending personal message to client {client_id}: {e}")
                 
+    async def stream_to_client(self, client_id: int, frames) -> bool:
+        """Send each frame of an async iterator to a client as soon as it is produced.
+
+        Stops as soon as the client disconnects and closes the iterator, which
+        cancels the work producing the frames. Returns True if every frame was sent.
+        """
+        try:
+            async for frame in frames:
+                if client_id not in self.active_connections:
+                    return False
+                await self.send_personal_message(client_id, json.dumps(frame, default=str))
+            return True
+        finally:
+            await frames.aclose()
+            
     async def broadcast_json(self, data: dict):
         """Broadcast a JSON message to all connected clients."""
         message = {
@@ -0,0 +1,70 @@
+# tests/test_bm25.py
+
+import json
+import os
+import unittest
+import shutil
+import tempfile
+from unittest.mock import patch
+from src.bm25 import BM25Index, tokenize
+
+DOCS = {
+    "1": "Precision is the share of predicted positives that are correct; recall is the share of positives found.",
+    "2": "Dropout randomly disables neurons during training to reduce overfitting.",
+    "3": "A confusion matrix tabulates true and false positives and negatives.",
+}
+
+class TestBM25Index(unittest.TestCase):
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+
+    def test_tokenize_keeps_language_names(self):
+        self.assertEqual(tokenize("C++ vs C# in .NET"), ["c++", "vs", "c#", "in", "net"])
+
+    def test_exact_terms_rank_first(self):
+        index = BM25Index(index_dir=None)
+        index.sync(DOCS)
+        self.assertEqual(index.search("precision and recall")[0][0], "1")
+        self.assertEqual(index.search("overfitting")[0][0], "2")
+        self.assertEqual(index.search("kubernetes"), [])
+
+    def test_incremental_sync_persists(self):
+        index = BM25Index(index_dir=self.index_dir)
+        self.assertEqual(index.sync(DOCS), {"added": 3, "removed": 0})
+        changed = {k: v for k, v in DOCS.items() if k != "2"}
+        changed["4"] = "Gradient clipping limits exploding gradients."
+        reloaded = BM25Index(index_dir=self.index_dir)
+        self.assertEqual(reloaded.sync(changed), {"added": 1, "removed": 1})
+        self.assertEqual(reloaded.search("dropout"), [])
+        self.assertEqual(reloaded.search("gradients")[0][0], "4")
+        fresh = BM25Index(index_dir=self.index_dir)
+        fresh.load()
+        self.assertEqual(fresh.search("gradients"), reloaded.search("gradients"))
+
+    def test_concurrent_writers_use_separate_temp_files(self):
+        first = BM25Index(index_dir=self.index_dir)
+        second = BM25Index(index_dir=self.index_dir)
+        dump = json.dump
+        temp_files = []
+
+        # The second writer stores its index while the first is writing its own
+        def interleaved_dump(data, f):
+            temp_files.append(f.name)
+            if len(temp_files) == 1:
+                second.sync({"2": DOCS["2"]})
+            dump(data, f)
+
+        with patch("src.bm25.json.dump", side_effect=interleaved_dump):
+            first.sync({"1": DOCS["1"]})
+        self.assertEqual(len(set(temp_files)), 2)
+        self.assertEqual(os.listdir(self.index_dir), [os.path.basename(first.path)])
+        reloaded = BM25Index(index_dir=self.index_dir)
+        reloaded.load()
+        self.assertEqual(reloaded.search("precision")[0][0], "1")
+
+if __name__ == '__main__':
+    unittest.main()
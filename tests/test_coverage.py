@@ -0,0 +1,31 @@
+# tests/test_coverage.py
+
+import unittest
+import numpy as np
+from src.coverage import coverage_from_vectors, split_key_points
+
+class TestCoverage(unittest.TestCase):
+
+    def test_split_key_points(self):
+        answer = "OOP is based on objects. It uses classes; also inheritance. Short."
+        points = split_key_points(answer)
+        self.assertEqual(points, ["OOP is based on objects.", "It uses classes; also inheritance. Short."])
+        self.assertEqual(split_key_points("Yes"), ["Yes"])
+        self.assertEqual(split_key_points(""), [])
+
+    def test_coverage_from_vectors(self):
+        points = ["point a", "point b", "point c"]
+        point_vecs = np.eye(3, dtype=np.float32)
+        sentence_vecs = np.array([[1.0, 0.0, 0.0], [0.0, 0.6, 0.8]], dtype=np.float32)
+        coverage = coverage_from_vectors(points, sentence_vecs, point_vecs, threshold=0.7)
+        self.assertEqual(coverage["covered"], ["point a", "point c"])
+        self.assertEqual(coverage["missed"], ["point b"])
+        self.assertAlmostEqual(coverage["ratio"], 2 / 3)
+
+    def test_no_sentences_misses_everything(self):
+        coverage = coverage_from_vectors(["point a"], [], [])
+        self.assertEqual(coverage["missed"], ["point a"])
+        self.assertEqual(coverage["ratio"], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
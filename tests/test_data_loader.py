@@ -3,7 +3,10 @@
 import unittest
 import os
 import json
-from src.data_loader import load_questions
+import shutil
+import tempfile
+from unittest.mock import patch
+from src.data_loader import extract_question_items, iter_question_items, load_questions
 
 class TestDataLoader(unittest.TestCase):
 
@@ -51,6 +54,25 @@ class TestDataLoader(unittest.TestCase):
         self.assertIn("text", questions[0])
         self.assertIn("model_answer", questions[0])
 
+    def test_load_questions_reports_merges_only_when_asked(self):
+        with open(self.hr_file, "w", encoding="utf-8") as f:
+            json.dump([
+                {"question": "What is OOP?", "model_answer": "Object-Oriented Programming..."},
+                {"question": "Why do you want this job?", "model_answer": "Because..."}
+            ], f)
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir, ignore_errors=True)
+        default_report = os.path.join(report_dir, "default_report.json")
+        with patch("src.data_loader.settings.DEDUP_REPORT_PATH", default_report):
+            questions = load_questions(self.tech_file, self.beh_file, self.hr_file)
+        self.assertEqual(len(questions), 3)
+        self.assertFalse(os.path.exists(default_report))
+
+        report = os.path.join(report_dir, "dedup_report.json")
+        load_questions(self.tech_file, self.beh_file, self.hr_file, dedup_report=report)
+        with open(report, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["merged"], 1)
+
     def test_load_questions_missing_file(self):
         # Remove one file and test
         os.remove(self.hr_file)
@@ -74,5 +96,18 @@ class TestDataLoader(unittest.TestCase):
         )
         self.assertEqual(len(questions), 2)  # Only tech and hr have data
 
+    def test_iter_question_items_streams_every_shape(self):
+        wrapped = {"version": 2, "meta": {"tags": ["a", "b"]}, "behavioral_questions": [
+            {"question": f"Q{i} [x]", "answer": 'A, "quoted" ' * i} for i in range(20)
+        ]}
+        for data in (wrapped, wrapped["behavioral_questions"], [], {"questions": []}):
+            with open(self.beh_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            for block_size in (7, 1 << 16):
+                self.assertEqual(
+                    list(iter_question_items(self.beh_file, block_size=block_size)),
+                    extract_question_items(data)
+                )
+
 if __name__ == "__main__":
     unittest.main()
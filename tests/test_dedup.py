@@ -0,0 +1,58 @@
+# tests/test_dedup.py
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.dedup import NearDuplicateIndex, deduplicate, lsh_bands
+
+QUESTIONS = [
+    {"question": "What is overfitting?", "answer": "Overfitting is when a model learns the noise in the training data and fails to generalize to new data."},
+    {"question": "What is a hash table?", "answer": "A hash table maps keys to values through a hash function, giving average constant-time lookups."},
+    {"question": "What's overfitting?", "answer": "Overfitting is when a model learns the noise in the training data and fails to generalise to new data."},
+    {"question": "Explain gradient descent.", "answer": "Gradient descent updates parameters in the direction of the negative gradient of the loss."},
+]
+
+def text(item):
+    return f"{item['question']}\n{item['answer']}"
+
+class TestDedup(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_reworded_duplicate_is_merged_into_first_entry(self):
+        report_path = os.path.join(self.tmp_dir, "dedup_report.json")
+        kept, report = deduplicate(QUESTIONS, text, label_fn=lambda item: item["question"], report_path=report_path)
+        self.assertEqual([item["question"] for item in kept], [
+            "What is overfitting?", "What is a hash table?", "Explain gradient descent."
+        ])
+        self.assertEqual(report["merged"], 1)
+        with open(report_path, "r", encoding="utf-8") as f:
+            cluster = json.load(f)["clusters"][0]
+        self.assertEqual(cluster["kept"], "What is overfitting?")
+        self.assertEqual(cluster["merged"][0]["entry"], "What's overfitting?")
+
+    def test_distinct_entries_are_kept_without_report(self):
+        report_path = os.path.join(self.tmp_dir, "dedup_report.json")
+        kept, report = deduplicate([QUESTIONS[0], QUESTIONS[1]], text, report_path=report_path)
+        self.assertEqual(len(kept), 2)
+        self.assertEqual(report["merged"], 0)
+        self.assertFalse(os.path.exists(report_path))
+
+    def test_empty_text_is_never_merged(self):
+        index = NearDuplicateIndex(threshold=0.7)
+        self.assertTrue(index.add(""))
+        self.assertTrue(index.add("?!"))
+
+    def test_lsh_bands_cover_threshold(self):
+        bands, rows = lsh_bands(0.7, 128)
+        self.assertEqual(bands * rows, 128)
+        self.assertLessEqual((1 / bands) ** (1 / rows), 0.7)
+
+if __name__ == '__main__':
+    unittest.main()
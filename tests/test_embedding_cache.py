@@ -0,0 +1,80 @@
+# tests/test_embedding_cache.py
+
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+import numpy as np
+from src.embedding_cache import EmbeddingCache, normalize_text
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "cache.sqlite3")
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), 0.5] for t in texts], dtype=np.float32)
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  Hello \n\t world "), "Hello world")
+        self.assertEqual(normalize_text(None), "")
+
+    def test_memory_and_disk_tiers(self):
+        cache = EmbeddingCache("model-a", db_path=self.db_path, max_items=1)
+        cache.encode(["one", "three"], self.encode)
+        vectors = cache.encode(["three ", "one"], self.encode)
+        np.testing.assert_array_equal(vectors, [[5.0, 0.5], [3.0, 0.5]])
+        self.assertEqual(self.calls, [["one", "three"]])
+        stats = cache.stats()
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["hits_memory"], 1)
+        self.assertEqual(stats["hits_disk"], 1)
+        self.assertEqual(stats["memory_items"], 1)
+        cache.close()
+
+    def test_persistence_and_model_isolation(self):
+        EmbeddingCache("model-a", db_path=self.db_path).encode(["text"], self.encode)
+        reopened = EmbeddingCache("model-a", db_path=self.db_path)
+        self.assertIsNotNone(reopened.get("text"))
+        other_model = EmbeddingCache("model-b", db_path=self.db_path)
+        self.assertIsNone(other_model.get("text"))
+        reopened.close()
+        other_model.close()
+
+    def test_disk_tier_keeps_most_recently_used_rows(self):
+        cache = EmbeddingCache("model-a", db_path=self.db_path, max_disk_items=2, prune_every=0)
+        with patch("src.embedding_cache.time.time", return_value=1000.0):
+            cache.encode(["old"], self.encode)
+        with patch("src.embedding_cache.time.time", return_value=2000.0):
+            cache.encode(["newer"], self.encode)
+        with patch("src.embedding_cache.time.time", return_value=3000.0):
+            cache.encode(["old", "newest"], self.encode)
+            self.assertEqual(cache.prune(), 2)
+        cache.close()
+        reopened = EmbeddingCache("model-a", db_path=self.db_path, max_items=1)
+        self.assertIsNotNone(reopened.get("old"))
+        self.assertIsNone(reopened.get("newer"))
+        self.assertIsNotNone(reopened.get("newest"))
+        reopened.close()
+
+    def test_unused_rows_expire_on_periodic_prune(self):
+        cache = EmbeddingCache("model-a", db_path=self.db_path, ttl_seconds=60, prune_every=2)
+        with patch("src.embedding_cache.time.time", return_value=1000.0):
+            cache.encode(["stale"], self.encode)
+        with patch("src.embedding_cache.time.time", return_value=1100.0):
+            cache.encode(["fresh"], self.encode)
+        cache.close()
+        reopened = EmbeddingCache("model-a", db_path=self.db_path)
+        self.assertIsNone(reopened.get("stale"))
+        self.assertIsNotNone(reopened.get("fresh"))
+        reopened.close()
+
+if __name__ == '__main__':
+    unittest.main()
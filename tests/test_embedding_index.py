@@ -0,0 +1,67 @@
+# tests/test_embedding_index.py
+
+import os
+import unittest
+import shutil
+import tempfile
+from unittest.mock import patch
+import numpy as np
+from src.embedding_index import ModelAnswerIndex
+
+class TestModelAnswerIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.encoded = []
+
+    def tearDown(self):
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    def test_build_and_reload(self):
+        index = ModelAnswerIndex("enc-v1", index_dir=self.index_dir)
+        self.assertEqual(index.build(["alpha", "beta", "alpha"], self.encode), 2)
+        reloaded = ModelAnswerIndex("enc-v1", index_dir=self.index_dir)
+        self.assertTrue(reloaded.load())
+        np.testing.assert_array_equal(reloaded.get("beta"), [4.0, 1.0])
+        self.assertIsNone(reloaded.get("gamma"))
+
+    def test_only_changed_entries_are_encoded(self):
+        index = ModelAnswerIndex("enc-v1", index_dir=self.index_dir)
+        index.build(["alpha", "beta"], self.encode)
+        self.assertEqual(index.build(["alpha", "beta"], self.encode), 0)
+        self.assertEqual(index.build(["alpha", "gamma!"], self.encode), 1)
+        self.assertEqual(self.encoded, ["alpha", "beta", "gamma!"])
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.get("beta"))
+
+    def test_encoder_version_mismatch_is_ignored(self):
+        ModelAnswerIndex("enc-v1", index_dir=self.index_dir).build(["alpha"], self.encode)
+        self.assertFalse(ModelAnswerIndex("enc-v2", index_dir=self.index_dir).load())
+
+    def test_concurrent_builders_use_separate_temp_files(self):
+        first = ModelAnswerIndex("enc-v1", index_dir=self.index_dir)
+        second = ModelAnswerIndex("enc-v1", index_dir=self.index_dir)
+        save = np.save
+        temp_files = []
+
+        # The second builder writes its files while the first is saving its own
+        def interleaved_save(f, matrix):
+            temp_files.append(f.name)
+            if len(temp_files) == 1:
+                second.build(["beta"], self.encode)
+            save(f, matrix)
+
+        with patch("src.embedding_index.np.save", side_effect=interleaved_save):
+            first.build(["alpha"], self.encode)
+        self.assertEqual(len(set(temp_files)), 2)
+        self.assertEqual(sorted(os.listdir(self.index_dir)), ["model_answers.json", "model_answers.npy"])
+        reloaded = ModelAnswerIndex("enc-v1", index_dir=self.index_dir)
+        self.assertTrue(reloaded.load())
+        np.testing.assert_array_equal(reloaded.get("alpha"), [5.0, 1.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_encoders.py
+
+import unittest
+import numpy as np
+from src.encoders import cap_token_lengths, encode_bucketed
+
+class RecordingEncoder:
+    """
+    Embeds a text as [word count, first word length] and records every batch.
+    """
+    tokenizer = None
+
+    def __init__(self, max_seq_length=None):
+        self.max_seq_length = max_seq_length
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        self.batches.append(list(texts))
+        return np.array([[len(t.split()), len(t.split()[0])] for t in texts], dtype=np.float32)
+
+class TestEncodeBucketed(unittest.TestCase):
+
+    def test_cap_token_lengths_keeps_first_tokens(self):
+        texts = ["one two three four five six", "short"]
+        capped, lengths = cap_token_lengths(None, texts, max_tokens=5)
+        # Two of the five tokens are [CLS] and [SEP]
+        self.assertEqual(capped, ["one two three", "short"])
+        self.assertEqual(lengths, [5, 3])
+
+    def test_output_order_is_preserved_across_buckets(self):
+        encoder = RecordingEncoder()
+        lengths = [40, 1, 25, 3, 40, 12]
+        texts = [" ".join(["w" * (i + 1)] * n) for i, n in enumerate(lengths)]
+        vectors = encode_bucketed(encoder, texts, batch_size=2, max_tokens=64, bucket_width=8,
+                                  normalize_embeddings=False)
+        np.testing.assert_array_equal(vectors, [[n, i + 1] for i, n in enumerate(lengths)])
+        # Short texts are never batched with long ones
+        for batch in encoder.batches:
+            counts = [len(t.split()) for t in batch]
+            self.assertLess(max(counts) - min(counts), 8)
+            self.assertLessEqual(len(batch), 2)
+
+    def test_texts_are_capped_at_max_tokens(self):
+        encoder = RecordingEncoder()
+        vectors = encode_bucketed(encoder, ["word " * 1000, "tiny"], max_tokens=16, normalize_embeddings=False)
+        self.assertEqual(vectors[:, 0].tolist(), [14, 1])
+        self.assertTrue(all(len(t.split()) <= 14 for batch in encoder.batches for t in batch))
+
+    def test_cap_follows_encoder_max_seq_length(self):
+        encoder = RecordingEncoder(max_seq_length=8)
+        vectors = encode_bucketed(encoder, ["word " * 100], max_tokens=256, normalize_embeddings=False)
+        self.assertEqual(vectors[0, 0], 6)
+
+    def test_empty_input(self):
+        self.assertEqual(encode_bucketed(RecordingEncoder(), []).shape, (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
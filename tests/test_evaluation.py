@@ -0,0 +1,190 @@
+# tests/test_evaluation.py
+
+import re
+import shutil
+import tempfile
+import unittest
+import zlib
+from unittest.mock import patch
+import numpy as np
+
+from src.coverage import coverage_from_vectors
+from src.embedding_cache import EmbeddingCache
+from src.embedding_index import ModelAnswerIndex
+from src.evaluation import (
+    LexicalPreScorer, aggregate_similarities, evaluate_answer, evaluate_answers, sentence_windows
+)
+
+class FakeEncoder:
+    """
+    Deterministic bag-of-words encoder standing in for the sentence transformer.
+    """
+    tokenizer = None
+    max_seq_length = 256
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1.0
+        if normalize_embeddings:
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors
+
+class EvaluationTestCase(unittest.TestCase):
+    """
+    Runs the scoring code against FakeEncoder, with the embedding cache and
+    model-answer indexes in a temporary directory.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.encoder = FakeEncoder()
+        self.cache = EmbeddingCache("fake", db_path=f"{self.tmp_dir}/cache.sqlite3")
+        answer_index = ModelAnswerIndex("fake", index_dir=self.tmp_dir)
+        key_point_index = ModelAnswerIndex("fake", index_dir=self.tmp_dir, name="key_points")
+        for target, value in [
+            ("get_model", self.encoder),
+            ("get_embedding_cache", self.cache),
+            ("get_model_answer_index", answer_index),
+            ("get_key_point_index", key_point_index),
+        ]:
+            patcher = patch(f"src.evaluation.{target}", return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+class TestEvaluateAnswers(EvaluationTestCase):
+
+    def test_evaluate_answers_batch_order(self):
+        model_answer = "OOP is a paradigm based on objects and classes."
+        pairs = [
+            ("OOP is a paradigm based on objects and classes.", model_answer),
+            ("", model_answer),
+            ("I don't know.", model_answer),
+        ]
+        results = evaluate_answers(pairs, batch_size=2, cascade=False)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[1], (0.0, "No answer provided."))
+        self.assertGreater(results[0][0], results[2][0])
+        with patch("src.evaluation.settings.SCORING_CASCADE", False):
+            self.assertEqual(results[2], evaluate_answer(*pairs[2]))
+
+    def test_batch_matches_single_answers_in_order(self):
+        model_answers = [
+            "A hash table maps keys to values through a hash function.",
+            "Gradient descent follows the negative gradient of the loss.",
+        ]
+        pairs = [
+            ("Gradient descent steps against the gradient of the loss.", model_answers[1]),
+            ("A hash table maps keys to values.", model_answers[0]),
+            ("It maps keys to values with hashing.", model_answers[0]),
+            ("   ", model_answers[1]),
+            ("I am not sure about the loss.", model_answers[1]),
+        ]
+        with patch("src.evaluation.settings.SCORING_CASCADE", False):
+            expected = [evaluate_answer(answer, model_answer) for answer, model_answer in pairs]
+            self.assertEqual(evaluate_answers(pairs, batch_size=2), expected)
+            self.assertEqual(evaluate_answers(list(reversed(pairs)), batch_size=3), list(reversed(expected)))
+
+    def test_one_encode_pass_split_into_batches(self):
+        pairs = [
+            (f"Answer number {i} mentions objects and classes.", "OOP is based on objects and classes.")
+            for i in range(5)
+        ]
+        evaluate_answers(pairs, batch_size=2, cascade=False)
+        encoded = [text for call in self.encoder.calls for text in call]
+        self.assertEqual(len(encoded), len(set(encoded)))
+        self.assertTrue(all(len(call) <= 2 for call in self.encoder.calls))
+        # Already embedded texts come from the cache on the next pass
+        self.encoder.calls.clear()
+        evaluate_answers(pairs, batch_size=2, cascade=False)
+        self.assertEqual(self.encoder.calls, [])
+
+class TestScoringCascade(EvaluationTestCase):
+
+    MODEL_ANSWER = "Encapsulation groups data and methods into objects, restricting direct access."
+    PARAPHRASE = "A class bundles state together with behaviour and hides internals behind an interface."
+
+    def test_lexical_tier_rejects_only_near_empty_answers(self):
+        rejected = LexicalPreScorer().reject(
+            [("um", self.MODEL_ANSWER), ("it is what it is", self.MODEL_ANSWER), (self.PARAPHRASE, self.MODEL_ANSWER)],
+            min_words=2, min_content_words=1
+        )
+        self.assertEqual(rejected, [True, True, False])
+
+    def test_rejected_answers_skip_the_encoder(self):
+        with patch("src.evaluation.settings.CASCADE_CROSS_ENCODER", ""):
+            (score, _), = evaluate_answers([("it is what it is", self.MODEL_ANSWER)], cascade=True)
+        self.assertEqual(score, 0.5)
+        self.assertEqual(self.encoder.calls, [])
+
+    def test_paraphrase_without_shared_words_reaches_the_bi_encoder(self):
+        coverage = coverage_from_vectors([], [], [])
+        with patch("src.evaluation.settings.CASCADE_CROSS_ENCODER", ""), \
+             patch("src.evaluation._bi_encoder_scores", return_value=([0.9], [coverage])) as bi_encoder:
+            (score, _), = evaluate_answers([(self.PARAPHRASE, self.MODEL_ANSWER)], cascade=True)
+        bi_encoder.assert_called_once()
+        self.assertEqual(score, 4.5)
+
+    def test_cross_encoder_rescores_only_borderline_answers(self):
+        pairs = [("Objects bundle data and methods.", self.MODEL_ANSWER), (self.PARAPHRASE, self.MODEL_ANSWER)]
+        coverage = coverage_from_vectors([], [], [])
+        # 0.62 * 5 = 3.1 is within CASCADE_BORDER_MARGIN of 3.0; 0.9 * 5 = 4.5 is not
+        with patch("src.evaluation._bi_encoder_scores", return_value=([0.62, 0.9], [coverage, coverage])), \
+             patch("src.evaluation.get_cross_encoder") as get_cross_encoder:
+            get_cross_encoder.return_value.predict.return_value = [0.8]
+            results = evaluate_answers(pairs, cascade=True)
+        get_cross_encoder.return_value.predict.assert_called_once()
+        self.assertEqual(get_cross_encoder.return_value.predict.call_args[0][0], [pairs[0]])
+        self.assertEqual([score for score, _ in results], [4.0, 4.5])
+
+def sentences(count):
+    return " ".join(f"Sentence {i}." for i in range(1, count + 1))
+
+class TestChunkedScoring(unittest.TestCase):
+
+    def test_short_answer_is_one_window(self):
+        self.assertEqual(sentence_windows(sentences(3), window_size=3, stride=2), [sentences(3)])
+        self.assertEqual(sentence_windows("no punctuation at all", window_size=3), ["no punctuation at all"])
+
+    def test_windows_follow_stride(self):
+        windows = sentence_windows(sentences(7), window_size=3, stride=2, max_windows=16)
+        self.assertEqual(windows, [
+            "Sentence 1. Sentence 2. Sentence 3.",
+            "Sentence 3. Sentence 4. Sentence 5.",
+            "Sentence 5. Sentence 6. Sentence 7.",
+        ])
+
+    def test_last_window_reaches_the_end(self):
+        windows = sentence_windows(sentences(8), window_size=3, stride=2, max_windows=16)
+        self.assertEqual(len(windows), 4)
+        self.assertEqual(windows[-1], "Sentence 6. Sentence 7. Sentence 8.")
+
+    def test_max_windows_keeps_first_and_last(self):
+        windows = sentence_windows(sentences(40), window_size=3, stride=1, max_windows=4)
+        self.assertEqual(len(windows), 4)
+        self.assertEqual(windows[0], "Sentence 1. Sentence 2. Sentence 3.")
+        self.assertEqual(windows[-1], "Sentence 38. Sentence 39. Sentence 40.")
+        with patch("src.evaluation.settings.SCORING_MAX_WINDOWS", 5):
+            self.assertEqual(len(sentence_windows(sentences(40), window_size=3, stride=1)), 5)
+
+    def test_aggregation(self):
+        similarities = [0.2, 0.9, 0.5, 0.7]
+        self.assertAlmostEqual(aggregate_similarities(similarities, method="max"), 0.9, places=6)
+        self.assertAlmostEqual(aggregate_similarities(similarities, method="topk_mean", top_k=2), 0.8, places=6)
+        self.assertAlmostEqual(aggregate_similarities(similarities, method="topk_mean", top_k=10), 0.575, places=6)
+        self.assertAlmostEqual(aggregate_similarities([0.4], method="topk_mean"), 0.4, places=6)
+        with self.assertRaises(ValueError):
+            aggregate_similarities(similarities, method="median")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# tests/test_incremental_scoring.py
+
+import unittest
+from unittest.mock import patch
+import numpy as np
+from src.incremental_scoring import IncrementalScorer
+
+MODEL_ANSWER = "Objects bundle data and methods. Inheritance reuses behaviour."
+
+def one_hot(text):
+    vector = np.zeros(3, dtype=np.float32)
+    vector[0 if "data" in text.lower() else 1 if "inherit" in text.lower() else 2] = 1.0
+    return vector
+
+class TestIncrementalScorer(unittest.TestCase):
+
+    def setUp(self):
+        self.encoded = []
+        patcher = patch(
+            "src.incremental_scoring.embed_texts",
+            side_effect=lambda texts: {t: one_hot(t) for t in texts}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def encode(self, texts):
+        self.encoded.append(list(texts))
+        return np.stack([one_hot(t) for t in texts])
+
+    def test_only_changed_sentences_are_encoded(self):
+        scorer = IncrementalScorer(MODEL_ANSWER, encode_fn=self.encode)
+        scorer.update("Objects hold data. I am still typ")
+        coverage = scorer.update("Objects hold data. I am still typing about inheritance.")
+        self.assertEqual(self.encoded, [
+            ["Objects hold data.", "I am still typ"],
+            ["I am still typing about inheritance."]
+        ])
+        self.assertEqual(scorer.sentences_encoded, 3)
+        self.assertEqual(coverage["ratio"], 1.0)
+
+    def test_unchanged_text_is_not_rescored(self):
+        scorer = IncrementalScorer(MODEL_ANSWER, encode_fn=self.encode)
+        first = scorer.update("Objects hold data.")
+        self.assertIs(scorer.update("Objects hold data."), first)
+        self.assertEqual(first["ratio"], 0.5)
+        self.assertEqual(len(self.encoded), 1)
+
+if __name__ == '__main__':
+    unittest.main()
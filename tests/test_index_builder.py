@@ -0,0 +1,118 @@
+# tests/test_index_builder.py
+
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import zlib
+from unittest.mock import patch
+import faiss
+import numpy as np
+
+from src.bm25 import BM25Index
+from src.index_builder import build_index, main
+from src.rag_pipeline import question_document, rag_encoder_version
+from src.shared_index import IndexSnapshots
+from src.vector_index import PersistentVectorIndex
+
+MODEL = "fake-encoder"
+
+class HashingEncoder:
+    """
+    Bag-of-words encoder standing in for the sentence transformer in the shard workers.
+    """
+    tokenizer = None
+    max_seq_length = 256
+
+    def __init__(self, model_name):
+        self.dim = 16
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1.0
+        return vectors
+
+ITEMS = [
+    {"question": "What is Python?", "answer": "Python is a programming language."},
+    {"question": "Define OOP.", "answer": "OOP organizes code into objects that bundle data and methods."},
+    # Same entry as the first one, in the second shard
+    {"question": "What is Python?", "answer": "Python is a programming language."},
+    {"question": "What is a closure?", "answer": "A function that captures variables from its enclosing scope."},
+]
+
+class TestIndexBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.json_path = os.path.join(self.tmp_dir, "technical_questions.json")
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump({"questions": ITEMS}, f)
+        self.index_dir = os.path.join(self.tmp_dir, "vector_store")
+        # Workers are forked, so they inherit the patched encoder
+        patcher = patch("src.index_builder.SentenceTransformer", HashingEncoder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def build(self, **kwargs):
+        options = dict(
+            index_dir=self.index_dir, embedding_model_name=MODEL, workers=2, shard_size=2,
+            index_type="flat", dedup=False, progress=False
+        )
+        options.update(kwargs)
+        return build_index([self.json_path], **options)
+
+    def load(self, index_dir):
+        index = PersistentVectorIndex(rag_encoder_version(MODEL, 256), index_dir=index_dir, index_type="flat")
+        self.assertTrue(index.load())
+        return index
+
+    def expected_texts(self):
+        return {question_document(item, "technical") for item in ITEMS}
+
+    def test_shards_are_merged_without_duplicate_chunks(self):
+        report = self.build()
+        self.assertEqual((report["items"], report["shards"], report["chunks"]), (4, 2, 3))
+        index = self.load(self.index_dir)
+        chunks = index.chunks()
+        self.assertEqual(index.index.ntotal, 3)
+        self.assertEqual(set(faiss.vector_to_array(index.index.id_map).tolist()), set(chunks))
+        self.assertEqual({chunk["text"] for chunk in chunks.values()}, self.expected_texts())
+        bm25 = BM25Index(index_dir=self.index_dir)
+        self.assertTrue(bm25.load())
+        self.assertEqual(len(bm25), 3)
+
+    def test_near_duplicates_are_skipped(self):
+        report_path = os.path.join(self.tmp_dir, "dedup_report.json")
+        report = self.build(dedup=True, dedup_report=report_path)
+        self.assertEqual((report["items"], report["duplicates"], report["chunks"]), (3, 1, 3))
+        with open(report_path, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["merged"], 1)
+        self.assertEqual(self.load(self.index_dir).index.ntotal, 3)
+
+    def test_publish_makes_the_snapshot_live(self):
+        snapshot_root = os.path.join(self.tmp_dir, "snapshots")
+        argv = [
+            "index_builder", self.json_path, "--publish", "--model", MODEL, "--workers", "2",
+            "--shard-size", "2", "--index-type", "flat", "--no-dedup"
+        ]
+        with patch("sys.argv", argv), patch("src.shared_index.settings.SHARED_INDEX_DIR", snapshot_root), \
+             contextlib.redirect_stdout(io.StringIO()) as output:
+            main()
+        snapshots = IndexSnapshots(root=snapshot_root)
+        self.assertIsNotNone(snapshots.current())
+        self.assertIn(snapshots.current(), output.getvalue())
+        index = self.load(snapshots.path())
+        self.assertEqual(index.index.ntotal, 3)
+        self.assertEqual({chunk["text"] for chunk in index.chunks().values()}, self.expected_texts())
+
+if __name__ == '__main__':
+    unittest.main()
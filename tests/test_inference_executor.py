@@ -0,0 +1,112 @@
+# tests/test_inference_executor.py
+
+import asyncio
+import multiprocessing as mp
+import os
+import time
+import unittest
+from unittest.mock import patch
+from concurrent.futures.process import BrokenProcessPool
+from src.evaluation import get_cascade_stats, pop_tier_counts
+from src.inference_executor import InferenceExecutor, _load_models
+
+def echo(text):
+    # Long enough for concurrent requests to share the pool when one crashes
+    time.sleep(0.2)
+    return text.upper()
+
+def crash_on_poison(text):
+    if text == "poison":
+        os._exit(1)
+    return echo(text)
+
+# Counts worker initializers across the forked workers
+_loads = mp.Value("i", 0)
+
+def staggered_load():
+    # Each worker takes longer to load than the one started before it
+    with _loads.get_lock():
+        _loads.value += 1
+        order = _loads.value
+    time.sleep(0.3 * (order - 1))
+
+class TestInferenceExecutor(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.executor = InferenceExecutor(workers=2, max_retries=1, preload=False, warmup_models=[])
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    async def test_poison_request_fails_alone(self):
+        texts = ["a", "b", "poison", "c", "d"]
+        results = await asyncio.gather(
+            *(self.executor._submit(crash_on_poison, text) for text in texts), return_exceptions=True
+        )
+        self.assertEqual([r for t, r in zip(texts, results) if t != "poison"], ["A", "B", "C", "D"])
+        self.assertIsInstance(results[2], BrokenProcessPool)
+        stats = self.executor.utilization()
+        self.assertEqual(stats["restarts"], 1)
+        self.assertGreaterEqual(stats["isolated_retries"], 1)
+        self.assertEqual(stats["completed"], 4)
+        self.assertEqual(stats["in_flight"], 0)
+
+    async def test_pool_is_restarted_after_crash(self):
+        with self.assertRaises(BrokenProcessPool):
+            await self.executor._submit(crash_on_poison, "poison")
+        self.assertEqual(await self.executor._submit(crash_on_poison, "after"), "AFTER")
+        self.assertEqual(self.executor.utilization()["restarts"], 1)
+
+    async def test_warm_up_reports_every_model(self):
+        self.executor.warmup_models = ["vader"]
+        models = await self.executor.warm_up()
+        self.assertEqual(set(models), {"vader"})
+        self.assertGreaterEqual(models["vader"]["warm_seconds"], 0.0)
+
+    async def test_warm_up_waits_for_every_worker(self):
+        self.executor = InferenceExecutor(workers=3, preload=False, warmup_models=["slow"])
+        _loads.value = 0
+        with patch.dict("src.warmup.WARMUP_MODELS", {"slow": (staggered_load, lambda model: None)}):
+            started = time.perf_counter()
+            models = await self.executor.warm_up()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.6)
+        self.assertEqual(_loads.value, 3)
+        # The slowest worker's report is included, not three from the fastest
+        self.assertGreaterEqual(models["slow"]["load_seconds"], 0.5)
+
+    async def test_cascade_stats_are_collected_from_workers(self):
+        pop_tier_counts()
+        # Both answers are short-circuited by the lexical tier, without loading a model
+        results = await self.executor.score_batch([("um", "Objects bundle data."), ("it is", "Objects bundle data.")])
+        self.assertEqual(len(results), 2)
+        stats = get_cascade_stats()
+        self.assertEqual(stats["lexical"]["hits"], 2)
+        self.assertEqual(stats["lexical"]["hit_rate"], 1.0)
+        self.assertEqual(stats["bi_encoder"]["hits"], 0)
+
+    async def test_utilization_counts_busy_and_queued_requests(self):
+        requests = [asyncio.ensure_future(self.executor._submit(echo, str(i))) for i in range(3)]
+        await asyncio.sleep(0)
+        stats = self.executor.utilization()
+        self.assertEqual(stats["in_flight"], 3)
+        self.assertEqual(stats["busy_workers"], 2)
+        self.assertEqual(stats["queued"], 1)
+        self.assertEqual(stats["utilization"], 1.0)
+        await asyncio.gather(*requests)
+        stats = self.executor.utilization()
+        self.assertEqual((stats["in_flight"], stats["completed"]), (0, 3))
+
+class TestLoadModels(unittest.TestCase):
+
+    @patch("src.inference_executor.get_sia")
+    @patch("src.inference_executor.get_model")
+    @patch("src.inference_executor.get_cross_encoder")
+    def test_cross_encoder_is_preloaded_before_fork(self, get_cross_encoder, get_model, get_sia):
+        self.assertEqual(set(_load_models()), {"sentence_encoder", "vader", "cross_encoder"})
+        get_cross_encoder.assert_called_once()
+        with patch("src.inference_executor.settings.CASCADE_CROSS_ENCODER", ""):
+            self.assertNotIn("cross_encoder", _load_models())
+        get_cross_encoder.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
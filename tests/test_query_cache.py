@@ -0,0 +1,66 @@
+# tests/test_query_cache.py
+
+import unittest
+import numpy as np
+from src.query_cache import QueryCache, ResponseCache, normalize_query
+
+VECTORS = {
+    "what is the interview process": [1.0, 0.0, 0.0],
+    "how does the interview process work": [0.98, 0.2, 0.0],
+    "is there a dress code": [0.0, 0.0, 1.0],
+}
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.embedded = []
+        self.cache = QueryCache(self.embed, threshold=0.95, ttl_seconds=60, max_items=2)
+
+    def embed(self, query):
+        self.embedded.append(query)
+        return np.array(VECTORS[normalize_query(query)])
+
+    def test_exact_and_semantic_hits(self):
+        self.assertIsNone(self.cache.get("What is the interview process?", now=0))
+        self.cache.put("What is the interview process?", ("answer", []), now=0)
+        self.assertEqual(self.cache.get("what is  the interview process", now=1), ("answer", []))
+        self.assertEqual(self.cache.get("How does the interview process work?", now=1), ("answer", []))
+        self.assertIsNone(self.cache.get("Is there a dress code?", now=1))
+        self.assertEqual(self.cache.stats()["hits_exact"], 1)
+        self.assertEqual(self.cache.stats()["hits_semantic"], 1)
+        # The miss and the put that followed it embedded the query once
+        self.assertEqual(self.embedded.count("What is the interview process?"), 1)
+
+    def test_ttl_lru_and_index_version(self):
+        self.cache.set_index_version("v1")
+        self.cache.put("What is the interview process?", ("a", []), now=0)
+        self.assertIsNone(self.cache.get("What is the interview process?", now=61))
+        self.cache.put("What is the interview process?", ("a", []), now=100)
+        self.cache.put("Is there a dress code?", ("b", []), now=100)
+        self.cache.get("What is the interview process?", now=100)
+        self.cache.put("How does the interview process work?", ("c", []), now=100)
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        self.assertIsNone(self.cache.get("Is there a dress code?", now=100))
+        self.cache.set_index_version("v2")
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_key_covers_query_chunks_and_model(self):
+        key = ResponseCache.key("What is OOP?", ["a", "b"], {"llm": "openai", "temperature": 0.2})
+        self.assertEqual(key, ResponseCache.key("what is oop", ["a", "b"], {"temperature": 0.2, "llm": "openai"}))
+        self.assertNotEqual(key, ResponseCache.key("What is OOP?", ["b", "a"], {"llm": "openai", "temperature": 0.2}))
+        self.assertNotEqual(key, ResponseCache.key("What is OOP?", ["a", "b"], {"llm": "openai", "temperature": 0.7}))
+
+    def test_ttl_and_lru(self):
+        cache = ResponseCache(ttl_seconds=10, max_items=2)
+        cache.put("k1", "a1", now=0)
+        cache.put("k2", "a2", now=0)
+        self.assertEqual(cache.get("k1", now=5), "a1")
+        cache.put("k3", "a3", now=5)
+        self.assertIsNone(cache.get("k2", now=5))
+        self.assertIsNone(cache.get("k1", now=11))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
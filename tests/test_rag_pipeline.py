@@ -1,8 +1,17 @@
 # tests/test_rag_pipeline.py
 
+import asyncio
+import json
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock
-from src.rag_pipeline import build_vector_store_from_json, get_rag_chain, answer_query
+from src.rag_pipeline import (
+    answer_query, astream_answer, build_partitioned_store_from_json, build_vector_store_from_json, get_rag_chain
+)
+from src.local_llm import DeterministicLLM
+from src.query_cache import ResponseCache
 
 class TestRAGPipeline(unittest.TestCase):
 
@@ -12,10 +21,10 @@ class TestRAGPipeline(unittest.TestCase):
         with open(self.sample_json, "w", encoding="utf-8") as f:
             import json
             json.dump([
-                {"question": "What is Python?", "model_answer": "Python is a programming language."},
-                {"question": "Define OOP.", "model_answer": "OOP stands for Object-Oriented Programming."}
+                {"question": "What is Python?", "model_answer": "Python is a programming language.", "difficulty": "easy"},
+                {"question": "Define OOP.", "model_answer": "OOP stands for Object-Oriented Programming.", "difficulty": "hard"}
             ], f)
-        self.vector_store = build_vector_store_from_json([self.sample_json])
+        self.vector_store = build_vector_store_from_json([self.sample_json], dedup=False)
 
     def test_vector_store_retrieval(self):
         # Test that the vector store can retrieve relevant chunks
@@ -30,6 +39,47 @@ class TestRAGPipeline(unittest.TestCase):
         answer, sources = answer_query(rag_chain, "Tell me about Python.")
         self.assertIn("Python", answer)
 
+    def test_partitioned_retrieval_respects_filter(self):
+        router = build_partitioned_store_from_json(
+            [self.sample_json], partition_fields=["category", "difficulty"], dedup=False
+        )
+        self.assertEqual(len(router.stores), 2)
+        docs = router.similarity_search("Tell me about Python.", k=2, filter={"difficulty": "Hard"})
+        self.assertEqual([doc.metadata["difficulty"] for doc in docs], ["hard"])
+
+    def test_partitioned_build_writes_the_dedup_report(self):
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir, ignore_errors=True)
+        report = os.path.join(report_dir, "dedup_report.json")
+        router = build_partitioned_store_from_json(
+            [self.sample_json, self.sample_json], partition_fields=["difficulty"], dedup=True, dedup_report=report
+        )
+        self.assertEqual(len(router.stores), 2)
+        with open(report, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["merged"], 2)
+
+    def test_offline_chain_reuses_cached_response(self):
+        llm = DeterministicLLM()
+        response_cache = ResponseCache()
+        rag_chain = get_rag_chain(self.vector_store, llm=llm, response_cache=response_cache)
+        answer, _ = answer_query(rag_chain, "What is Python?")
+        self.assertIn("Python is a programming language", answer)
+        self.assertEqual(answer_query(rag_chain, "What is Python?")[0], answer)
+        self.assertEqual(response_cache.stats()["hits"], 1)
+
+    def test_streamed_answer_matches_tokens(self):
+        rag_chain = get_rag_chain(self.vector_store, llm=DeterministicLLM(latency_ms=50))
+
+        async def collect():
+            return [event async for event in astream_answer(rag_chain, "What is Python?")]
+
+        events = asyncio.run(collect())
+        done = events[-1]
+        self.assertEqual(done["type"], "done")
+        self.assertGreater(len(events), 2)
+        self.assertEqual("".join(event["text"] for event in events[:-1]), done["answer"])
+        self.assertLess(done["ttft_ms"], done["total_ms"])
+
     def tearDown(self):
         import os
         os.remove(self.sample_json)
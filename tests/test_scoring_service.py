@@ -0,0 +1,67 @@
+# tests/test_scoring_service.py
+
+import unittest
+import asyncio
+import threading
+from src.scoring_service import ScoringService
+
+class TestScoringService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.batches = []
+
+        def score_fn(pairs):
+            self.batches.append(len(pairs))
+            return [(float(len(answer)), model_answer) for answer, model_answer in pairs]
+
+        self.service = ScoringService(max_batch_size=4, max_wait_ms=50, score_fn=score_fn)
+        await self.service.start()
+
+    async def asyncTearDown(self):
+        await self.service.stop()
+
+    async def test_concurrent_requests_are_batched_in_order(self):
+        answers = [("a" * n, f"ref{n}") for n in range(1, 7)]
+        results = await asyncio.gather(*(self.service.score(a, m) for a, m in answers))
+        self.assertEqual(results, [(float(n), f"ref{n}") for n in range(1, 7)])
+        self.assertEqual(self.batches, [4, 2])
+        metrics = self.service.metrics()
+        self.assertEqual(metrics["requests"], 6)
+        self.assertEqual(metrics["batches"], 2)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    async def test_errors_reach_every_caller(self):
+        def failing(pairs):
+            raise ValueError("encoder failed")
+        self.service.score_fn = failing
+        results = await asyncio.gather(
+            self.service.score("a", "b"), self.service.score("c", "d"), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    async def test_stop_fails_requests_of_running_batch(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow(pairs):
+            started.set()
+            release.wait(5)
+            return [(0.0, "") for _ in pairs]
+
+        self.service.score_fn = slow
+        requests = [asyncio.ensure_future(self.service.score(a, "ref")) for a in ("a", "b")]
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        await self.service.stop()
+        release.set()
+        results = await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 1)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    async def test_stop_fails_requests_of_batch_being_collected(self):
+        request = asyncio.ensure_future(self.service.score("a", "ref"))
+        # Taken off the queue, waiting max_wait_ms for more requests
+        await asyncio.sleep(0.01)
+        await self.service.stop()
+        with self.assertRaises(RuntimeError):
+            await asyncio.wait_for(request, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+# tests/test_sentiment_analysis.py
+
+import unittest
+from src.sentiment_analysis import SentimentTracker, analyze_sentiment, analyze_sentiment_batch
+
+class TestSentimentAnalysis(unittest.TestCase):
+
+    def test_sentiment_analysis_batch_matches_single(self):
+        texts = ["I am very happy with this interview process!", "", "This is terrible and confusing."]
+        expected = [analyze_sentiment(t) for t in texts]
+        self.assertEqual(analyze_sentiment_batch(texts), expected)
+        self.assertEqual(analyze_sentiment_batch(texts, workers=2, chunk_size=1, parallel_threshold=1), expected)
+
+    def test_sentiment_tracker_needs_sustained_negativity(self):
+        negative = {'compound': -0.6, 'label': 'Negative'}
+        positive = {'compound': 0.6, 'label': 'Positive'}
+        tracker = SentimentTracker(alpha=0.4, window=3)
+        tracker.update(negative)
+        self.assertFalse(tracker.is_sustained_negative(min_turns=2))
+        tracker.update(positive)
+        self.assertFalse(tracker.is_sustained_negative(min_turns=2))
+        tracker = SentimentTracker.from_dict(tracker.to_dict()).update(negative)
+        self.assertEqual(tracker.negative_in_window, 2)
+        self.assertTrue(tracker.is_sustained_negative(min_negative=2, min_turns=2))
+        for _ in range(3):
+            tracker.update(positive)
+        self.assertEqual(tracker.negative_in_window, 0)
+        self.assertFalse(tracker.is_sustained_negative())
+
+    def test_sentiment_tracker_describe(self):
+        tracker = SentimentTracker(alpha=0.5, window=3)
+        tracker.update({'compound': -0.8, 'label': 'Negative'}).update({'compound': 0.0, 'label': 'Neutral'})
+        self.assertEqual(tracker.describe(), "sentiment EWMA -0.40, 1 of the last 2 answers negative")
+
+if __name__ == '__main__':
+    unittest.main()
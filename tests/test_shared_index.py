@@ -0,0 +1,69 @@
+# tests/test_shared_index.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from src.shared_index import IndexSnapshots, SharedSnapshot
+
+def write(path, text):
+    # Index writers replace files instead of editing them in place
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+class TestIndexSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.snapshots = IndexSnapshots(self.root, keep=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_publish_swaps_current_and_keeps_old_version_intact(self):
+        self.assertIsNone(self.snapshots.current())
+        first = self.snapshots.publish(lambda path: write(os.path.join(path, "index.bin"), "v1"))
+        self.assertEqual(self.snapshots.current(), first)
+
+        second = self.snapshots.publish(lambda path: write(os.path.join(path, "index.bin"), "v2"))
+        self.assertNotEqual(second, first)
+        self.assertEqual(read(os.path.join(self.snapshots.path(), "index.bin")), "v2")
+        self.assertEqual(read(os.path.join(self.snapshots.path(first), "index.bin")), "v1")
+
+    def test_unchanged_build_keeps_current_version(self):
+        first = self.snapshots.publish(lambda path: write(os.path.join(path, "index.bin"), "v1"))
+        self.assertEqual(self.snapshots.publish(lambda path: None), first)
+
+    def test_failed_build_is_not_published(self):
+        first = self.snapshots.publish(lambda path: write(os.path.join(path, "index.bin"), "v1"))
+
+        def fail(path):
+            write(os.path.join(path, "index.bin"), "partial")
+            raise RuntimeError("build failed")
+
+        with self.assertRaises(RuntimeError):
+            self.snapshots.publish(fail)
+        self.assertEqual(self.snapshots.current(), first)
+        self.assertEqual(os.listdir(self.snapshots.versions_dir), [first])
+
+    def test_prune_keeps_newest_versions(self):
+        for i in range(4):
+            self.snapshots.publish(lambda path: write(os.path.join(path, "index.bin"), str(i)))
+        self.assertEqual(len(os.listdir(self.snapshots.versions_dir)), 2)
+
+    def test_shared_snapshot_loads_new_version(self):
+        shared = SharedSnapshot(lambda path: read(os.path.join(path, "index.bin")), self.snapshots, check_seconds=0)
+        with self.assertRaises(FileNotFoundError):
+            shared.get()
+        self.snapshots.publish(lambda path: write(os.path.join(path, "index.bin"), "v1"))
+        self.assertEqual(shared.get(), "v1")
+        self.snapshots.publish(lambda path: write(os.path.join(path, "index.bin"), "v2"))
+        self.assertEqual(shared.get(), "v2")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# tests/test_vector_index.py
+
+import json
+import os
+import unittest
+import shutil
+import tempfile
+from unittest.mock import patch
+import faiss
+import numpy as np
+from src.vector_index import PersistentVectorIndex, chunk_id, effective_index_type
+from src.embedding_index import content_hash
+
+class TestPersistentVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.encoded = []
+
+    def tearDown(self):
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[len(t), t.count("a")] for t in texts], dtype=np.float32)
+
+    def test_reload_embeds_nothing(self):
+        PersistentVectorIndex("enc-v1", index_dir=self.index_dir).sync(["alpha", "beta"], self.encode)
+        index = PersistentVectorIndex("enc-v1", index_dir=self.index_dir)
+        self.assertTrue(index.load())
+        stats = index.sync(["alpha", "beta"], self.encode)
+        self.assertEqual(stats, {"added": 0, "removed": 0, "unchanged": 2})
+        self.assertEqual(self.encoded, ["alpha", "beta"])
+        self.assertEqual(index.index.ntotal, 2)
+
+    def test_incremental_add_and_remove(self):
+        index = PersistentVectorIndex("enc-v1", index_dir=self.index_dir)
+        index.sync(["alpha", "beta"], self.encode, [{"category": "a"}, {"category": "b"}])
+        stats = index.sync(["alpha", "delta"], self.encode, [{"category": "a"}, {"category": "c"}])
+        self.assertEqual(stats, {"added": 1, "removed": 1, "unchanged": 1})
+        self.assertEqual(self.encoded, ["alpha", "beta", "delta"])
+
+        reloaded = PersistentVectorIndex("enc-v1", index_dir=self.index_dir)
+        reloaded.load()
+        self.assertEqual(reloaded.index.ntotal, 2)
+        _, ids = reloaded.index.search(np.array([[5.0, 1.0]], dtype=np.float32), 1)
+        self.assertEqual(reloaded.chunks()[ids[0][0]]["text"], "delta")
+        self.assertEqual(ids[0][0], chunk_id(content_hash("delta")))
+
+    def test_approximate_index_types_support_removal(self):
+        texts = [f"question {i}" for i in range(300)]
+        vectors = np.random.default_rng(0).normal(size=(300, 16)).astype(np.float32)
+        lookup = dict(zip(texts, vectors))
+        encode = lambda batch: np.stack([lookup[t] for t in batch])
+        for index_type in ("ivfpq", "hnsw"):
+            index_dir = tempfile.mkdtemp(dir=self.index_dir)
+            index = PersistentVectorIndex("enc-v1", index_dir=index_dir, index_type=index_type)
+            index.sync(texts, encode)
+            index.sync(texts[10:], encode)
+            self.assertEqual(index.index.ntotal, 290)
+            _, ids = index.index.search(vectors[20:21], 1)
+            self.assertEqual(index.chunks()[ids[0][0]]["text"], "question 20")
+            self.assertTrue(PersistentVectorIndex("enc-v1", index_dir=index_dir, index_type=index_type).load())
+            self.assertFalse(PersistentVectorIndex("enc-v1", index_dir=index_dir, index_type="flat").load())
+
+    def test_small_ivfpq_bank_is_retrained_once_large_enough(self):
+        texts = [f"question {i}" for i in range(400)]
+        vectors = np.random.default_rng(0).normal(size=(400, 16)).astype(np.float32)
+        lookup = dict(zip(texts, vectors))
+        encode = lambda batch: np.stack([lookup[t] for t in batch])
+        index = PersistentVectorIndex("enc-v1", index_dir=self.index_dir, index_type="ivfpq")
+        with self.assertLogs("src.vector_index", level="WARNING"):
+            index.sync(texts[:100], encode)
+        self.assertEqual(effective_index_type(index.index), "flat")
+        with open(os.path.join(self.index_dir, "questions.json"), "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["effective_index_type"], "flat")
+
+        reloaded = PersistentVectorIndex("enc-v1", index_dir=self.index_dir, index_type="ivfpq")
+        reloaded.sync(texts, encode)
+        self.assertEqual(effective_index_type(reloaded.index), "ivfpq")
+        self.assertEqual(reloaded.index.ntotal, 400)
+        _, ids = reloaded.index.search(vectors[150:151], 1)
+        self.assertEqual(reloaded.chunks()[ids[0][0]]["text"], "question 150")
+        with open(os.path.join(self.index_dir, "questions.json"), "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["effective_index_type"], "ivfpq")
+
+    def test_encoder_version_mismatch_is_ignored(self):
+        PersistentVectorIndex("enc-v1", index_dir=self.index_dir).sync(["alpha"], self.encode)
+        self.assertFalse(PersistentVectorIndex("enc-v2", index_dir=self.index_dir).load())
+
+    def test_concurrent_writers_use_separate_temp_files(self):
+        first = PersistentVectorIndex("enc-v1", index_dir=self.index_dir)
+        second = PersistentVectorIndex("enc-v1", index_dir=self.index_dir)
+        write_index = faiss.write_index
+        temp_files = []
+
+        # The second writer stores its index while the first is writing its own
+        def interleaved_write(index, path):
+            temp_files.append(path)
+            if len(temp_files) == 1:
+                second.sync(["beta"], self.encode)
+            write_index(index, path)
+
+        with patch("src.vector_index.faiss.write_index", side_effect=interleaved_write):
+            first.sync(["alpha"], self.encode)
+        self.assertEqual(len(set(temp_files)), 2)
+        self.assertEqual(sorted(os.listdir(self.index_dir)), sorted(os.path.basename(p) for p in (
+            first.index_path, first.manifest_path
+        )))
+        reloaded = PersistentVectorIndex("enc-v1", index_dir=self.index_dir)
+        self.assertTrue(reloaded.load())
+        self.assertEqual([chunk["text"] for chunk in reloaded.chunks().values()], ["alpha"])
+
+if __name__ == '__main__':
+    unittest.main()
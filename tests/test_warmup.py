@@ -0,0 +1,45 @@
+# tests/test_warmup.py
+
+import unittest
+from unittest.mock import patch
+from src import warmup
+from src.warmup import get_warmup_status, mark_ready, readiness, warm_up_models
+
+class TestReadiness(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.dict(warmup._status, {
+            "ready": False, "started_at": None, "finished_at": None, "models": {}, "error": None
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_not_ready_until_marked(self):
+        body, status_code = readiness()
+        self.assertEqual(status_code, 503)
+        self.assertEqual(body["status"], "not_ready")
+        mark_ready({"vader": {"load_seconds": 0.1, "warm_seconds": 0.01, "pid": 1}})
+        body, status_code = readiness()
+        self.assertEqual(status_code, 200)
+        self.assertEqual(body["status"], "ready")
+        self.assertIn("vader", body["warmup"]["models"])
+        self.assertIsNotNone(body["warmup"]["finished_at"])
+
+    def test_error_keeps_service_not_ready(self):
+        mark_ready(error="RuntimeError: model download failed")
+        body, status_code = readiness()
+        self.assertEqual(status_code, 503)
+        self.assertEqual(body["warmup"]["error"], "RuntimeError: model download failed")
+        self.assertFalse(get_warmup_status()["ready"])
+
+    def test_warm_up_records_timings_without_marking_ready(self):
+        calls = []
+        with patch.dict(warmup.WARMUP_MODELS, {"fake": (lambda: "model", calls.append)}):
+            timings = warm_up_models(["fake"])
+        self.assertEqual(calls, ["model"])
+        self.assertEqual(set(timings["fake"]), {"load_seconds", "warm_seconds", "pid"})
+        self.assertIn("fake", get_warmup_status()["models"])
+        self.assertEqual(readiness()[1], 503)
+
+if __name__ == '__main__':
+    unittest.main()